@@ -1,21 +1,24 @@
 """ For manual seeding of database """
 
 from supabase import create_client
-import json
 import os
+import sys
 from dotenv import load_dotenv
 load_dotenv()
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scraper'))
+from job_record import load_jobs
+
 # Initialize Supabase
 SUPABASE_URL = os.getenv("VITE_SUPABASE_URL")  # store in .env file
 SUPABASE_KEY = os.getenv("VITE_SUPABASE_ANON_KEY")
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-with open('../backend/coopsearch.json', 'r') as file:
-    jobs = json.load(file)
+# Checked against the job schema once, here
+jobs = load_jobs('../backend/coopsearch.json')
 
 # Insert all coops
 for job in jobs:
-    supabase.table('jobs').insert(job).execute()
+    supabase.table('jobs').insert(job.to_dict()).execute()
 
 print(f"Uploaded {len(jobs)} job")
\ No newline at end of file
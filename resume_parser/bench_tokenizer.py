@@ -0,0 +1,86 @@
+"""
+bench_tokenizer.py
+
+Throughput benchmark: shared Tokenizer vs. the translate/split/any(isdigit)
+code the parsers used before. Prints words/sec for each on synthetic text.
+
+    python bench_tokenizer.py [--words 2000000] [--repeat 3]
+"""
+from collections import Counter
+import argparse
+import io
+import random
+import string
+import time
+
+from tokenizer import Tokenizer
+
+VOCAB = ['python', 'javascript', 'react', 'experience', 'databases', 'postgresql',
+         'software', 'engineer', 'develop', 'applications', 'testing', 'agile',
+         'communication', 'skills', 'machine', 'learning', 'cloud', 'aws',
+         'the', 'and', 'with', 'for', 'our', 'you', 'will', 'a', 'to', 'of',
+         'C++', 'Node.js', 'full-stack', '2+', '$25/hr', 'co-op', "team's",
+         'Boston,', 'MA.', '(remote)', 'Q4-2025', 'B.S.']
+
+
+def legacy_count(text, stopwords):
+    """ The tokenization previously copy-pasted in all three parsers """
+    text = text.lower()
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    words = text.split()
+    words = [w for w in words
+             if w not in stopwords
+             and len(w) > 2
+             and not any(ch.isdigit() for ch in w)]
+    return {'wordcount': Counter(words), 'numwords': len(words)}
+
+
+def make_text(num_words, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for start in range(0, num_words, 12):
+        lines.append(' '.join(rng.choice(VOCAB) for _ in range(min(12, num_words - start))))
+    return '\n'.join(lines)
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    ap.add_argument('--words', type=int, default=2_000_000)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    stopwords = {'the', 'and', 'with', 'for', 'our', 'you', 'will', 'a', 'to', 'of'}
+    text = make_text(args.words)
+    tokenizer = Tokenizer(stopwords)
+
+    cases = [
+        ('legacy (translate/split/any)', lambda: legacy_count(text, stopwords)),
+        ('Tokenizer.count', lambda: tokenizer.count(text)),
+        ('Tokenizer.count_stream', lambda: tokenizer.count_stream(io.StringIO(text))),
+    ]
+
+    print(f"{args.words:,} input words, best of {args.repeat}\n")
+    print(f"{'Implementation':<32} {'Seconds':>9} {'Words/sec':>14}")
+    print("-" * 57)
+
+    reference = None
+    for name, fn in cases:
+        sec, result = best_time(fn, args.repeat)
+        if reference is None:
+            reference = result
+        elif result != reference:
+            print(f"WARNING: {name} counts differ from legacy")
+        print(f"{name:<32} {sec:9.3f} {args.words / sec:14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+benchmark.py
+
+Benchmark harness for the parse --> load --> score pipeline on synthetic
+corpora of several sizes. For each corpus size it measures:
+
+    tokenize    Tokenizer.count throughput (words/sec)
+    load        ResumeParser.load_text_from_string for every job (docs/sec),
+                plus the size of the compact document store and peak RSS
+    single_pair calculate_match_score latency, cold (first time a pair's
+                documents are seen) and warm (cached document statistics)
+    many_job    InvertedIndex build time, top_matches latency per resume,
+                a brute-force similarity scan (up to --brute-max jobs) and a
+                score_matrix over every resume x job
+    memory      with --memory only: a separate, traced pass recording each
+                stage's allocations (see memprofile.py) and the footprint of
+                the loaded parser and scorer
+
+Results are written as JSON so runs from different commits can be compared:
+
+    python benchmark.py [--sizes 100,1000,10000,100000] [--resumes 20]
+                        [--weighting raw|tfidf|bm25] [--memory] [--output bench.json]
+    python benchmark.py --sizes 1000 --compare baseline.json
+"""
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from inverted_index import InvertedIndex
+from memprofile import MemoryProfiler, footprint, peak_rss_kb
+from resume_parser import ResumeParser
+from score_matrix import score_matrix
+from sentiment_analysis import JobResumeMatchScorer
+from tokenizer import Tokenizer
+
+_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def make_vocabulary(size, seed=0):
+    """ Distinct letter-only words (digits would be dropped by the tokenizer) """
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(_LETTERS) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def make_corpus(num_docs, vocabulary, prefix, min_words=120, max_words=400, seed=0):
+    """
+    Generate (label, text) documents whose words follow a Zipf-like
+    distribution over the vocabulary, so a few words are very common and most
+    are rare, as in real job descriptions.
+    """
+    rng = random.Random(seed)
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+
+    width = len(str(num_docs))
+    docs = []
+    for i in range(num_docs):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(min_words, max_words))
+        lines = [' '.join(words[start:start + 12]) for start in range(0, len(words), 12)]
+        docs.append((f"{prefix}-{i:0{width}d}", '\n'.join(lines)))
+    return docs
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def _latency_us(samples):
+    """ mean / p50 / p95 in microseconds from a list of seconds """
+    samples = sorted(samples)
+    return {
+        'mean_us': round(sum(samples) / len(samples) * 1e6, 2) if samples else 0.0,
+        'p50_us': round(_percentile(samples, 0.5) * 1e6, 2),
+        'p95_us': round(_percentile(samples, 0.95) * 1e6, 2),
+    }
+
+
+def bench_tokenize(tokenizer, docs):
+    words = sum(len(text.split()) for _, text in docs)
+    start = time.perf_counter()
+    for _, text in docs:
+        tokenizer.count(text)
+    seconds = time.perf_counter() - start
+    return {'words': words, 'seconds': round(seconds, 4), 'words_per_sec': round(words / seconds)}
+
+
+def bench_load(rp, docs):
+    start = time.perf_counter()
+    for label, text in docs:
+        rp.load_text_from_string(text, label)
+    seconds = time.perf_counter() - start
+    return {
+        'documents': len(docs),
+        'seconds': round(seconds, 4),
+        'docs_per_sec': round(len(docs) / seconds, 1),
+        'vocabulary': len(rp.vocab),
+        'store_bytes': sum(doc.nbytes for doc in rp.documents.values()),
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def bench_single_pair(rp, resume_labels, job_labels, weighting, pairs, seed=0):
+    rng = random.Random(seed)
+    sample = [(rng.choice(resume_labels), rng.choice(job_labels)) for _ in range(pairs)]
+    scorer = JobResumeMatchScorer(rp, weighting=weighting)
+
+    def timed():
+        samples = []
+        for resume_label, job_label in sample:
+            start = time.perf_counter()
+            scorer.calculate_match_score(resume_label, job_label)
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    cold = timed()  # builds the cached stats for every document touched
+    warm = timed()
+    return {'pairs': pairs, 'cold': _latency_us(cold), 'warm': _latency_us(warm)}
+
+
+def bench_many_job(rp, resume_labels, job_labels, weighting, k, brute_max):
+    scorer = JobResumeMatchScorer(rp, weighting=weighting)
+
+    start = time.perf_counter()
+    index = InvertedIndex(scorer, job_labels)
+    build = time.perf_counter() - start
+
+    samples = []
+    for resume_label in resume_labels:
+        start = time.perf_counter()
+        scorer.top_matches(resume_label, k=k, index=index)
+        samples.append(time.perf_counter() - start)
+
+    result = {
+        'jobs': len(job_labels),
+        'index_build_sec': round(build, 4),
+        'top_matches': _latency_us(samples),
+    }
+
+    if len(job_labels) <= brute_max:
+        start = time.perf_counter()
+        for job_label in job_labels:
+            scorer.compute_weighted_similarity(resume_labels[0], job_label)
+        result['brute_force_scan_sec'] = round(time.perf_counter() - start, 4)
+
+    start = time.perf_counter()
+    score_matrix(scorer, resume_labels, job_labels, k=k)
+    result['score_matrix_sec'] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def bench_memory(jobs, resumes, weighting, k, top):
+    """
+    Reload the corpus with tracemalloc on (kept out of the timed passes,
+    since tracing slows allocation down several times).
+    """
+    mp = MemoryProfiler(top=top).start()
+    try:
+        rp = ResumeParser()
+        with mp.stage('load jobs', documents=len(jobs)):
+            for label, text in jobs:
+                rp.load_text_from_string(text, label)
+        with mp.stage('load resumes', documents=len(resumes)):
+            for label, text in resumes:
+                rp.load_text_from_string(text, label)
+
+        scorer = JobResumeMatchScorer(rp, weighting=weighting)
+        resume_labels = [label for label, _ in resumes]
+        job_labels = [label for label, _ in jobs]
+        with mp.stage('index + top_matches', documents=len(jobs)):
+            index = InvertedIndex(scorer, job_labels)
+            for resume_label in resume_labels:
+                scorer.top_matches(resume_label, k=k, index=index)
+        with mp.stage('score_matrix', documents=len(jobs)):
+            score_matrix(scorer, resume_labels, job_labels, k=k)
+    finally:
+        mp.stop()
+    return {'stages': mp.stages, 'footprint': footprint(rp, scorer)}
+
+
+def run_size(num_jobs, args, vocabulary, resumes):
+    jobs = make_corpus(num_jobs, vocabulary, 'job', seed=num_jobs)
+    rp = ResumeParser()
+
+    result = {'size': num_jobs}
+    result['tokenize'] = bench_tokenize(Tokenizer(rp.stopwords), jobs)
+    result['load'] = bench_load(rp, jobs)
+    for label, text in resumes:
+        rp.load_text_from_string(text, label)
+
+    resume_labels = [label for label, _ in resumes]
+    job_labels = [label for label, _ in jobs]
+    result['single_pair'] = bench_single_pair(rp, resume_labels, job_labels, args.weighting, args.pairs)
+    result['many_job'] = bench_many_job(rp, resume_labels, job_labels, args.weighting, args.k, args.brute_max)
+    if args.memory:
+        del rp
+        result['memory'] = bench_memory(jobs, resumes, args.weighting, args.k, args.memory_top)
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, item, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+    return out
+
+
+def compare(baseline, current):
+    """
+    Print every numeric metric side by side for the corpus sizes both runs share.
+    """
+    base_by_size = {r['size']: r for r in baseline['results']}
+    print(f"\nvs. {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for result in current['results']:
+        base = base_by_size.get(result['size'])
+        if base is None:
+            continue
+        print(f"\n{result['size']:,} documents")
+        print(f"{'Metric':<36} {'Baseline':>14} {'Current':>14} {'Change':>9}")
+        print("-" * 76)
+        old, new = _flatten('', base, {}), _flatten('', result, {})
+        for key in new:
+            if key == 'size' or key not in old:
+                continue
+            change = f"{(new[key] - old[key]) / old[key]:+9.1%}" if old[key] else f"{'n/a':>9}"
+            print(f"{key:<36} {old[key]:14,.2f} {new[key]:14,.2f} {change}")
+
+
+def print_memory(results):
+    print(f"\n{'Docs':>8} {'Stage':<22} {'Net MB':>9} {'Peak MB':>9} {'B/doc':>9}")
+    print("-" * 61)
+    for r in results:
+        for s in r['memory']['stages']:
+            print(f"{r['size']:8,d} {s['stage']:<22} {s['net_bytes'] / 2 ** 20:9.2f} "
+                  f"{s['peak_bytes'] / 2 ** 20:9.2f} {s['bytes_per_document'] or 0:9,.0f}")
+        fp = r['memory']['footprint']
+        print(f"{r['size']:8,d} {'footprint':<22} {fp['total_bytes'] / 2 ** 20:9.2f} {'':>9} "
+              f"{fp['bytes_per_document'] or 0:9,.0f}")
+
+
+def print_summary(results):
+    print(f"\n{'Docs':>8} {'Tok words/s':>12} {'Load docs/s':>12} {'Store MB':>9} "
+          f"{'Pair warm us':>13} {'Top-k us':>10} {'Matrix s':>9}")
+    print("-" * 79)
+    for r in results:
+        print(f"{r['size']:8,d} {r['tokenize']['words_per_sec']:12,d} {r['load']['docs_per_sec']:12,.0f} "
+              f"{r['load']['store_bytes'] / 2 ** 20:9.2f} {r['single_pair']['warm']['mean_us']:13,.1f} "
+              f"{r['many_job']['top_matches']['mean_us']:10,.0f} {r['many_job']['score_matrix_sec']:9.3f}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark parsing, loading and match scoring")
+    ap.add_argument('--sizes', default='100,1000,10000,100000',
+                    help="Comma-separated job corpus sizes")
+    ap.add_argument('--resumes', type=int, default=20, help="Resumes scored against each corpus")
+    ap.add_argument('--vocabulary', type=int, default=20000, help="Distinct words in the corpora")
+    ap.add_argument('--weighting', choices=JobResumeMatchScorer.WEIGHTINGS, default='raw')
+    ap.add_argument('--pairs', type=int, default=200, help="Pairs timed for single-pair scoring")
+    ap.add_argument('--k', type=int, default=10, help="Matches kept per resume")
+    ap.add_argument('--brute-max', type=int, default=10000,
+                    help="Largest corpus that also gets a brute-force scan")
+    ap.add_argument('--memory', action='store_true',
+                    help="Add a traced pass per size with per-stage allocations and footprint")
+    ap.add_argument('--memory-top', type=int, default=5, help="Allocation sites kept per stage")
+    ap.add_argument('--output', help="Write results as JSON")
+    ap.add_argument('--compare', help="Baseline JSON from an earlier run to compare against")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    vocabulary = make_vocabulary(args.vocabulary)
+    resumes = make_corpus(args.resumes, vocabulary, 'resume', min_words=200, max_words=500, seed=1)
+
+    results = []
+    for size in sizes:
+        print(f"Benchmarking {size:,} documents...", file=sys.stderr)
+        results.append(run_size(size, args, vocabulary, resumes))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        },
+        'results': results,
+    }
+
+    print_summary(results)
+    if args.memory:
+        print_memory(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(json.load(f), report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+document_store.py
+
+Compact storage for parsed documents. Instead of keeping a Counter of word
+strings for every document, each distinct word is interned once in a shared
+Vocabulary and every document keeps parallel typed arrays: the sorted term
+ids it contains, how often each one occurs and the order in which each word
+first appeared in the document (to break ties the way Counter.most_common did).
+"""
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import MutableMapping
+import heapq
+import math
+
+
+class Vocabulary:
+    """
+    Global term <-> integer id mapping shared by all loaded documents.
+    """
+
+    __slots__ = ('_ids', '_terms')
+
+    def __init__(self):
+        self._ids = {}  # term --> id
+        self._terms = []  # id --> term
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __contains__(self, term):
+        return term in self._ids
+
+    def add(self, term):
+        """
+        Return the id for a term, assigning the next free id if it is new.
+        """
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._ids[term] = term_id
+            self._terms.append(term)
+        return term_id
+
+    def add_many(self, terms):
+        """
+        Ids for a sequence of distinct terms (as add(), but known terms are
+        looked up in one C-level pass).
+        """
+        ids = self._ids
+        result = list(map(ids.get, terms))
+        if None in result:
+            all_terms = self._terms
+            for i, term_id in enumerate(result):
+                if term_id is None:
+                    term = terms[i]
+                    result[i] = ids[term] = len(all_terms)
+                    all_terms.append(term)
+        return result
+
+    def get_id(self, term, default=None):
+        """
+        Look up the id of a term without adding it.
+        """
+        return self._ids.get(term, default)
+
+    def term(self, term_id):
+        """
+        Look up the term string for an id.
+        """
+        return self._terms[term_id]
+
+    @property
+    def terms(self):
+        """
+        All terms in id order. Treat as read-only.
+        """
+        return self._terms
+
+
+class DocumentVector:
+    """
+    Term counts for one document as sorted id/count arrays.
+    """
+
+    __slots__ = ('ids', 'counts', 'order')
+
+    def __init__(self, ids, counts, order):
+        self.ids = ids
+        self.counts = counts
+        self.order = order  # first-occurrence rank of each entry within the document
+
+    @classmethod
+    def from_counter(cls, counter, vocab):
+        """
+        Encode a Counter (word --> count) against a vocabulary.
+
+        Args:
+            counter: Mapping of word strings to integer counts
+            vocab: Vocabulary used to intern the words
+
+        Returns:
+            DocumentVector with ids sorted ascending
+        """
+        # a Counter iterates in first-occurrence order
+        return cls.from_terms(list(counter), list(counter.values()), vocab)
+
+    @classmethod
+    def from_terms(cls, terms, counts, vocab):
+        """
+        Encode parallel term/count sequences, terms in the order they first
+        appeared in the document. That order is remembered as each entry's
+        rank, since ids depend on what else was loaded before.
+        """
+        term_ids = vocab.add_many(terms)
+        # positions in id order; a position is also the entry's rank
+        by_id = sorted(range(len(term_ids)), key=term_ids.__getitem__)
+        ids = array('I', map(term_ids.__getitem__, by_id))
+        counts = array('I', map(counts.__getitem__, by_id))
+        order = array('H' if len(by_id) <= 0xFFFF else 'I', by_id)
+        return cls(ids, counts, order)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, term_id, default=0):
+        """
+        Count for a term id (binary search over the sorted ids).
+        """
+        i = bisect_left(self.ids, term_id)
+        if i < len(self.ids) and self.ids[i] == term_id:
+            return self.counts[i]
+        return default
+
+    def __contains__(self, term_id):
+        i = bisect_left(self.ids, term_id)
+        return i < len(self.ids) and self.ids[i] == term_id
+
+    def total(self):
+        """
+        Sum of all counts.
+        """
+        return sum(self.counts)
+
+    def items(self):
+        """
+        Iterate (term_id, count) pairs in id order.
+        """
+        return zip(self.ids, self.counts)
+
+    def ranked(self, n=None):
+        """
+        (term_id, count) pairs, highest count first. Equal counts keep the
+        order the words first appeared in the document, as Counter.most_common
+        does, so the result never depends on the shared vocabulary's ids.
+
+        Args:
+            n: Number of entries to return (None for all)
+        """
+        entries = zip(self.ids, self.counts, self.order)
+        key = lambda entry: (-entry[1], entry[2])
+        if n is None:
+            top = sorted(entries, key=key)
+        else:
+            top = heapq.nsmallest(n, entries, key=key)
+        return [(term_id, count) for term_id, count, _ in top]
+
+    def most_common(self, vocab, n=None):
+        """
+        Same contract as Counter.most_common, decoded through the vocabulary.
+
+        Args:
+            vocab: Vocabulary the document was encoded with
+            n: Number of entries to return (None for all)
+
+        Returns:
+            List of (word, count) tuples, highest count first
+        """
+        return [(vocab.term(term_id), count) for term_id, count in self.ranked(n)]
+
+    def to_counter(self, vocab):
+        """
+        Decode back into a Counter of word strings, in first-occurrence order.
+        """
+        terms = vocab.terms
+        entries = sorted(zip(self.order, self.ids, self.counts))
+        return Counter({terms[term_id]: count for _, term_id, count in entries})
+
+    @property
+    def nbytes(self):
+        """
+        Bytes used by the id, count and order buffers.
+        """
+        return (len(self.ids) * self.ids.itemsize +
+                len(self.counts) * self.counts.itemsize +
+                len(self.order) * self.order.itemsize)
+
+
+class CorpusStats:
+    """
+    Document frequencies and lengths over all loaded documents, updated
+    incrementally as documents are added or removed (never by a rescan).
+    """
+
+    __slots__ = ('doc_freq', 'num_docs', 'total_length', 'version')
+
+    def __init__(self):
+        self.doc_freq = array('I')  # term id --> number of documents containing it
+        self.num_docs = 0
+        self.total_length = 0  # sum of document lengths (for BM25 avgdl)
+        self.version = 0  # bumped on every change so dependents can invalidate
+
+    def add(self, document):
+        """
+        Count a newly stored document.
+        """
+        if len(document) and document.ids[-1] >= len(self.doc_freq):
+            self.doc_freq.extend([0] * (document.ids[-1] + 1 - len(self.doc_freq)))
+        doc_freq = self.doc_freq
+        for term_id in document.ids:
+            doc_freq[term_id] += 1
+        self.num_docs += 1
+        self.total_length += document.total()
+        self.version += 1
+
+    def remove(self, document):
+        """
+        Un-count a document that is being replaced or deleted.
+        """
+        doc_freq = self.doc_freq
+        for term_id in document.ids:
+            doc_freq[term_id] -= 1
+        self.num_docs -= 1
+        self.total_length -= document.total()
+        self.version += 1
+
+    def df(self, term_id):
+        return self.doc_freq[term_id] if term_id < len(self.doc_freq) else 0
+
+    def idf(self, term_id):
+        """
+        Smoothed inverse document frequency: ln((1 + N) / (1 + df)) + 1
+        """
+        return math.log((1 + self.num_docs) / (1 + self.df(term_id))) + 1
+
+    def bm25_idf(self, term_id):
+        """
+        BM25 (Lucene-style, always positive) idf: ln(1 + (N - df + 0.5) / (df + 0.5))
+        """
+        df = self.df(term_id)
+        return math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+
+    def avg_length(self):
+        return self.total_length / self.num_docs if self.num_docs else 0.0
+
+
+class WordcountView(MutableMapping):
+    """
+    Dict-like label --> Counter view over compact documents. This is what
+    ResumeParser exposes as data['wordcount'] so existing callers keep working.
+
+    Reading a label decodes a fresh Counter, so changes made to the returned
+    Counter are not written back. Assigning a Counter re-encodes it.
+    on_change(label) is called after a label is stored, replaced or deleted.
+    """
+
+    def __init__(self, documents, vocab, corpus=None, on_change=None):
+        self._documents = documents
+        self._vocab = vocab
+        self._corpus = corpus
+        self._on_change = on_change
+
+    def __getitem__(self, label):
+        return self._documents[label].to_counter(self._vocab)
+
+    def __setitem__(self, label, counter):
+        self.put(label, DocumentVector.from_counter(counter, self._vocab))
+
+    def put(self, label, document):
+        """
+        Store an already encoded DocumentVector under a label.
+        """
+        if self._corpus is not None:
+            if label in self._documents:
+                self._corpus.remove(self._documents[label])
+            self._corpus.add(document)
+        self._documents[label] = document
+        if self._on_change is not None:
+            self._on_change(label)
+
+    def __delitem__(self, label):
+        document = self._documents.pop(label)
+        if self._corpus is not None:
+            self._corpus.remove(document)
+        if self._on_change is not None:
+            self._on_change(label)
+
+    def __contains__(self, label):
+        return label in self._documents
+
+    def __iter__(self):
+        return iter(self._documents)
+
+    def __len__(self):
+        return len(self._documents)
@@ -0,0 +1,168 @@
+"""
+inverted_index.py
+
+Term --> jobs inverted index for top-k matching with MaxScore pruning. The
+k best scores so far sit in a min-heap whose smallest entry is the
+threshold. Query terms whose cumulative upper bound (largest possible
+contribution, summed from the weakest term up) cannot beat the threshold
+are non-essential: their postings are never walked, and they are only
+looked up in the vectors of jobs found through the essential terms, with
+each job dropped as soon as what its remaining terms could add no longer
+lifts it over the threshold.
+
+Scores are the scorer's weighted similarity (cosine over raw, TF-IDF or
+BM25 weights), written as a sum over shared terms of query weight *
+document weight.
+"""
+from itertools import repeat
+from operator import mul
+import heapq
+
+from resume_parser import profile
+
+# Terms looked up in the first step of finishing a job's score; each later
+# step looks up twice as many, re-checking the bound in between
+LOOKUP_BLOCK = 4
+
+
+class InvertedIndex:
+    """
+    Inverted index over job description documents loaded in a ResumeParser.
+    """
+
+    def __init__(self, scorer, labels=None):
+        """
+        Args:
+            scorer: JobResumeMatchScorer whose parser holds the documents and
+                whose weighting defines the score
+            labels: Job labels to index (default: none, add them later)
+        """
+        self.scorer = scorer
+        self.postings = {}  # term id --> {label: document weight}
+        self.max_weight = {}  # term id --> largest document weight (upper bound)
+        self.doc_terms = {}  # label --> {term id: document weight}
+
+        for label in labels or ():
+            self.add(label)
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def __contains__(self, label):
+        return label in self.doc_terms
+
+    def add(self, label):
+        """
+        Index (or re-index) one job document.
+        """
+        if label in self.doc_terms:
+            self.remove(label)
+
+        weights = self.scorer.document_weights(label)
+        self.doc_terms[label] = weights
+        for term, w in weights.items():
+            self.postings.setdefault(term, {})[label] = w
+            if w > self.max_weight.get(term, 0.0):
+                self.max_weight[term] = w
+
+    def remove(self, label):
+        """
+        Drop one job document. Upper bounds are left as they are (they can
+        only be too high, which keeps pruning safe) until rebuild().
+        """
+        for term in self.doc_terms.pop(label):
+            posting = self.postings[term]
+            del posting[label]
+            if not posting:
+                del self.postings[term]
+                del self.max_weight[term]
+
+    def rebuild(self):
+        """
+        Recompute every weight. With 'tfidf' or 'bm25' weighting, call this
+        after loading a batch of jobs so the indexed IDF values are current.
+        """
+        labels = list(self.doc_terms)
+        self.postings.clear()
+        self.max_weight.clear()
+        self.doc_terms.clear()
+        for label in labels:
+            self.add(label)
+
+    @profile
+    def top_k(self, resume_label, k=10):
+        """
+        Find the k jobs with the highest similarity to a resume.
+
+        Args:
+            resume_label: Label of the resume document
+            k: Number of jobs to return
+
+        Returns:
+            List of (job_label, similarity) tuples, best first
+        """
+        query = {term: w for term, w in self.scorer.query_weights(resume_label).items()
+                 if term in self.postings}
+        if not query or k <= 0:
+            return []
+
+        # terms from the smallest possible contribution to the largest, and
+        # bound[i] = the most terms 0..i together can add to a job's score
+        terms = sorted(query, key=lambda term: query[term] * self.max_weight[term])
+        weights = [query[term] for term in terms]
+        bound = []
+        total = 0.0
+        for term, q in zip(terms, weights):
+            total += q * self.max_weight[term]
+            bound.append(total)
+
+        query_get = query.get
+        zeros = repeat(0.0)
+
+        heap = []  # (score, label) of the best k so far; heap[0] is the threshold
+        threshold = 0.0
+        seen = set()
+        doc_terms = self.doc_terms
+
+        # Essential terms are those whose bound beats the threshold. Walk their
+        # postings from the highest bound down; a job first met in term i's
+        # postings has none of the terms above i, so it is finished off by
+        # looking up terms i-1..0 in its own vector, in steps of doubling size,
+        # stopping as soon as the bound of what is left can no longer lift it
+        # over the threshold.
+        # Once bound[i] <= threshold the remaining terms are non-essential:
+        # a job that has only those cannot enter the top k.
+        for i in range(len(terms) - 1, -1, -1):
+            if bound[i] <= threshold:
+                break
+            q = weights[i]
+            for label, w in self.postings[terms[i]].items():
+                if label in seen:
+                    continue
+                seen.add(label)
+                score = q * w
+                doc = doc_terms[label]
+                lookup = doc.get
+                j = i
+                step = LOOKUP_BLOCK
+                while j and score + bound[j - 1] > threshold:
+                    if j > len(doc):
+                        # fewer words in the job than terms left: score it whole
+                        score = sum(map(mul, map(query_get, doc, zeros), doc.values()))
+                        j = 0
+                        break
+                    lo = j - step if j > step else 0
+                    score += sum(map(mul, map(lookup, terms[lo:j], zeros), weights[lo:j]))
+                    j = lo
+                    step *= 2
+                if j or score <= threshold:
+                    continue
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, label))
+                    if len(heap) == k:
+                        threshold = heap[0][0]
+                else:
+                    heapq.heapreplace(heap, (score, label))
+                    threshold = heap[0][0]
+
+        return [(label, score) for score, label in sorted(heap, reverse=True)]
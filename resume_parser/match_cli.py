@@ -0,0 +1,133 @@
+"""
+match_cli.py
+
+Score a resume against one job description or a directory of them.
+
+    python match_cli.py RESUME JOBS [--top 10] [--weighting raw|tfidf|bm25] [--json] [--timing] [--memory]
+                        [--cache-dir DIR]
+
+RESUME is a .pdf or .txt file. JOBS is a .txt job description, a .json list
+of scraped jobs (like coopsearch.json), or a directory holding either.
+
+Startup is kept short: only the standard library is imported up front, the
+parser and scorer are imported inside main(), pypdf only when a PDF is
+actually read, and stopwords come from the bundled stopwords_english.txt
+instead of the NLTK corpus.
+
+--cache-dir keeps extracted PDF text on disk (see pdf_cache.py), so scoring
+the same resume again skips pypdf entirely.
+
+--memory traces allocations per stage (see memprofile.py) and prints the
+stage table and a footprint of the loaded documents to stderr.
+"""
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import json
+import os
+import sys
+
+
+def load_jobs(path):
+    """
+    Collect (label, text) pairs from a job file or directory.
+    """
+    if os.path.isdir(path):
+        jobs = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith(('.txt', '.json')):
+                jobs.extend(load_jobs(os.path.join(path, name)))
+        return jobs
+
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            records = json.load(f)
+        if isinstance(records, dict):
+            records = [records]
+        jobs = []
+        for i, job in enumerate(records):
+            label = f"{job.get('title') or 'Untitled'} - {job.get('company') or 'Unknown'} [{os.path.basename(path)}#{i}]"
+            jobs.append((label, job.get('description') or ''))
+        return jobs
+
+    with open(path, 'r') as f:
+        return [(os.path.basename(path), f.read())]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Match a resume against job descriptions")
+    ap.add_argument('resume', help="Resume file (.pdf or .txt)")
+    ap.add_argument('jobs', help="Job .txt/.json file or directory")
+    ap.add_argument('--top', type=int, default=10, help="Number of matches to show")
+    ap.add_argument('--weighting', choices=('raw', 'tfidf', 'bm25'), default='raw')
+    ap.add_argument('--json', action='store_true', help="Print results as JSON")
+    ap.add_argument('--timing', action='store_true', help="Print a startup/load/score breakdown")
+    ap.add_argument('--memory', action='store_true', help="Print per-stage memory use (slower)")
+    ap.add_argument('--cache-dir', help="Directory for cached PDF text extraction")
+    args = ap.parse_args(argv)
+
+    if args.memory:
+        from memprofile import MemoryProfiler, footprint
+        mp = MemoryProfiler().start()
+        stage = mp.stage
+    else:
+        from contextlib import nullcontext
+        stage = lambda name, documents=None: nullcontext()
+
+    t_import = time.perf_counter()
+    from resume_parser import ResumeParser
+    from sentiment_analysis import JobResumeMatchScorer
+    from inverted_index import InvertedIndex
+    t_parser = time.perf_counter()
+
+    rp = ResumeParser()
+    with stage('load resume', documents=1):
+        if args.resume.lower().endswith('.pdf'):
+            from pdf_parser import pdf_parser
+            if args.cache_dir:
+                from pdf_cache import ExtractionCache, set_default_cache
+                set_default_cache(ExtractionCache(args.cache_dir))
+            rp.load_text(args.resume, label='resume', parser=pdf_parser)
+        else:
+            rp.load_text(args.resume, label='resume')
+
+    jobs = load_jobs(args.jobs)
+    with stage('load jobs', documents=len(jobs)):
+        for label, text in jobs:
+            rp.load_text_from_string(text, label)
+    t_loaded = time.perf_counter()
+
+    scorer = JobResumeMatchScorer(rp, weighting=args.weighting)
+    with stage('index + score', documents=len(jobs)):
+        index = InvertedIndex(scorer, [label for label, _ in jobs])
+        matches = scorer.top_matches('resume', k=args.top, index=index)
+    t_scored = time.perf_counter()
+
+    if args.json:
+        print(json.dumps([{'job': label, **result} for label, result in matches], indent=2))
+    else:
+        print(f"{'Score':>6}  {'Level':<16} Job")
+        print("-" * 70)
+        for label, result in matches:
+            print(f"{result['total_score']:6.2f}  {result['match_level']:<16} {label}")
+
+    if args.timing:
+        print(f"\nstartup (interpreter + stdlib): {(t_import - _START) * 1000:8.1f} ms", file=sys.stderr)
+        print(f"import parser/scorer:           {(t_parser - t_import) * 1000:8.1f} ms", file=sys.stderr)
+        print(f"load resume + {len(jobs)} jobs:       {(t_loaded - t_parser) * 1000:8.1f} ms", file=sys.stderr)
+        print(f"index + score:                  {(t_scored - t_loaded) * 1000:8.1f} ms", file=sys.stderr)
+
+    if args.memory:
+        mp.stop()
+        print(file=sys.stderr)
+        mp.report(file=sys.stderr)
+        print("\nFootprint (bytes):", file=sys.stderr)
+        for component, size in footprint(rp, scorer).items():
+            print(f"  {component:<20} {size:>14,}" if size is not None else f"  {component:<20} {'n/a':>14}",
+                  file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
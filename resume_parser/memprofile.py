@@ -0,0 +1,188 @@
+"""
+memprofile.py
+
+Opt-in memory instrumentation for parse and score runs. tracemalloc is only
+started when a MemoryProfiler is, so normal runs pay nothing.
+
+    mp = MemoryProfiler().start()
+    with mp.stage('load resume'):
+        rp.load_text('resume.pdf', label='resume', parser=pdf_parser)
+    with mp.stage('load jobs', documents=len(jobs)):
+        for label, text in jobs:
+            rp.load_text_from_string(text, label)
+    with mp.stage('score'):
+        scorer.top_matches('resume', k=10)
+    mp.stop()
+    mp.report()
+    print(footprint(rp, scorer))
+
+Each stage records the memory still held when it ends (net), the peak
+traced during it, peak RSS so far, the top allocation sites by net growth
+and, when given a document count, bytes per document. footprint() breaks
+down what a loaded ResumeParser (and optionally a scorer) holds right now.
+"""
+from contextlib import contextmanager
+import fnmatch
+import json
+import os
+import sys
+import tracemalloc
+
+
+def peak_rss_kb():
+    """
+    Peak resident set size of this process in KiB (None where unsupported).
+    """
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss  # macOS reports bytes
+
+
+class MemoryProfiler:
+    """
+    tracemalloc snapshots taken at pipeline stage boundaries.
+    """
+
+    def __init__(self, top=10, frames=1):
+        """
+        Args:
+            top: Allocation sites kept per stage
+            frames: Stack frames tracemalloc records per allocation (1 is cheapest;
+                more attribute allocations to their callers too)
+        """
+        self.top = top
+        self.frames = frames
+        self.stages = []
+        self._started_tracing = False
+        self._filters = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        )
+        # filter_traces compiles each pattern on first use; do it before
+        # tracing starts so the compiled patterns don't show up in a stage
+        for f in self._filters:
+            fnmatch.fnmatch('', f.filename_pattern)
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        return self
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    @contextmanager
+    def stage(self, name, documents=None):
+        """
+        Measure one block of the pipeline.
+
+        Args:
+            name: Stage name for the report
+            documents: Documents loaded or scored in the stage, for bytes/document
+        """
+        if not tracemalloc.is_tracing():
+            self.start()
+        before = self._snapshot()
+        tracemalloc.reset_peak()
+        start_current, _ = tracemalloc.get_traced_memory()
+        try:
+            yield self
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = self._snapshot()
+            net = current - start_current
+            sites = [{
+                'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff,
+            } for stat in after.compare_to(before, 'lineno')[:self.top]]
+            self.stages.append({
+                'stage': name,
+                'net_bytes': net,
+                'peak_bytes': peak - start_current,
+                'traced_bytes': current,
+                'peak_rss_kb': peak_rss_kb(),
+                'documents': documents,
+                'bytes_per_document': round(net / documents, 1) if documents else None,
+                'top_sites': sites,
+            })
+
+    def to_dict(self):
+        return {'pid': os.getpid(), 'stages': self.stages}
+
+    def export_json(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report(self, file=None):
+        """ Print a stage table followed by each stage's top allocation sites """
+        file = file or sys.stdout
+        print(f"{'Stage':<24} {'Net MB':>9} {'Peak MB':>9} {'Traced MB':>10} {'RSS MB':>9} {'B/doc':>9}",
+              file=file)
+        print("-" * 75, file=file)
+        for s in self.stages:
+            rss = f"{s['peak_rss_kb'] / 1024:9.1f}" if s['peak_rss_kb'] is not None else f"{'n/a':>9}"
+            per_doc = f"{s['bytes_per_document']:9,.0f}" if s['bytes_per_document'] is not None else f"{'':>9}"
+            print(f"{s['stage'][:24]:<24} {s['net_bytes'] / 2 ** 20:9.2f} {s['peak_bytes'] / 2 ** 20:9.2f} "
+                  f"{s['traced_bytes'] / 2 ** 20:10.2f} {rss} {per_doc}", file=file)
+
+        for s in self.stages:
+            print(f"\nTop allocation sites: {s['stage']}", file=file)
+            for site in s['top_sites']:
+                print(f"  {site['size_diff'] / 1024:+10.1f} KiB {site['count_diff']:+8d} blocks  {site['site']}",
+                      file=file)
+
+
+def footprint(resume_parser, scorer=None):
+    """
+    Approximate bytes held by a loaded ResumeParser (and optionally a
+    JobResumeMatchScorer's caches), by component. Shared objects such as
+    interned term strings are counted once, under the vocabulary.
+
+    Returns:
+        Dict of component --> bytes, plus 'documents', 'total_bytes' and
+        'bytes_per_document'
+    """
+    rp = resume_parser
+    vocab = rp.vocab
+    sizes = {
+        'vocabulary': (sys.getsizeof(vocab._ids) + sys.getsizeof(vocab._terms) +
+                       sum(sys.getsizeof(term) for term in vocab.terms)),
+        'document_vectors': (sys.getsizeof(rp.documents) +
+                             sum(sys.getsizeof(label) + sys.getsizeof(doc) +
+                                 sys.getsizeof(doc.ids) + sys.getsizeof(doc.counts) +
+                                 sys.getsizeof(doc.order)
+                                 for label, doc in rp.documents.items())),
+        'corpus': sys.getsizeof(rp.corpus.doc_freq),
+        'metadata': sum(sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values.values())
+                        for key, values in rp.data.items() if key != 'wordcount'),
+    }
+
+    if scorer is not None:
+        stats_bytes = sys.getsizeof(scorer._stats_cache)
+        for stats in scorer._stats_cache.values():
+            stats_bytes += sys.getsizeof(stats) + sys.getsizeof(stats.top)
+        weighted_bytes = sys.getsizeof(scorer._weighted_cache)
+        for entry in scorer._weighted_cache.values():
+            weighted_bytes += sys.getsizeof(entry) + sys.getsizeof(entry[2])
+        sizes['scorer_stats'] = stats_bytes
+        sizes['scorer_weights'] = weighted_bytes
+
+    total = sum(sizes.values())
+    documents = len(rp.documents)
+    sizes['total_bytes'] = total
+    sizes['documents'] = documents
+    sizes['bytes_per_document'] = round(total / documents, 1) if documents else None
+    return sizes
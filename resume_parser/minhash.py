@@ -0,0 +1,200 @@
+"""
+minhash.py
+
+MinHash signatures and an LSH (banding) index for finding near-duplicate job
+postings -- the same posting under a slightly different title, search term or
+user -- without comparing every pair of descriptions.
+
+Two documents' signatures agree in each position with probability equal to
+the Jaccard similarity of their word-shingle sets. The LSH index splits
+signatures into bands and only compares documents that share a whole band,
+so a lookup touches a handful of candidates instead of the whole corpus.
+"""
+from hashlib import blake2b
+from array import array
+import random
+
+from tokenizer import normalize
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def job_text(job):
+    """
+    Text used to fingerprint a job dict: title, company and description.
+    """
+    return ' '.join(job.get(field) or '' for field in ('title', 'company', 'description'))
+
+
+def shingles(text, size=3):
+    """
+    Set of overlapping word n-grams. Short texts fall back to single words.
+    """
+    words = normalize(text).split()
+    if len(words) < size:
+        return set(words)
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    Computes fixed-length MinHash signatures from text.
+    """
+
+    def __init__(self, num_perm=128, shingle_size=3, seed=1):
+        """
+        Args:
+            num_perm: Signature length (more = more accurate, slower)
+            shingle_size: Words per shingle
+            seed: Seed for the hash permutations; signatures are only
+                comparable between hashers with the same settings
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.perms = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                      for _ in range(num_perm)]
+
+    def signature(self, text):
+        """
+        MinHash signature of a text.
+
+        Returns:
+            array('Q') of num_perm values, or None if the text has no words
+        """
+        items = shingles(text, self.shingle_size)
+        if not items:
+            return None
+
+        prime = MERSENNE_PRIME
+        hashes = [int.from_bytes(blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little') & prime
+                  for item in items]
+        # one universal hash (a * h + b) mod p per permutation; keep the minimum
+        return array('Q', [min([(a * h + b) % prime for h in hashes])
+                           for a, b in self.perms])
+
+    @staticmethod
+    def jaccard(sig1, sig2):
+        """
+        Estimated Jaccard similarity of two signatures.
+        """
+        return sum(1 for x, y in zip(sig1, sig2) if x == y) / len(sig1)
+
+
+def optimal_bands(num_perm, threshold):
+    """
+    Pick (bands, rows) with bands * rows <= num_perm whose S-curve midpoint
+    (1 / bands) ** (1 / rows) is closest to the similarity threshold.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        error = abs(midpoint - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class LSHIndex:
+    """
+    Banded LSH index over MinHash signatures.
+    """
+
+    def __init__(self, num_perm=128, threshold=0.8):
+        """
+        Args:
+            num_perm: Signature length (must match the MinHasher)
+            threshold: Estimated Jaccard similarity at or above which two
+                documents count as near-duplicates
+        """
+        self.threshold = threshold
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+        self.buckets = [{} for _ in range(self.bands)]  # per band: band hash --> set of keys
+        self.signatures = {}  # key --> signature
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, key):
+        return key in self.signatures
+
+    def _band_keys(self, sig):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, sig[band * rows:(band + 1) * rows].tobytes()
+
+    def add(self, key, sig):
+        """
+        Index a signature under a key (replacing any earlier one).
+        """
+        if key in self.signatures:
+            self.remove(key)
+        self.signatures[key] = sig
+        for band, band_key in self._band_keys(sig):
+            self.buckets[band].setdefault(band_key, set()).add(key)
+
+    def remove(self, key):
+        sig = self.signatures.pop(key)
+        for band, band_key in self._band_keys(sig):
+            bucket = self.buckets[band][band_key]
+            bucket.discard(key)
+            if not bucket:
+                del self.buckets[band][band_key]
+
+    def candidates(self, sig):
+        """
+        Keys sharing at least one band with the signature (may include false
+        positives; never compares against the whole index).
+        """
+        found = set()
+        for band, band_key in self._band_keys(sig):
+            found.update(self.buckets[band].get(band_key, ()))
+        return found
+
+    def query(self, sig, threshold=None):
+        """
+        Approximate Jaccard neighbours of a signature.
+
+        Returns:
+            List of (key, estimated similarity) at or above the threshold,
+            most similar first
+        """
+        threshold = self.threshold if threshold is None else threshold
+        matches = []
+        for key in self.candidates(sig):
+            similarity = MinHasher.jaccard(sig, self.signatures[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda item: item[1], reverse=True)
+        return matches
+
+
+def collapse_duplicates(items, text_of=job_text, hasher=None, threshold=0.8):
+    """
+    Collapse near-duplicate items, keeping the first of each group.
+
+    Args:
+        items: Iterable of items (e.g. scraped job dicts)
+        text_of: Function giving the text to fingerprint for an item
+        hasher: MinHasher to use (default: a new one with default settings)
+        threshold: Estimated Jaccard similarity that counts as a duplicate
+
+    Returns:
+        (kept items, {index of dropped item: index of the item it duplicates})
+    """
+    hasher = hasher or MinHasher()
+    index = LSHIndex(hasher.num_perm, threshold)
+    kept, duplicates = [], {}
+
+    for i, item in enumerate(items):
+        sig = hasher.signature(text_of(item))
+        if sig is not None:
+            matches = index.query(sig)
+            if matches:
+                duplicates[i] = matches[0][0]
+                continue
+            index.add(i, sig)
+        kept.append(item)
+
+    return kept, duplicates
@@ -0,0 +1,201 @@
+"""
+pdf_cache.py
+
+Content-addressed cache for PDF text extraction. Entries are keyed by the
+SHA-256 of the file bytes, so a renamed or re-uploaded copy of the same resume
+still hits, and an edited resume never returns stale text.
+
+Each entry holds the extracted text plus token counts per stopword set. Entries
+live in memory (LRU, bounded by max_entries) and optionally on disk as one JSON
+file per digest so they survive restarts.
+
+pdf_parser uses the process-wide default_cache() unless it is handed another
+cache; set_default_cache() swaps in a disk-backed one (match_cli --cache-dir).
+"""
+from collections import Counter, OrderedDict
+import hashlib
+import json
+import os
+import threading
+
+READ_BLOCK = 1 << 20
+
+
+def stopwords_key(stopwords):
+    """
+    Stable key for a stopword set (token counts depend on it).
+    """
+    if not stopwords:
+        return 'none'
+    joined = '\n'.join(sorted(stopwords)).encode('utf-8')
+    return hashlib.sha1(joined).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Two-level (memory LRU + disk) cache of extracted PDF text and token counts.
+    """
+
+    def __init__(self, cache_dir=None, max_entries=128):
+        """
+        Args:
+            cache_dir: Directory for persistent entries (None = memory only)
+            max_entries: Maximum entries kept in memory before LRU eviction
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._memory = OrderedDict()  # digest --> entry
+        self._digests = OrderedDict()  # (path, mtime_ns, size) --> digest, LRU like _memory
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def file_digest(filename):
+        """
+        SHA-256 hex digest of a file's contents.
+        """
+        h = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(READ_BLOCK), b''):
+                h.update(block)
+        return h.hexdigest()
+
+    def digest(self, filename):
+        """
+        Content digest of a file, memoized on (path, mtime, size) so an
+        unchanged file is not re-hashed.
+        """
+        st = os.stat(filename)
+        stat_key = (os.path.abspath(filename), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            digest = self._digests.get(stat_key)
+            if digest is not None:
+                self._digests.move_to_end(stat_key)
+                return digest
+
+        digest = self.file_digest(filename)
+        with self._lock:
+            self._digests[stat_key] = digest
+            while len(self._digests) > self.max_entries:
+                self._digests.popitem(last=False)
+        return digest
+
+    def _path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, digest):
+        """
+        Look up an entry: memory first, then disk.
+
+        Returns:
+            dict {'text': str, 'counts': {stopwords_key: results}} or None
+        """
+        with self._lock:
+            entry = self._memory.get(digest)
+            if entry is not None:
+                self._memory.move_to_end(digest)
+                return entry
+
+        if not self.cache_dir:
+            return None
+
+        try:
+            with open(self._path(digest), 'r') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        entry = {
+            'text': raw['text'],
+            'counts': {key: {'wordcount': Counter(res['wordcount']),
+                             'numwords': res['numwords']}
+                       for key, res in raw['counts'].items()}
+        }
+        self._remember(digest, entry)
+        return entry
+
+    def put(self, digest, text, key=None, results=None):
+        """
+        Store extracted text and (optionally) token counts for one stopword set.
+        """
+        entry = self.get(digest) or {'text': text, 'counts': {}}
+        if key is not None and results is not None:
+            entry['counts'][key] = results
+        self._remember(digest, entry)
+
+        if self.cache_dir:
+            # write to a temp file then rename so readers never see half an entry
+            path = self._path(digest)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump({'text': entry['text'],
+                           'counts': {k: {'wordcount': dict(res['wordcount']),
+                                          'numwords': res['numwords']}
+                                      for k, res in entry['counts'].items()}}, f)
+            os.replace(tmp, path)
+
+    def _remember(self, digest, entry):
+        with self._lock:
+            self._memory[digest] = entry
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def count(self, hit):
+        """
+        Record one lookup as a hit or a miss.
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self):
+        """
+        Drop all in-memory entries (disk entries are kept).
+        """
+        with self._lock:
+            self._memory.clear()
+            self._digests.clear()
+
+    def stats(self):
+        """
+        Hit/miss counters and current memory size.
+        """
+        with self._lock:
+            hits, misses, entries = self.hits, self.misses, len(self._memory)
+        total = hits + misses
+        return {'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / total if total else 0.0,
+                'entries_in_memory': entries}
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """
+    Process-wide cache used by pdf_parser (memory only until replaced).
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ExtractionCache()
+        return _default_cache
+
+
+def set_default_cache(cache):
+    """
+    Replace the process-wide cache, e.g. with a disk-backed one. Passing None
+    resets it to a fresh in-memory cache on next use.
+    """
+    global _default_cache
+    with _default_lock:
+        _default_cache = cache
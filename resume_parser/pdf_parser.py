@@ -1,42 +1,132 @@
-import json
-import string
-import re
 from collections import Counter
-from pypdf import PdfReader
+from pdf_cache import default_cache, stopwords_key
+from tokenizer import Tokenizer
 
-def pdf_parser(filename, stopwords=None):
+
+def _pdf_reader(filename):
+    # pypdf is imported on first use so importing this module stays cheap
+    from pypdf import PdfReader
+    return PdfReader(filename)
+
+
+def extract_text(filename):
+    """
+    Extract the text of every page of a PDF, one page per line block.
+    """
+    reader = _pdf_reader(filename)
+
+    # join once instead of repeated += (which is quadratic in document size)
+    return "\n".join(page.extract_text() for page in reader.pages)
+
+
+def iter_pages(filename):
+    """
+    Yield the text of each page in turn, so only one page is held at a time.
+    """
+    reader = _pdf_reader(filename)
+    for page in reader.pages:
+        yield page.extract_text() + "\n"
+
+
+def pdf_parser(filename, stopwords=None, cache=None):
     """
         Parse PDF file and extract word counts from all pages.
 
         Args:
             filename (str): Path to PDF file
             stopwords (set): Optional set of words to filter out
+            cache (ExtractionCache): Content-addressed cache; an unchanged
+                file is never re-opened or re-tokenized. None uses
+                pdf_cache.default_cache(), False disables caching.
 
         Returns:
             dict: {'wordcount': Counter object, 'numwords': int}
         """
-    # open/read PDF file
-    reader = PdfReader(filename)
+    if cache is False:
+        # clean, filter and count (shared pipeline in tokenizer.py)
+        return Tokenizer(stopwords).count(extract_text(filename))
+    if cache is None:
+        cache = default_cache()
+
+    digest = cache.digest(filename)
+    key = stopwords_key(stopwords)
+    entry = cache.get(digest)
+
+    if entry is not None and key in entry['counts']:
+        cache.count(hit=True)
+        cached = entry['counts'][key]
+        return {'wordcount': Counter(cached['wordcount']),
+                'numwords': cached['numwords']}
+
+    cache.count(hit=False)
+    text = entry['text'] if entry is not None else extract_text(filename)
+    results = Tokenizer(stopwords).count(text)
+    cache.put(digest, text, key, {'wordcount': Counter(results['wordcount']),
+                                  'numwords': results['numwords']})
+    return results
+
+
+# worker-process state for parallel extraction (set by _init_worker)
+_worker_reader = None
+_worker_tokenizer = None
+
 
-    # extract text from all pages
-    text = ""  # Start with empty string
-    for page in reader.pages:  # Loop through each page
-        text += page.extract_text()  # Add each page's text
+def _init_worker(filename, stopwords):
+    """
+    Open the PDF once per worker process instead of once per task.
+    """
+    global _worker_reader, _worker_tokenizer
+    _worker_reader = _pdf_reader(filename)
+    _worker_tokenizer = Tokenizer(stopwords)
+
+
+def _count_pages(page_range):
+    """
+    Count a range of pages inside a worker, one page at a time.
+    """
+    start, stop = page_range
+    counts = Counter()
+    for i in range(start, stop):
+        counts.update(_worker_tokenizer.tokenize(_worker_reader.pages[i].extract_text()))
+    return counts
+
+
+def pdf_parser_streaming(filename, stopwords=None, workers=None,
+                         min_pages_for_pool=16, pages_per_task=4):
+    """
+        Parse a PDF page by page, counting each page into a running Counter as
+        it is extracted, so peak memory is bounded by one page of text rather
+        than the whole document. Drop-in replacement for pdf_parser.
+
+        Args:
+            filename (str): Path to PDF file
+            stopwords (set): Optional set of words to filter out
+            workers (int): Fan pages out to this many processes (None = serial)
+            min_pages_for_pool (int): Smaller documents always run serially,
+                since process start-up would cost more than it saves
+            pages_per_task (int): Pages handed to a worker per task
+
+        Returns:
+            dict: {'wordcount': Counter object, 'numwords': int}
+        """
+    tokenizer = Tokenizer(stopwords)
 
-    # clean text
-    text = text.lower()
-    text = text.translate(str.maketrans('', '', string.punctuation))
+    if workers is None or workers < 2:
+        return tokenizer.count_stream(iter_pages(filename))
 
-    words = text.split()
+    num_pages = len(_pdf_reader(filename).pages)
+    if num_pages < min_pages_for_pool:
+        return tokenizer.count_stream(iter_pages(filename))
 
+    ranges = [(start, min(start + pages_per_task, num_pages))
+              for start in range(0, num_pages, pages_per_task)]
 
-    # filter stopwords if provided
-    if stopwords:
-        words = [word for word in words
-                 if word not in stopwords
-                 and len(word) > 2
-                 and not any(char.isdigit() for char in word)]
+    from concurrent.futures import ProcessPoolExecutor  # lazy: ~25 ms to import
+    counts = Counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(filename, stopwords)) as pool:
+        for page_counts in pool.map(_count_pages, ranges):
+            counts.update(page_counts)
 
-        # return in dict format
-    return {'wordcount': Counter(words),
-            'numwords': len(words)}
+    return {'wordcount': counts,
+            'numwords': sum(counts.values())}
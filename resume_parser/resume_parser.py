@@ -1,7 +1,92 @@
-from collections import Counter, defaultdict
-from nltk.corpus import stopwords
+from array import array
+from collections import defaultdict
+from functools import wraps
 from pdf_parser import pdf_parser
-import string
+from document_store import CorpusStats, DocumentVector, Vocabulary, WordcountView
+from tokenizer import Tokenizer
+import os
+import time
+import weakref
+
+# Span profiler for @profile'd calls, installed with set_profiler()
+_span = None
+
+
+def set_profiler(span):
+    """
+    Time the parser's and scorer's @profile'd calls with a span profiler,
+    e.g. set_profiler(Profiler.span) with scraper/profiler.py. span(name)
+    must return a context manager. None turns profiling off again.
+    """
+    global _span
+    _span = span
+
+
+def profile(f=None, name=None):
+    """
+    Mark a function for profiling; also works as @profile(name="custom name").
+    Calls run unwrapped until set_profiler() installs a profiler.
+    """
+    if f is None:
+        return lambda func: profile(func, name)
+    fname = name or f.__qualname__
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if _span is None:
+            return f(*args, **kwargs)
+        with _span(fname):
+            return f(*args, **kwargs)
+
+    return wrapper
+
+
+# Frozen copy of NLTK's English stopword list, so constructing a ResumeParser
+# does not need to import nltk or read its corpus
+STOPWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stopwords_english.txt')
+
+
+# worker-process state for load_many (set by _init_worker)
+_worker_stopwords = None
+
+
+def _init_worker(sw):
+    """
+    Ship the stopword set to each worker once instead of with every task.
+    """
+    global _worker_stopwords
+    _worker_stopwords = sw
+
+
+# separates the words of a packed wordcount (tokens never contain it)
+_WORD_SEP = '\0'
+
+
+def _parse_entry(entry):
+    """
+    Parse one (label, source, parser) entry. A parser of None means source is
+    raw text (e.g. a job description from the database).
+
+    The wordcount comes back packed (see _pack_results), so the parent only
+    has to split one string and intern the words.
+    """
+    label, source, parser = entry
+    if parser is None:
+        results = Tokenizer(_worker_stopwords).count(source)
+    else:
+        results = parser(source, _worker_stopwords)
+    return label, _pack_results(results)
+
+
+def _pack_results(results):
+    """
+    Parser results with the wordcount Counter replaced by its words joined
+    into one string (first-occurrence order) and an array of their counts,
+    which pickle and unpickle far faster than a dict of small objects.
+    """
+    results = dict(results)
+    counter = results.pop('wordcount')
+    return _WORD_SEP.join(counter), array('I', counter.values()), results
 
 
 class ResumeParser:
@@ -12,9 +97,15 @@ class ResumeParser:
     @staticmethod
     def load_stop_words(stopfile):
         """
-        Load default stopwords from NLTK and optionally from a custom file
+        Load default stopwords (the bundled frozen NLTK list, or NLTK itself if
+        that file is missing) and optionally from a custom file
         """
-        sw = set(stopwords.words('english'))
+        if os.path.exists(STOPWORDS_FILE):
+            with open(STOPWORDS_FILE, 'r') as f:
+                sw = set(f.read().split())
+        else:
+            from nltk.corpus import stopwords
+            sw = set(stopwords.words('english'))
         if stopfile:
             with open(stopfile, 'r') as f:
                 sw.update(line.strip().lower() for line in f)
@@ -26,31 +117,25 @@ class ResumeParser:
         """
         self.data = defaultdict(dict)
         self.stopwords = self.load_stop_words(stopfile)
+        self.tokenizer = Tokenizer(self.stopwords)
+
+        # word counts are kept compactly: one shared vocabulary plus
+        # sorted id/count arrays per document (see document_store.py)
+        self.vocab = Vocabulary()
+        self.documents = {}
+        self.corpus = CorpusStats()  # document frequencies for TF-IDF / BM25
+        self.data['wordcount'] = WordcountView(self.documents, self.vocab, self.corpus,
+                                               on_change=self._forget)
+        self._caches = weakref.WeakSet()  # per-label caches to clear (see register_cache)
 
     @staticmethod
     def default_parser(filename, stopwords=None):
         """
         Parser for .txt files: lowercase, remove punctuation, split, filter, count.
         """
-        with open(filename, 'r') as file:
-            text = file.read().lower()
-
-        text = text.translate(str.maketrans('', '', string.punctuation))
-        words = text.split()
-
-        if stopwords:
-            words = [
-                w for w in words
-                if w not in stopwords
-                   and len(w) > 2
-                   and not any(ch.isdigit() for ch in w)
-            ]
-
-        return {
-            "wordcount": Counter(words),
-            "numwords": len(words)
-        }
+        return Tokenizer(stopwords).count_file(filename)
 
+    @profile
     def load_text(self, filename, label=None, parser=None):
         """
         Load a file, parse it, and store wordcount + metadata.
@@ -68,9 +153,9 @@ class ResumeParser:
         if label is None:
             label = filename
 
-        for key, value in results.items():
-            self.data[key][label] = value
+        self._store(label, results)
 
+    @profile
     def load_text_from_string(self, text, label):
         """
         Load text directly from a string instead of a file.
@@ -80,25 +165,111 @@ class ResumeParser:
             text: The text content to parse
             label: Label for this document
         """
-        text = text.lower()
-        text = text.translate(str.maketrans('', '', string.punctuation))
-        words = text.split()
+        results = self.tokenizer.count(text)
+        self._store(label, results)
+
+    @profile
+    def load_many(self, entries, workers=None, chunksize=16, progress=None):
+        """
+        Parse many documents across a process pool and store them all.
+
+        Args:
+            entries: Iterable of (label, source, parser) tuples. source is a file
+                path handed to parser, or raw text when parser is None. Parsers
+                must be picklable (module-level functions like pdf_parser).
+            workers: Number of processes (default: CPU count; 1 = in-process)
+            chunksize: Entries sent to a worker per round trip
+            progress: Optional callback progress(done, total, elapsed_sec)
+
+        Returns:
+            Dict with documents loaded, elapsed seconds and documents/sec
+        """
+        entries = list(entries)
+        total = len(entries)
+        workers = workers or os.cpu_count() or 1
+        start = time.perf_counter()
 
-        words = [
-            w for w in words
-            if w not in self.stopwords
-               and len(w) > 2
-               and not any(ch.isdigit() for ch in w)
-        ]
+        if workers == 1 or total <= chunksize:
+            _init_worker(self.stopwords)
+            parsed = map(_parse_entry, entries)
+            pool = None
+        else:
+            from concurrent.futures import ProcessPoolExecutor  # lazy: ~25 ms to import
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(self.stopwords,))
+            parsed = pool.map(_parse_entry, entries, chunksize=chunksize)
 
-        results = {
-            "wordcount": Counter(words),
-            "numwords": len(words)
+        try:
+            for done, (label, packed) in enumerate(parsed, start=1):
+                self._store_packed(label, packed)
+                if progress is not None:
+                    progress(done, total, time.perf_counter() - start)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - start
+        return {
+            'documents': total,
+            'seconds': round(elapsed, 4),
+            'docs_per_sec': round(total / elapsed, 2) if elapsed > 0 else 0.0
         }
 
+    def _store(self, label, results):
+        """
+        Save parser results under a label. The 'wordcount' Counter is encoded
+        into the compact document store, everything else goes into self.data.
+        """
         for key, value in results.items():
             self.data[key][label] = value
 
+    def _store_packed(self, label, packed):
+        """
+        Save results from _parse_entry: the words are interned straight into
+        the compact store without building a Counter.
+        """
+        words, counts, results = packed
+        words = words.split(_WORD_SEP) if words else []
+        self.data['wordcount'].put(label, DocumentVector.from_terms(words, counts, self.vocab))
+        self._store(label, results)
+
+    def register_cache(self, cache):
+        """
+        Have cache.forget(label) called whenever a label is loaded, reloaded
+        or removed, so caches keyed by label (e.g. a scorer's) neither serve
+        stale entries nor keep removed documents alive. Held weakly.
+        """
+        self._caches.add(cache)
+
+    def _forget(self, label):
+        for cache in list(self._caches):
+            cache.forget(label)
+
+    def remove(self, label):
+        """
+        Unload a document (e.g. a job posting that was taken down).
+        """
+        if label not in self.documents:
+            raise ValueError(f"Label '{label}' not found in loaded documents")
+
+        for values in self.data.values():
+            values.pop(label, None)
+
+    def get_document(self, label):
+        """
+        Get the compact DocumentVector (sorted term ids + counts) for a label.
+        """
+        if label not in self.documents:
+            raise ValueError(f"Label '{label}' not found in loaded documents")
+
+        return self.documents[label]
+
+    def get_wordcount(self, label):
+        """
+        Get a document's word counts decoded into a Counter of word strings.
+        """
+        return self.get_document(label).to_counter(self.vocab)
+
     def get_top_words(self, label, n=10):
         """
         Get the top N most common words from a document.
@@ -110,10 +281,7 @@ class ResumeParser:
         Returns:
             List of (word, count) tuples
         """
-        if label not in self.data['wordcount']:
-            raise ValueError(f"Label '{label}' not found in loaded documents")
-
-        return self.data['wordcount'][label].most_common(n)
+        return self.get_document(label).most_common(self.vocab, n)
 
     def get_document_stats(self, label):
         """
@@ -122,12 +290,11 @@ class ResumeParser:
         Returns:
             Dict with total words, unique words, and top words
         """
-        if label not in self.data['wordcount']:
-            raise ValueError(f"Label '{label}' not found in loaded documents")
+        document = self.get_document(label)
 
         return {
             'total_words': self.data['numwords'][label],
-            'unique_words': len(self.data['wordcount'][label]),
+            'unique_words': len(document),
             'top_10_words': self.get_top_words(label, 10)
         }
 
@@ -0,0 +1,142 @@
+"""
+score_matrix.py
+
+Score a cohort of M resumes against N jobs in one blocked computation instead
+of M x N calculate_match_score calls.
+
+Jobs are processed in blocks. For each block a small term --> [(job, weight)]
+postings table is built, and every resume accumulates scores only for the jobs
+in the block that share a word with it. Only one block of postings plus the
+running top-k heaps are held at once, so memory is bounded by job_block and k,
+not by M x N. Blocks can be spread over a process pool; each worker receives
+the resume vectors once and then one job block per task.
+
+Scores are the scorer's weighted similarity (see compute_weighted_similarity).
+"""
+import heapq
+
+# worker-process state (set by _init_worker)
+_worker_resumes = None
+_worker_k = None
+
+
+def _push(heap, k, item):
+    """
+    Keep the k largest items in a min-heap.
+    """
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+def _score_job_block(job_block, resumes, k):
+    """
+    Score every resume against one block of jobs.
+
+    Args:
+        job_block: List of (job_label, {term: weight}) pairs
+        resumes: List of (resume_label, {term: weight}) pairs
+        k: Heap size
+
+    Returns:
+        (resume_heaps, job_heaps): per-resume top-k jobs within this block and
+        per-job top-k resumes (complete, since every resume was scored)
+    """
+    labels = [label for label, _ in job_block]
+    postings = {}
+    for j, (_, weights) in enumerate(job_block):
+        for term, w in weights.items():
+            postings.setdefault(term, []).append((j, w))
+
+    resume_heaps = {}
+    job_heaps = [[] for _ in job_block]
+    for resume_label, query in resumes:
+        scores = {}
+        for term, q in query.items():
+            posting = postings.get(term)
+            if posting is not None:
+                for j, w in posting:
+                    scores[j] = scores.get(j, 0.0) + q * w
+
+        heap = []
+        for j, score in scores.items():
+            _push(heap, k, (score, labels[j]))
+            _push(job_heaps[j], k, (score, resume_label))
+        resume_heaps[resume_label] = heap
+
+    return resume_heaps, dict(zip(labels, job_heaps))
+
+
+def _init_worker(resumes, k):
+    global _worker_resumes, _worker_k
+    _worker_resumes = resumes
+    _worker_k = k
+
+
+def _score_job_block_in_worker(job_block):
+    return _score_job_block(job_block, _worker_resumes, _worker_k)
+
+
+def score_matrix(scorer, resume_labels, job_labels, k=10, job_block=512, workers=None):
+    """
+    Top-k jobs per resume and top-k resumes per job.
+
+    Args:
+        scorer: JobResumeMatchScorer holding the loaded documents
+        resume_labels: Labels of the resumes (M)
+        job_labels: Labels of the jobs (N)
+        k: Results kept per resume and per job
+        job_block: Jobs scored per block; bounds the postings held in memory
+        workers: Process count for spreading blocks (None or 1 = in-process)
+
+    Returns:
+        Dict with:
+            - 'resume_top': {resume_label: [(job_label, similarity)]}, best first
+            - 'job_top': {job_label: [(resume_label, similarity)]}, best first
+    """
+    resumes = [(label, scorer.query_weights(label)) for label in resume_labels]
+    job_labels = list(job_labels)
+
+    def blocks():
+        # job vectors are built one block at a time
+        for start in range(0, len(job_labels), job_block):
+            yield [(label, scorer.document_weights(label))
+                   for label in job_labels[start:start + job_block]]
+
+    resume_heaps = {label: [] for label, _ in resumes}
+    job_heaps = {}
+
+    def merge(result):
+        block_resume_heaps, block_job_heaps = result
+        for label, heap in block_resume_heaps.items():
+            target = resume_heaps[label]
+            for item in heap:
+                _push(target, k, item)
+        job_heaps.update(block_job_heaps)
+
+    if workers is None or workers < 2 or len(job_labels) <= job_block:
+        for block in blocks():
+            merge(_score_job_block(block, resumes, k))
+    else:
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(resumes, k)) as pool:
+            # at most two blocks per worker in flight keeps memory bounded
+            pending = set()
+            for block in blocks():
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        merge(future.result())
+                pending.add(pool.submit(_score_job_block_in_worker, block))
+            for future in pending:
+                merge(future.result())
+
+    def ranked(heap):
+        return [(label, score) for score, label in sorted(heap, reverse=True)]
+
+    return {
+        'resume_top': {label: ranked(heap) for label, heap in resume_heaps.items()},
+        'job_top': {label: ranked(job_heaps.get(label, [])) for label in job_labels}
+    }
@@ -1,5 +1,29 @@
+from array import array
+from itertools import repeat
+from operator import mul
 import math
-from resume_parser import ResumeParser
+from resume_parser import ResumeParser, profile
+
+# Most frequent words remembered per document. Keyword coverage, missing
+# keywords and skill gap reports look at no more than this by default; larger
+# windows are ranked from the document on demand.
+TOP_KEYWORDS = 100
+
+
+class DocumentStats:
+    """
+    Per-document values the scorer needs for every pair, computed once.
+    Counts are read from the DocumentVector itself, not copied.
+    """
+
+    __slots__ = ('document', 'norm', 'top')
+
+    def __init__(self, document):
+        self.document = document  # the DocumentVector these stats were built from
+        self.norm = math.sqrt(sum(count * count for count in document.counts))
+        # ids of the TOP_KEYWORDS most frequent words, highest count first
+        # (ties in document order)
+        self.top = array('I', [term_id for term_id, _ in document.ranked(TOP_KEYWORDS)])
 
 
 class JobResumeMatchScorer:
@@ -8,14 +32,96 @@ class JobResumeMatchScorer:
     Provides multiple scoring metrics to evaluate how well a resume matches a job.
     """
 
-    def __init__(self, resume_parser):
+    WEIGHTINGS = ('raw', 'tfidf', 'bm25')
+
+    def __init__(self, resume_parser, weighting='raw', k1=1.5, b=0.75):
         """
         Initialize with a ResumeParser instance that has loaded documents.
 
         Args:
             resume_parser: Instance of ResumeParser with loaded documents
+            weighting: How words are weighted in the similarity part of the
+                match score: 'raw' counts (cosine), 'tfidf' (cosine over
+                count * idf) or 'bm25' (cosine over BM25 term weights).
+                IDF comes from the parser's incrementally maintained corpus.
+            k1, b: BM25 term-frequency saturation and length normalization
         """
+        if weighting not in self.WEIGHTINGS:
+            raise ValueError(f"weighting must be one of {self.WEIGHTINGS}, got '{weighting}'")
+
         self.parser = resume_parser
+        self.weighting = weighting
+        self.k1 = k1
+        self.b = b
+        self._stats_cache = {}  # label --> DocumentStats
+        self._weighted_cache = {}  # label --> (document, corpus version, weights, norm)
+        # (label, document, weights, term id --> weight) for the last label
+        # looked up; a run scores one resume against many jobs
+        self._lookup_cache = None
+        resume_parser.register_cache(self)
+
+    def forget(self, label):
+        """
+        Drop cached values for a label (called by the parser when the label
+        is loaded, reloaded or removed).
+        """
+        self._stats_cache.pop(label, None)
+        self._weighted_cache.pop(label, None)
+        if self._lookup_cache is not None and self._lookup_cache[0] == label:
+            self._lookup_cache = None
+
+    def _stats(self, label):
+        """
+        Cached DocumentStats for a label.
+        """
+        stats = self._stats_cache.get(label)
+        if stats is None:
+            stats = self._stats_cache[label] = DocumentStats(self.parser.get_document(label))
+        return stats
+
+    def _lookup(self, label, weights=None):
+        """
+        Dict of term id --> weight for one side of a pair, kept for the last
+        label only so that side is hashed once per run rather than per pair.
+
+        Args:
+            weights: Weights aligned with the document's ids (default: its
+                counts). Callers that only test membership leave it out and
+                get whichever weights are cached.
+        """
+        document = self.parser.get_document(label)
+        cached = self._lookup_cache
+        if (cached is None or cached[0] != label or cached[1] is not document or
+                (weights is not None and cached[2] is not weights)):
+            weights = document.counts if weights is None else weights
+            cached = self._lookup_cache = (label, document, weights, dict(zip(document.ids, weights)))
+        return cached[3]
+
+    def _top_ids(self, label, n):
+        """
+        Ids of a document's n most frequent words, highest count first.
+        """
+        stats = self._stats(label)
+        if n <= len(stats.top) or len(stats.top) == len(stats.document):
+            return stats.top[:n]
+        return [term_id for term_id, _ in stats.document.ranked(n)]
+
+    def _ranked_ids(self, label):
+        """
+        Iterate all of a document's word ids, highest count first.
+        """
+        stats = self._stats(label)
+        yield from stats.top
+        if len(stats.top) < len(stats.document):
+            for term_id, _ in stats.document.ranked()[len(stats.top):]:
+                yield term_id
+
+    def precompute(self, labels=None):
+        """
+        Build cached statistics up front (default: every loaded document).
+        """
+        for label in (self.parser.documents if labels is None else labels):
+            self._stats(label)
 
     def compute_cosine_similarity(self, label1, label2):
         """
@@ -28,25 +134,110 @@ class JobResumeMatchScorer:
         if label1 not in self.parser.data['wordcount'] or label2 not in self.parser.data['wordcount']:
             raise ValueError(f"Labels '{label1}' or '{label2}' not found in loaded documents")
 
-        counter1 = self.parser.data['wordcount'][label1]
-        counter2 = self.parser.data['wordcount'][label2]
+        stats1 = self._stats(label1)
+        stats2 = self._stats(label2)
 
-        # Get all unique words from both documents
-        all_words = set(counter1.keys()) | set(counter2.keys())
-
-        # Calculate dot product
-        dot_product = sum(counter1.get(word, 0) * counter2.get(word, 0) for word in all_words)
-
-        # Calculate magnitudes
-        magnitude1 = math.sqrt(sum(count ** 2 for count in counter1.values()))
-        magnitude2 = math.sqrt(sum(count ** 2 for count in counter2.values()))
+        # Magnitudes are cached per document
+        magnitude1 = stats1.norm
+        magnitude2 = stats2.norm
 
         # Avoid division by zero
         if magnitude1 == 0 or magnitude2 == 0:
             return 0.0
 
+        # Calculate dot product over the words the documents share
+        counts1 = self._lookup(label1, stats1.document.counts)
+        doc2 = stats2.document
+        dot_product = sum(map(mul, doc2.counts, map(counts1.get, doc2.ids, repeat(0))))
+
         return dot_product / (magnitude1 * magnitude2)
 
+    @profile
+    def vector(self, label):
+        """
+        Term weights and norm for a label under the configured weighting.
+
+        Returns:
+            (document, weights, norm): the label's DocumentVector, its weights
+            as a sequence aligned with document.ids (the counts themselves
+            for 'raw'), and the norm. 'tfidf' and 'bm25' weights are cached
+            until the label is reloaded or the corpus changes.
+
+        The norm is the L2 norm of the weights. For 'bm25' the weights are
+        the BM25 term scores (idf * saturated, length-normalized count), so
+        two documents score 1.0 when their term scores are proportional.
+        """
+        if self.weighting == 'raw':
+            stats = self._stats(label)
+            return stats.document, stats.document.counts, stats.norm
+
+        document = self.parser.get_document(label)
+        corpus = self.parser.corpus
+        cached = self._weighted_cache.get(label)
+        if cached is not None and cached[0] is document and cached[1] == corpus.version:
+            return document, cached[2], cached[3]
+
+        if self.weighting == 'tfidf':
+            idf = corpus.idf
+            weights = array('d', [count * idf(term) for term, count in document.items()])
+            norm = math.sqrt(sum(w * w for w in weights))
+        else:
+            idf = corpus.bm25_idf
+            k1 = self.k1
+            avgdl = corpus.avg_length() or 1.0
+            length_norm = k1 * (1 - self.b + self.b * document.total() / avgdl)
+            weights = array('d', [idf(term) * count * (k1 + 1) / (count + length_norm)
+                                  for term, count in document.items()])
+            norm = math.sqrt(sum(w * w for w in weights))
+
+        self._weighted_cache[label] = (document, corpus.version, weights, norm)
+        return document, weights, norm
+
+    def document_weights(self, label):
+        """
+        Job-side weights (term id --> weight) such that the weighted
+        similarity of a resume and a job is the sum over shared terms of
+        query weight * document weight.
+        """
+        document, weights, norm = self.vector(label)
+        if norm == 0:
+            return {}
+        return {term: w / norm for term, w in zip(document.ids, weights)}
+
+    def query_weights(self, label):
+        """
+        Resume-side counterpart of document_weights.
+        """
+        document, weights, norm = self.vector(label)
+        if norm == 0:
+            return {}
+        return {term: w / norm for term, w in zip(document.ids, weights)}
+
+    def compute_weighted_similarity(self, resume_label, job_label):
+        """
+        Similarity under the scorer's weighting: plain cosine for 'raw',
+        cosine over TF-IDF vectors for 'tfidf' and over BM25 term weights
+        for 'bm25'.
+
+        Returns:
+            Float between 0 and 1.
+        """
+        if self.weighting == 'raw':
+            return self.compute_cosine_similarity(resume_label, job_label)
+
+        if resume_label not in self.parser.data['wordcount'] or job_label not in self.parser.data['wordcount']:
+            raise ValueError(f"Labels '{resume_label}' or '{job_label}' not found in loaded documents")
+
+        _, resume_weights, resume_norm = self.vector(resume_label)
+        job, job_weights, job_norm = self.vector(job_label)
+        resume_words = self._lookup(resume_label, resume_weights)
+
+        if resume_norm == 0 or job_norm == 0:
+            return 0.0
+
+        dot_product = sum(map(mul, job_weights, map(resume_words.get, job.ids, repeat(0.0))))
+        return dot_product / (resume_norm * job_norm)
+
     def compute_jaccard_similarity(self, label1, label2):
         """
         Calculate Jaccard similarity between two documents (unique words overlap).
@@ -58,11 +249,12 @@ class JobResumeMatchScorer:
         if label1 not in self.parser.data['wordcount'] or label2 not in self.parser.data['wordcount']:
             raise ValueError(f"Labels '{label1}' or '{label2}' not found in loaded documents")
 
-        words1 = set(self.parser.data['wordcount'][label1].keys())
-        words2 = set(self.parser.data['wordcount'][label2].keys())
+        doc1 = self.parser.get_document(label1)
+        doc2 = self.parser.get_document(label2)
 
-        intersection = len(words1 & words2)
-        union = len(words1 | words2)
+        words1 = self._lookup(label1)
+        intersection = sum(map(words1.__contains__, doc2.ids))
+        union = len(doc1) + len(doc2) - intersection
 
         if union == 0:
             return 0.0
@@ -86,20 +278,20 @@ class JobResumeMatchScorer:
         if resume_label not in self.parser.data['wordcount'] or job_label not in self.parser.data['wordcount']:
             raise ValueError(f"Labels not found in loaded documents")
 
-        job_counter = self.parser.data['wordcount'][job_label]
-        resume_words = set(self.parser.data['wordcount'][resume_label].keys())
+        resume_words = self._lookup(resume_label)
 
-        # Get top N keywords from job description
-        top_job_keywords = set(word for word, _ in job_counter.most_common(top_n))
-
-        # Calculate coverage
-        matched_keywords = top_job_keywords & resume_words
+        # Get top N keywords from job description (already sorted)
+        top_job_keywords = self._top_ids(job_label, top_n)
 
         if len(top_job_keywords) == 0:
             return 0.0
 
-        return len(matched_keywords) / len(top_job_keywords)
+        # Calculate coverage
+        matched = sum(map(resume_words.__contains__, top_job_keywords))
 
+        return matched / len(top_job_keywords)
+
+    @profile
     def calculate_match_score(self, resume_label, job_label, weights=None):
         """
         Calculate a comprehensive match score between resume and job description.
@@ -109,7 +301,9 @@ class JobResumeMatchScorer:
             resume_label: Label for the resume document
             job_label: Label for the job description document
             weights: Dict with keys 'cosine', 'jaccard', 'coverage'
-                    (default: {'cosine': 0.4, 'jaccard': 0.3, 'coverage': 0.3})
+                    (default: {'cosine': 0.4, 'jaccard': 0.3, 'coverage': 0.3}).
+                    'cosine' weights whichever similarity the scorer's
+                    weighting selects (see compute_weighted_similarity).
 
         Returns:
             Dict containing:
@@ -125,7 +319,7 @@ class JobResumeMatchScorer:
         if not math.isclose(weight_sum, 1.0, rel_tol=1e-5):
             raise ValueError(f"Weights must sum to 1.0, got {weight_sum}")
 
-        cosine_score = self.compute_cosine_similarity(resume_label, job_label)
+        cosine_score = self.compute_weighted_similarity(resume_label, job_label)
         jaccard_score = self.compute_jaccard_similarity(resume_label, job_label)
         coverage_score = self.compute_keyword_coverage(resume_label, job_label)
 
@@ -144,6 +338,54 @@ class JobResumeMatchScorer:
             'match_level': self._get_match_level(total_score)
         }
 
+    @profile
+    def top_matches(self, resume_label, k=10, index=None, job_labels=None, weights=None):
+        """
+        Find the k best-matching jobs for a resume without scoring every job.
+        An inverted index picks the jobs with the highest weighted similarity,
+        a few times more than k of them, since a job's total also counts
+        Jaccard and keyword coverage. Those candidates get a full
+        calculate_match_score and the k with the highest total_score win.
+
+        Args:
+            resume_label: Label for the resume document
+            k: Number of jobs to return
+            index: InvertedIndex over the jobs; keep one around and reuse it.
+                If omitted, one is built over job_labels.
+            job_labels: Jobs to index when no index is given
+                (default: every loaded document except the resume)
+            weights: Passed through to calculate_match_score
+
+        Returns:
+            List of (job_label, match result dict) tuples, highest
+            total_score first
+        """
+        from inverted_index import InvertedIndex
+
+        if index is None:
+            if job_labels is None:
+                job_labels = [label for label in self.parser.documents if label != resume_label]
+            index = InvertedIndex(self, job_labels)
+
+        candidates = index.top_k(resume_label, max(k * 4, k + 20))
+        matches = [(job_label, self.calculate_match_score(resume_label, job_label, weights))
+                   for job_label, _ in candidates]
+        # stable sort: equal totals keep their similarity order
+        matches.sort(key=lambda item: item[1]['total_score'], reverse=True)
+        return matches[:k]
+
+    def rank_index(self, resume_label, index, k=10):
+        """
+        Rank the jobs in a memory-mapped MappedTermIndex (see term_index.py)
+        against a loaded resume, using this scorer's weighting. The jobs do
+        not need to be loaded into the ResumeParser.
+
+        Returns:
+            List of (job_label, similarity) tuples, best first
+        """
+        return index.top_k(self.parser.get_wordcount(resume_label), k,
+                           weighting=self.weighting, k1=self.k1, b=self.b)
+
     @staticmethod
     def _get_match_level(score):
         """
@@ -183,13 +425,14 @@ class JobResumeMatchScorer:
         if resume_label not in self.parser.data['wordcount'] or job_label not in self.parser.data['wordcount']:
             raise ValueError(f"Labels not found in loaded documents")
 
-        job_counter = self.parser.data['wordcount'][job_label]
-        resume_words = set(self.parser.data['wordcount'][resume_label].keys())
+        resume_words = self.parser.get_document(resume_label)
+        job_words = self.parser.get_document(job_label)
+        term = self.parser.vocab.term
 
         # Find top job keywords not in resume
         missing = [
-            (word, count) for word, count in job_counter.most_common(100)
-            if word not in resume_words
+            (term(term_id), job_words.get(term_id)) for term_id in self._top_ids(job_label, TOP_KEYWORDS)
+            if term_id not in resume_words
         ]
 
         return missing[:top_n]
@@ -210,20 +453,83 @@ class JobResumeMatchScorer:
         if resume_label not in self.parser.data['wordcount'] or job_label not in self.parser.data['wordcount']:
             raise ValueError(f"Labels not found in loaded documents")
 
-        job_counter = self.parser.data['wordcount'][job_label]
-        resume_counter = self.parser.data['wordcount'][resume_label]
+        resume_counts = self.parser.get_document(resume_label)
+        job_counts = self.parser.get_document(job_label)
+        term = self.parser.vocab.term
 
-        # Find words in both documents
-        shared_words = set(job_counter.keys()) & set(resume_counter.keys())
+        # Walk the job's words by frequency and keep those the resume also has
+        shared = []
+        for term_id in self._ranked_ids(job_label):
+            if len(shared) >= top_n:
+                break
+            resume_count = resume_counts.get(term_id, None)
+            if resume_count is not None:
+                shared.append((term(term_id), job_counts.get(term_id), resume_count))
 
-        # Sort by job description frequency
-        shared = [
-            (word, job_counter[word], resume_counter[word])
-            for word in shared_words
-        ]
-        shared.sort(key=lambda x: x[1], reverse=True)
+        return shared
 
-        return shared[:top_n]
+    def skill_gap_report(self, resume_label, top_n=10, num_keywords=20,
+                         job_labels=None, matches=None, keyword_window=100):
+        """
+        Aggregate missing and shared keywords over a resume's top N matched jobs
+        in one pass, weighting each job by its match score. Keywords missed by
+        many strong matches rank highest.
+
+        The jobs and their scores come from the batch term matrix
+        (score_matrix.py), and each job's keywords from its cached
+        DocumentStats, so no per-pair calculate_match_score is run. When
+        reports are wanted for a whole cohort, run score_matrix once and
+        pass each resume's 'resume_top' row as matches.
+
+        Args:
+            resume_label: Label for the resume document
+            top_n: Number of best-matching jobs to aggregate over
+            num_keywords: Number of missing/shared keywords to return
+            job_labels: Jobs to consider when no matches are given
+                (default: every loaded document except the resume)
+            matches: Optional [(job_label, similarity)] for this resume, best
+                first, e.g. score_matrix(...)['resume_top'][resume_label]
+            keyword_window: How many of each job's most frequent words count
+                as its keywords (same window as get_missing_keywords)
+
+        Returns:
+            Dict with:
+                - 'jobs': [(job_label, similarity)] that were aggregated
+                - 'missing': [(word, weighted score, number of jobs)]
+                - 'shared': [(word, weighted score, number of jobs)]
+        """
+        if matches is None:
+            from score_matrix import score_matrix
+
+            if job_labels is None:
+                job_labels = [label for label in self.parser.documents if label != resume_label]
+            matches = score_matrix(self, [resume_label], job_labels, k=top_n)['resume_top'][resume_label]
+        matches = matches[:top_n]
+        resume_words = self._lookup(resume_label)
+
+        missing = {}  # term id --> [weighted score, number of jobs]
+        shared = {}
+        for job_label, weight in matches:
+            for term_id in self._top_ids(job_label, keyword_window):
+                target = shared if term_id in resume_words else missing
+                entry = target.get(term_id)
+                if entry is None:
+                    target[term_id] = [weight, 1]
+                else:
+                    entry[0] += weight
+                    entry[1] += 1
+
+        term = self.parser.vocab.term
+
+        def ranked(totals):
+            best = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:num_keywords]
+            return [(term(term_id), round(score, 4), num_jobs) for term_id, (score, num_jobs) in best]
+
+        return {
+            'jobs': [(job_label, round(weight, 4)) for job_label, weight in matches],
+            'missing': ranked(missing),
+            'shared': ranked(shared)
+        }
 
 
 if __name__ == "__main__":
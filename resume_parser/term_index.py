@@ -0,0 +1,405 @@
+"""
+term_index.py
+
+On-disk, memory-mapped job term-vector index, so a matching process can
+start scoring without re-parsing every job description.
+
+Layout of an index directory:
+
+    meta.json     counts and committed file sizes; the commit point
+    vocab.jsonl   one JSON-encoded term per line, line number = term id
+    labels.jsonl  one JSON-encoded job label per line, line number = row
+    indptr.bin    uint64[num_docs + 1]  CSR row offsets
+    indices.bin   uint32[nnz]           term ids, sorted within each row
+    counts.bin    uint32[nnz]           term counts
+    norms.bin     float64[num_docs]     L2 norm of each row's counts
+    lengths.bin   uint32[num_docs]      total words per row (BM25)
+    df.<gen>.bin  uint32[num_terms]     document frequency per term
+
+Binary files are opened with mmap, so every worker process on the machine
+shares the same page-cache pages. Appends only ever add bytes to the end of
+the row files, and meta.json is written last, so readers only trust as many
+rows as meta.json says exist. Document frequencies change for existing
+terms, so each append writes them to a new df.<gen>.bin and meta.json names
+the generation to read; older generations are deleted only after meta.json
+is replaced. An append that dies at any point leaves the previous
+meta.json and the df file it names intact.
+"""
+from array import array
+import heapq
+from itertools import repeat
+import json
+import math
+import mmap
+from operator import add, mul, truediv
+import os
+
+FORMAT_VERSION = 1
+
+_ROW_FILES = (('indptr.bin', 'Q'), ('indices.bin', 'I'), ('counts.bin', 'I'),
+              ('norms.bin', 'd'), ('lengths.bin', 'I'))
+
+
+def _read_meta(path):
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r') as f:
+        return json.load(f)
+
+
+def _write_atomic(filename, data, mode='wb'):
+    tmp = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp, mode) as f:
+        f.write(data)
+    os.replace(tmp, filename)
+
+
+def _df_file(path, meta):
+    # indexes written before df generations existed have a single df.bin
+    generation = meta.get('df_generation')
+    return os.path.join(path, 'df.bin' if generation is None else f"df.{generation}.bin")
+
+
+def _remove_stale_df(path, meta):
+    """
+    Delete df files other than the one meta names (older generations, or
+    ones written by appends that died before committing).
+    """
+    keep = os.path.basename(_df_file(path, meta))
+    for name in os.listdir(path):
+        if name != keep and name.startswith('df.') and name.endswith('.bin'):
+            os.remove(os.path.join(path, name))
+
+
+def _read_jsonl(filename, limit):
+    items = []
+    with open(filename, 'r') as f:
+        for line in f:
+            if len(items) >= limit:
+                break
+            items.append(json.loads(line))
+    return items
+
+
+def append_to_index(path, parser, labels):
+    """
+    Append documents from a ResumeParser to an index, creating it if needed.
+    Labels already in the index are skipped (the index is append-only; write
+    a fresh index to replace changed postings).
+
+    Args:
+        path: Index directory
+        parser: ResumeParser holding the documents
+        labels: Labels of the documents to add
+
+    Returns:
+        Number of documents appended
+    """
+    os.makedirs(path, exist_ok=True)
+    meta = _read_meta(path) or {'version': FORMAT_VERSION, 'num_docs': 0,
+                                'num_terms': 0, 'nnz': 0, 'total_length': 0,
+                                'vocab_bytes': 0, 'labels_bytes': 0}
+    if meta['version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported index version {meta['version']}")
+
+    vocab_file = os.path.join(path, 'vocab.jsonl')
+    labels_file = os.path.join(path, 'labels.jsonl')
+
+    if meta['num_docs'] == 0:
+        # new index: drop any leftovers of an interrupted first write
+        for name, _ in _ROW_FILES:
+            open(os.path.join(path, name), 'wb').close()
+        open(vocab_file, 'w').close()
+        open(labels_file, 'w').close()
+        with open(os.path.join(path, 'indptr.bin'), 'wb') as f:
+            array('Q', [0]).tofile(f)
+        terms, existing = [], set()
+    else:
+        terms = _read_jsonl(vocab_file, meta['num_terms'])
+        existing = set(_read_jsonl(labels_file, meta['num_docs']))
+
+    term_ids = {term: i for i, term in enumerate(terms)}
+    df = array('I')
+    if meta['num_terms']:
+        with open(_df_file(path, meta), 'rb') as f:
+            df.fromfile(f, meta['num_terms'])
+
+    new_terms, new_labels = [], []
+    indptr, indices, counts = array('Q'), array('I'), array('I')
+    norms, lengths = array('d'), array('I')
+    nnz = meta['nnz']
+    total_length = meta['total_length']
+    vocab_terms = parser.vocab.terms
+
+    for label in labels:
+        if label in existing:
+            continue
+        existing.add(label)
+
+        row = []
+        for term_id, count in parser.get_document(label).items():
+            term = vocab_terms[term_id]
+            index_id = term_ids.get(term)
+            if index_id is None:
+                index_id = len(term_ids)
+                term_ids[term] = index_id
+                new_terms.append(term)
+                df.append(0)
+            df[index_id] += 1
+            row.append((index_id, count))
+        row.sort()
+
+        indices.extend(term for term, _ in row)
+        counts.extend(count for _, count in row)
+        nnz += len(row)
+        indptr.append(nnz)
+        norms.append(math.sqrt(sum(count * count for _, count in row)))
+        length = sum(count for _, count in row)
+        lengths.append(length)
+        total_length += length
+        new_labels.append(label)
+
+    if not new_labels:
+        return 0
+
+    # truncate every file to its committed size first, in case an earlier
+    # append died after writing data but before updating meta.json
+    committed = {'indptr.bin': meta['num_docs'] + 1, 'indices.bin': meta['nnz'],
+                 'counts.bin': meta['nnz'], 'norms.bin': meta['num_docs'],
+                 'lengths.bin': meta['num_docs']}
+    for (name, code), values in zip(_ROW_FILES, (indptr, indices, counts, norms, lengths)):
+        filename = os.path.join(path, name)
+        with open(filename, 'r+b') as f:
+            f.truncate(committed[name] * array(code).itemsize)
+            f.seek(0, os.SEEK_END)
+            values.tofile(f)
+
+    text_sizes = {}
+    for filename, key, items in ((vocab_file, 'vocab_bytes', new_terms),
+                                 (labels_file, 'labels_bytes', new_labels)):
+        with open(filename, 'r+b') as f:
+            f.truncate(meta[key])
+            f.seek(0, os.SEEK_END)
+            f.write(''.join(json.dumps(item) + '\n' for item in items).encode('utf-8'))
+            text_sizes[key] = f.tell()
+    generation = meta.get('df_generation', 0) + 1
+    _write_atomic(os.path.join(path, f"df.{generation}.bin"), df.tobytes())
+
+    meta.update(num_docs=meta['num_docs'] + len(new_labels), num_terms=len(term_ids),
+                nnz=nnz, total_length=total_length, df_generation=generation, **text_sizes)
+    _write_atomic(os.path.join(path, 'meta.json'), json.dumps(meta), mode='w')
+    _remove_stale_df(path, meta)
+    return len(new_labels)
+
+
+def write_index(path, parser, labels):
+    """
+    Write a fresh index, replacing any existing one at path.
+    """
+    meta_path = os.path.join(path, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    return append_to_index(path, parser, labels)
+
+
+class MappedTermIndex:
+    """
+    Read-only, memory-mapped view of an index directory.
+    """
+
+    def __init__(self, path):
+        meta = _read_meta(path)
+        if meta is None:
+            raise ValueError(f"No term index found at '{path}'")
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index version {meta['version']}")
+
+        self.path = path
+        self.meta = meta
+        self.num_docs = meta['num_docs']
+        self._maps = []  # (mmap, memoryview) pairs to release on close()
+
+        sizes = {'indptr.bin': self.num_docs + 1, 'indices.bin': meta['nnz'],
+                 'counts.bin': meta['nnz'], 'norms.bin': self.num_docs,
+                 'lengths.bin': self.num_docs}
+        views = {}
+        for name, code in _ROW_FILES:
+            views[name] = self._map(name, code, sizes[name])
+
+        self.indptr = views['indptr.bin']
+        self.indices = views['indices.bin']
+        self.counts = views['counts.bin']
+        self.norms = views['norms.bin']
+        self.lengths = views['lengths.bin']
+        self.doc_freq = self._map(os.path.basename(_df_file(path, meta)), 'I', meta['num_terms'])
+
+        self.labels = _read_jsonl(os.path.join(path, 'labels.jsonl'), self.num_docs)
+        self._term_ids = None
+        # weights for this df generation, built on first use
+        self._idfs = {}  # weighting --> array('d') per term id
+        self._norms = {}  # (weighting, k1, b) --> array('d') per row
+        self._term_weights = {}  # (k1, b) --> bm25 array('d') per posting
+
+    def _map(self, name, code, length):
+        """
+        Zero-copy typed view of the first `length` items of a binary file.
+        """
+        if length == 0:
+            return memoryview(array(code))
+        with open(os.path.join(self.path, name), 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)[:length * array(code).itemsize].cast(code)
+        self._maps.append((mm, view))
+        return view
+
+    def close(self):
+        """
+        Unmap all files. Row views handed out earlier must not be used after this.
+        """
+        for mm, view in self._maps:
+            view.release()
+            mm.close()
+        self._maps = []
+
+    def __len__(self):
+        return self.num_docs
+
+    @property
+    def term_ids(self):
+        """
+        term --> id dict, loaded on first use.
+        """
+        if self._term_ids is None:
+            terms = _read_jsonl(os.path.join(self.path, 'vocab.jsonl'), self.meta['num_terms'])
+            self._term_ids = {term: i for i, term in enumerate(terms)}
+        return self._term_ids
+
+    def row(self, i):
+        """
+        (term ids, counts) views for document row i.
+        """
+        start, stop = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:stop], self.counts[start:stop]
+
+    def idf(self, term_id):
+        return math.log((1 + self.num_docs) / (1 + self.doc_freq[term_id])) + 1
+
+    def bm25_idf(self, term_id):
+        df = self.doc_freq[term_id]
+        return math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+
+    def idfs(self, weighting):
+        """
+        idf of every term id as an array('d'), computed once per instance.
+        An instance maps a single df generation, so these never go stale;
+        open a new MappedTermIndex to see later appends.
+        """
+        idfs = self._idfs.get(weighting)
+        if idfs is None:
+            idf = self.bm25_idf if weighting == 'bm25' else self.idf
+            idfs = self._idfs[weighting] = array('d', map(idf, range(len(self.doc_freq))))
+        return idfs
+
+    def row_norms(self, weighting, k1=1.5, b=0.75):
+        """
+        L2 norm of every row's weights under a weighting, computed once per
+        instance and weighting (one pass over all postings).
+        """
+        if weighting == 'raw':
+            return self.norms
+        key = (weighting, k1, b)
+        norms = self._norms.get(key)
+        if norms is None:
+            weights = array('d', map(mul, map(self.idfs(weighting).__getitem__, self.indices),
+                                     self.term_weights(weighting, k1, b)))
+            indptr = self.indptr
+            norms = self._norms[key] = array('d', [
+                math.sqrt(sum(map(mul, row, row)))
+                for row in (weights[indptr[i]:indptr[i + 1]] for i in range(self.num_docs))])
+        return norms
+
+    def term_weights(self, weighting, k1=1.5, b=0.75):
+        """
+        Per-posting term-frequency part of the document weights, aligned with
+        self.indices: the raw counts, or for bm25 the saturated
+        c * (k1 + 1) / (c + length norm), built once per (k1, b).
+        """
+        if weighting != 'bm25':
+            return self.counts
+        weights = self._term_weights.get((k1, b))
+        if weights is None:
+            avgdl = self._avgdl()
+            indptr, counts = self.indptr, self.counts
+            weights = array('d')
+            for i in range(self.num_docs):
+                length_norm = k1 * (1 - b + b * self.lengths[i] / avgdl)
+                row_counts = counts[indptr[i]:indptr[i + 1]]
+                weights.extend(map(truediv, map(mul, row_counts, repeat(k1 + 1)),
+                                   map(add, row_counts, repeat(length_norm))))
+            self._term_weights[(k1, b)] = weights
+        return weights
+
+    def _avgdl(self):
+        return self.meta['total_length'] / self.num_docs if self.num_docs else 1.0
+
+    def top_k(self, query_counts, k=10, weighting='raw', k1=1.5, b=0.75):
+        """
+        Score every indexed document against a query and keep the best k.
+
+        The index is stored by row, so this is a scan over every posting of
+        every document: linear in nnz, not in the postings of the query's
+        terms. The per-posting products are one C-level map over the mmapped
+        arrays; idf, row norms and bm25 term weights are computed on the
+        first query and reused. InvertedIndex only touches the query's
+        postings, so it scales better for repeated queries over jobs that
+        are already loaded; this index saves loading them at all.
+
+        Args:
+            query_counts: Mapping of word --> count (e.g. a resume's wordcount)
+            k: Number of results
+            weighting: 'raw', 'tfidf' or 'bm25', as in JobResumeMatchScorer
+
+        Returns:
+            List of (job_label, similarity) tuples, best first
+        """
+        term_ids = self.term_ids
+        # words the index has never seen still count towards the query norm
+        unseen = [count for word, count in query_counts.items() if word not in term_ids]
+        query = {term_ids[word]: count for word, count in query_counts.items() if word in term_ids}
+
+        if weighting == 'bm25':
+            idfs = self.idfs(weighting)
+            avgdl = self._avgdl()
+            query_norm = k1 * (1 - b + b * (sum(query.values()) + sum(unseen)) / avgdl)
+            unseen_idf = math.log(1 + (self.num_docs + 0.5) / 0.5)
+            unseen = [unseen_idf * c * (k1 + 1) / (c + query_norm) for c in unseen]
+            query = {t: idfs[t] * c * (k1 + 1) / (c + query_norm) for t, c in query.items()}
+        elif weighting == 'tfidf':
+            idfs = self.idfs(weighting)
+            unseen_idf = math.log(1 + self.num_docs) + 1
+            unseen = [count * unseen_idf for count in unseen]
+            query = {t: c * idfs[t] for t, c in query.items()}
+        bound = math.sqrt(sum(v * v for v in query.values()) + sum(v * v for v in unseen))
+        if not query or bound == 0:
+            return []
+
+        # dense query with the term's idf folded in, so one C-level pass over
+        # all postings gives every (query weight * document weight) product.
+        # A list, not array('d'): most terms map to the shared int 0, and
+        # 0 * count is a cached small int, so misses allocate nothing.
+        dense = [0] * len(self.doc_freq)
+        for t, q in query.items():
+            dense[t] = q if weighting == 'raw' else q * idfs[t]
+        products = list(map(mul, map(dense.__getitem__, self.indices),
+                            self.term_weights(weighting, k1, b)))
+
+        norms = self.row_norms(weighting, k1, b)
+        indptr = self.indptr
+        scores = []
+        for i in range(self.num_docs):
+            score = sum(products[indptr[i]:indptr[i + 1]])
+            if score and norms[i]:
+                scores.append((score / (norms[i] * bound), i))
+
+        return [(self.labels[i], score) for score, i in heapq.nlargest(k, scores)]
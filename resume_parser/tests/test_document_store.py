@@ -0,0 +1,63 @@
+from collections import Counter
+
+from document_store import DocumentVector, Vocabulary
+from resume_parser import ResumeParser
+from sentiment_analysis import JobResumeMatchScorer
+
+# 80 distinct job words, most of them occurring once, so the top 50 keywords
+# are decided almost entirely by tie-breaking
+JOB_WORDS = [f"skill{chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(80)]
+JOB_TEXT = "python python python developer developer " + " ".join(JOB_WORDS)
+RESUME_TEXT = "python developer " + " ".join(JOB_WORDS[40:])
+OTHER_TEXT = " ".join(reversed(JOB_WORDS))
+
+
+def load(order):
+    rp = ResumeParser()
+    texts = {'resume': RESUME_TEXT, 'job': JOB_TEXT, 'other': OTHER_TEXT}
+    for label in order:
+        rp.load_text_from_string(texts[label], label)
+    return rp
+
+
+def test_round_trip_keeps_counts_and_first_occurrence_order():
+    vocab = Vocabulary()
+    vocab.add('zeta')
+    counter = Counter(['beta', 'alpha', 'zeta', 'alpha', 'gamma'])
+    document = DocumentVector.from_counter(counter, vocab)
+
+    assert list(document.ids) == sorted(document.ids)
+    assert document.to_counter(vocab) == counter
+    assert list(document.to_counter(vocab)) == list(counter)
+    assert document.most_common(vocab) == counter.most_common()
+    assert document.most_common(vocab, 2) == counter.most_common(2)
+
+
+def test_most_common_ties_follow_document_not_vocabulary():
+    first = load(['resume', 'job'])
+    second = load(['other', 'job', 'resume'])
+    expected = Counter(first.tokenizer.tokenize(JOB_TEXT)).most_common(50)
+
+    assert first.get_top_words('job', 50) == expected
+    assert second.get_top_words('job', 50) == expected
+
+
+def test_match_scores_do_not_depend_on_load_order():
+    first = load(['resume', 'job'])
+    second = load(['other', 'job', 'resume'])
+    one = JobResumeMatchScorer(first)
+    two = JobResumeMatchScorer(second)
+
+    assert one.calculate_match_score('resume', 'job') == two.calculate_match_score('resume', 'job')
+    assert one.get_missing_keywords('resume', 'job') == two.get_missing_keywords('resume', 'job')
+    assert one.get_shared_keywords('resume', 'job') == two.get_shared_keywords('resume', 'job')
+
+
+def test_keyword_coverage_matches_counter_most_common():
+    rp = load(['resume', 'job'])
+    scorer = JobResumeMatchScorer(rp)
+    job_top = Counter(rp.tokenizer.tokenize(JOB_TEXT)).most_common(50)
+    resume_words = set(rp.tokenizer.tokenize(RESUME_TEXT))
+    expected = sum(1 for word, _ in job_top if word in resume_words) / len(job_top)
+
+    assert scorer.compute_keyword_coverage('resume', 'job') == expected
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from inverted_index import InvertedIndex
+from resume_parser import ResumeParser
+from sentiment_analysis import JobResumeMatchScorer
+
+# letters only: the tokenizer drops words with digits in them
+WORDS = ["w" + "".join(chr(97 + (i // 26 ** p) % 26) for p in range(3)) for i in range(400)]
+
+
+def zipf_text(rng, length):
+    # a few words are very common and most are rare, as in real postings
+    return " ".join(rng.choices(WORDS, weights=[1 / rank for rank in range(1, len(WORDS) + 1)], k=length))
+
+
+def load(num_jobs=150, num_resumes=4):
+    rng = random.Random(7)
+    rp = ResumeParser()
+    for i in range(num_jobs):
+        rp.load_text_from_string(zipf_text(rng, rng.randint(20, 120)), f"job-{i}")
+    for i in range(num_resumes):
+        rp.load_text_from_string(zipf_text(rng, rng.randint(50, 200)), f"resume-{i}")
+    return rp
+
+
+def brute_force(scorer, resume_label, job_labels):
+    scores = [(label, scorer.compute_weighted_similarity(resume_label, label)) for label in job_labels]
+    return sorted((item for item in scores if item[1] > 0), key=lambda item: item[1], reverse=True)
+
+
+def assert_same_top_k(got, expected, k):
+    expected_scores = dict(expected)
+    assert len(got) == min(k, len(expected))
+    assert [score for _, score in got] == pytest.approx([score for _, score in expected[:k]])
+    for label, score in got:
+        assert score == pytest.approx(expected_scores[label])
+
+
+@pytest.mark.parametrize('weighting', JobResumeMatchScorer.WEIGHTINGS)
+@pytest.mark.parametrize('k', [1, 5, 20, 1000])
+def test_top_k_equals_brute_force(weighting, k):
+    rp = load()
+    scorer = JobResumeMatchScorer(rp, weighting=weighting)
+    jobs = [label for label in rp.documents if label.startswith('job')]
+    index = InvertedIndex(scorer, jobs)
+
+    for resume in ('resume-0', 'resume-1', 'resume-2', 'resume-3'):
+        assert len(brute_force(scorer, resume, jobs)) > 100
+        assert_same_top_k(index.top_k(resume, k), brute_force(scorer, resume, jobs), k)
+
+
+def test_top_k_after_remove_and_readd():
+    rp = load()
+    scorer = JobResumeMatchScorer(rp)
+    jobs = [label for label in rp.documents if label.startswith('job')]
+    index = InvertedIndex(scorer, jobs)
+
+    best = index.top_k('resume-0', 1)[0][0]
+    index.remove(best)
+    remaining = [label for label in jobs if label != best]
+    assert_same_top_k(index.top_k('resume-0', 10), brute_force(scorer, 'resume-0', remaining), 10)
+
+    index.add(best)
+    assert index.top_k('resume-0', 1)[0][0] == best
+
+
+@pytest.mark.parametrize('weighting', JobResumeMatchScorer.WEIGHTINGS)
+def test_top_matches_are_ordered_by_total_score(weighting):
+    rp = load()
+    scorer = JobResumeMatchScorer(rp, weighting=weighting)
+    jobs = [label for label in rp.documents if label.startswith('job')]
+    index = InvertedIndex(scorer, jobs)
+
+    for resume in ('resume-0', 'resume-1'):
+        totals = [result['total_score'] for _, result in scorer.top_matches(resume, k=10, index=index)]
+        assert len(totals) == 10
+        assert totals == sorted(totals, reverse=True)
+
+        # with every job a candidate the winners are the best totals overall
+        everything = sorted((scorer.calculate_match_score(resume, job)['total_score'] for job in jobs), reverse=True)
+        best = [result['total_score'] for _, result in scorer.top_matches(resume, k=len(jobs), index=index)]
+        assert best[:len(everything)] == everything[:len(best)]
@@ -0,0 +1,21 @@
+from benchmark import make_corpus, make_vocabulary
+from resume_parser import ResumeParser
+
+
+def test_load_many_matches_sequential_loading():
+    docs = make_corpus(40, make_vocabulary(300), 'job', min_words=20, max_words=60)
+    expected = ResumeParser()
+    for label, text in docs:
+        expected.load_text_from_string(text, label)
+
+    for workers in (1, 2):
+        rp = ResumeParser()
+        result = rp.load_many([(label, text, None) for label, text in docs], workers=workers, chunksize=4)
+        assert result['documents'] == len(docs)
+        for label, _ in docs:
+            assert rp.get_wordcount(label) == expected.get_wordcount(label)
+            assert rp.get_top_words(label, None) == expected.get_top_words(label, None)
+            assert rp.data['numwords'][label] == expected.data['numwords'][label]
+        assert rp.corpus.num_docs == expected.corpus.num_docs
+        assert all(rp.corpus.df(rp.vocab.get_id(term)) == expected.corpus.df(expected.vocab.get_id(term))
+                   for term in expected.vocab.terms)
@@ -0,0 +1,66 @@
+import random
+
+from minhash import LSHIndex, MinHasher, collapse_duplicates, shingles
+from test_inverted_index import WORDS
+
+
+def jaccard(text1, text2):
+    set1, set2 = shingles(text1), shingles(text2)
+    return len(set1 & set2) / len(set1 | set2)
+
+
+def posting(rng, length=200):
+    return " ".join(rng.choices(WORDS, k=length))
+
+
+def near_duplicate(rng, text, edits=3):
+    # the same posting re-scraped with a couple of words changed
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def corpus(num_postings=100):
+    rng = random.Random(11)
+    originals = [posting(rng) for _ in range(num_postings)]
+    copies = [near_duplicate(rng, text) for text in originals]
+    return originals, copies
+
+
+def test_signature_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    originals, copies = corpus(20)
+    for text1, text2 in zip(originals, copies + copies[1:]):
+        estimate = MinHasher.jaccard(hasher.signature(text1), hasher.signature(text2))
+        assert abs(estimate - jaccard(text1, text2)) < 0.1
+
+
+def test_lsh_recall_on_near_duplicates():
+    originals, copies = corpus()
+    assert all(jaccard(text, copy) >= 0.9 for text, copy in zip(originals, copies))
+
+    hasher = MinHasher()
+    index = LSHIndex(hasher.num_perm, threshold=0.8)
+    for i, text in enumerate(originals):
+        index.add(i, hasher.signature(text))
+
+    found = 0
+    for i, copy in enumerate(copies):
+        matches = [key for key, _ in index.query(hasher.signature(copy))]
+        found += matches[:1] == [i]
+        # unrelated postings share almost no shingles
+        assert set(matches) <= {i}
+    assert found / len(copies) >= 0.95
+
+
+def test_collapse_duplicates():
+    originals, copies = corpus(30)
+    jobs = [{'title': 'Co-op', 'company': 'Acme', 'description': text} for text in originals + copies]
+
+    kept, duplicates = collapse_duplicates(jobs)
+    # every original is kept and nothing is collapsed into the wrong posting
+    assert kept[:len(originals)] == jobs[:len(originals)]
+    assert all(duplicates[len(originals) + i] == i for i in range(len(copies)) if len(originals) + i in duplicates)
+    assert len(duplicates) / len(copies) >= 0.9
+    assert len(kept) + len(duplicates) == len(jobs)
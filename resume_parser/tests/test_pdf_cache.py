@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+import pdf_cache
+import pdf_parser
+from pdf_cache import ExtractionCache
+
+STOPWORDS = {'and', 'the'}
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    # stand-in for pypdf: the "PDF" is plain text, and every extraction is recorded
+    calls = []
+
+    def extract_text(filename):
+        calls.append(filename)
+        with open(filename) as f:
+            return f.read()
+
+    monkeypatch.setattr(pdf_parser, 'extract_text', extract_text)
+    return calls
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_unchanged_file_hits(tmp_path, extractions):
+    cache = ExtractionCache()
+    resume = write(tmp_path / 'resume.pdf', "python and django developer, python")
+
+    first = pdf_parser.pdf_parser(resume, STOPWORDS, cache=cache)
+    second = pdf_parser.pdf_parser(resume, STOPWORDS, cache=cache)
+
+    assert first == second
+    assert first['wordcount']['python'] == 2 and 'and' not in first['wordcount']
+    assert extractions == [resume]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_same_content_under_another_name_hits(tmp_path, extractions):
+    cache = ExtractionCache()
+    pdf_parser.pdf_parser(write(tmp_path / 'a.pdf', "react typescript"), cache=cache)
+    pdf_parser.pdf_parser(write(tmp_path / 'b.pdf', "react typescript"), cache=cache)
+    assert len(extractions) == 1
+
+
+def test_new_stopwords_reuse_the_extracted_text(tmp_path, extractions):
+    cache = ExtractionCache()
+    resume = write(tmp_path / 'resume.pdf', "python and django")
+    pdf_parser.pdf_parser(resume, cache=cache)
+    results = pdf_parser.pdf_parser(resume, STOPWORDS, cache=cache)
+    assert 'and' not in results['wordcount']
+    assert len(extractions) == 1
+    assert cache.stats()['misses'] == 2
+
+
+def test_edited_file_is_not_served_stale(tmp_path, extractions):
+    cache = ExtractionCache()
+    resume = tmp_path / 'resume.pdf'
+    write(resume, "python developer")
+    pdf_parser.pdf_parser(str(resume), cache=cache)
+
+    write(resume, "kotlin developer, android")
+    os.utime(resume, ns=(1, 1))  # a different mtime even on coarse filesystems
+    results = pdf_parser.pdf_parser(str(resume), cache=cache)
+
+    assert 'kotlin' in results['wordcount'] and 'python' not in results['wordcount']
+    assert len(extractions) == 2
+
+
+def test_disk_entries_survive_a_new_cache(tmp_path, extractions):
+    cache_dir = str(tmp_path / 'cache')
+    resume = write(tmp_path / 'resume.pdf', "python sql pandas python")
+
+    first = pdf_parser.pdf_parser(resume, STOPWORDS, cache=ExtractionCache(cache_dir))
+    restarted = ExtractionCache(cache_dir)
+    second = pdf_parser.pdf_parser(resume, STOPWORDS, cache=restarted)
+
+    assert second == first
+    assert extractions == [resume]
+    assert restarted.stats() == {'hits': 1, 'misses': 0, 'hit_rate': 1.0, 'entries_in_memory': 1}
+
+
+def test_memory_and_digest_memo_are_bounded(tmp_path, extractions):
+    cache = ExtractionCache(max_entries=3)
+    for i in range(10):
+        pdf_parser.pdf_parser(write(tmp_path / f'{i}.pdf', f"resume number {'x' * (i + 3)}"), cache=cache)
+    assert cache.stats()['entries_in_memory'] == 3
+    assert len(cache._digests) == 3
+
+
+def test_pdf_parser_uses_the_default_cache(tmp_path, extractions, monkeypatch):
+    monkeypatch.setattr(pdf_cache, '_default_cache', None)
+    resume = write(tmp_path / 'resume.pdf', "python developer")
+
+    pdf_parser.pdf_parser(resume)
+    pdf_parser.pdf_parser(resume)
+    assert len(extractions) == 1
+    assert pdf_cache.default_cache().stats()['hits'] == 1
+
+    pdf_parser.pdf_parser(resume, cache=False)
+    assert len(extractions) == 2
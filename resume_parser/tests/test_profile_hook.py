@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+
+import pytest
+
+import resume_parser
+from inverted_index import InvertedIndex
+from resume_parser import ResumeParser, set_profiler
+from sentiment_analysis import JobResumeMatchScorer
+
+
+@pytest.fixture
+def spans():
+    recorded, stack = [], []
+
+    @contextmanager
+    def span(name):
+        stack.append(name)
+        recorded.append(tuple(stack))
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    set_profiler(span)
+    yield recorded
+    set_profiler(None)
+
+
+def score():
+    rp = ResumeParser()
+    rp.load_text_from_string("python developer sql", 'resume')
+    rp.load_text_from_string("python backend developer", 'job')
+    scorer = JobResumeMatchScorer(rp)
+    scorer.top_matches('resume', k=1, index=InvertedIndex(scorer, ['job']))
+
+
+def test_calls_are_not_timed_without_a_profiler():
+    assert resume_parser._span is None
+    score()  # nothing to record into, and nothing breaks
+
+
+def test_installed_profiler_records_nested_spans(spans):
+    score()
+    names = {path[-1] for path in spans}
+    assert {'ResumeParser.load_text_from_string', 'JobResumeMatchScorer.top_matches',
+            'InvertedIndex.top_k', 'JobResumeMatchScorer.calculate_match_score'} <= names
+    assert ('JobResumeMatchScorer.top_matches', 'JobResumeMatchScorer.calculate_match_score') in spans
+
+
+def test_profile_keeps_the_function_metadata():
+    assert ResumeParser.load_text_from_string.__name__ == 'load_text_from_string'
+    assert ResumeParser.load_text_from_string.__qualname__ == 'ResumeParser.load_text_from_string'
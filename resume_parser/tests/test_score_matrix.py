@@ -0,0 +1,31 @@
+import pytest
+
+from score_matrix import score_matrix
+from sentiment_analysis import JobResumeMatchScorer
+from test_inverted_index import brute_force, load
+
+
+def assert_same_ranking(got, expected, k):
+    expected_scores = dict(expected)
+    assert len(got) == min(k, len(expected))
+    assert [score for _, score in got] == pytest.approx([score for _, score in expected[:k]])
+    for label, score in got:
+        assert score == pytest.approx(expected_scores[label])
+
+
+@pytest.mark.parametrize('weighting', JobResumeMatchScorer.WEIGHTINGS)
+@pytest.mark.parametrize('job_block, workers', [(512, None), (16, None), (16, 2)])
+def test_score_matrix_equals_brute_force(weighting, job_block, workers):
+    rp = load()
+    scorer = JobResumeMatchScorer(rp, weighting=weighting)
+    jobs = [label for label in rp.documents if label.startswith('job')]
+    resumes = [label for label in rp.documents if label.startswith('resume')]
+
+    result = score_matrix(scorer, resumes, jobs, k=5, job_block=job_block, workers=workers)
+
+    for resume in resumes:
+        assert_same_ranking(result['resume_top'][resume], brute_force(scorer, resume, jobs), 5)
+    for job in jobs:
+        expected = sorted(((resume, scorer.compute_weighted_similarity(resume, job)) for resume in resumes),
+                          key=lambda item: item[1], reverse=True)
+        assert_same_ranking(result['job_top'][job], [item for item in expected if item[1] > 0], 5)
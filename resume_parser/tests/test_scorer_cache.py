@@ -0,0 +1,65 @@
+from collections import Counter
+import math
+
+import pytest
+
+from resume_parser import ResumeParser
+from sentiment_analysis import TOP_KEYWORDS, JobResumeMatchScorer
+
+# Enough distinct words that coverage and keyword lists reach past the
+# TOP_KEYWORDS ids cached per document
+WORDS = [f"term{i}" for i in range(TOP_KEYWORDS + 60)]
+JOB_TEXT = "python python python sql sql " + " ".join(WORDS)
+RESUME_TEXT = "python sql sql " + " ".join(WORDS[::3])
+
+
+def reference_cosine(a, b):
+    dot = sum(count * b[word] for word, count in a.items() if word in b)
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def load():
+    rp = ResumeParser()
+    rp.load_text_from_string(RESUME_TEXT, 'resume')
+    rp.load_text_from_string(JOB_TEXT, 'job')
+    return rp
+
+
+def test_scores_match_counter_reference():
+    rp = load()
+    scorer = JobResumeMatchScorer(rp)
+    resume, job = rp.get_wordcount('resume'), rp.get_wordcount('job')
+
+    assert scorer.compute_cosine_similarity('resume', 'job') == pytest.approx(reference_cosine(resume, job))
+    assert scorer.compute_jaccard_similarity('resume', 'job') == pytest.approx(
+        len(resume.keys() & job.keys()) / len(resume.keys() | job.keys()))
+
+    for top_n in (10, 50, TOP_KEYWORDS + 40):
+        top = [word for word, _ in job.most_common(top_n)]
+        assert scorer.compute_keyword_coverage('resume', 'job', top_n) == pytest.approx(
+            sum(word in resume for word in top) / len(top))
+
+    missing = [(w, c) for w, c in job.most_common(TOP_KEYWORDS) if w not in resume]
+    assert scorer.get_missing_keywords('resume', 'job', top_n=len(missing)) == missing
+
+    shared = [(w, c, resume[w]) for w, c in job.most_common() if w in resume]
+    assert scorer.get_shared_keywords('resume', 'job', top_n=len(shared)) == shared
+
+
+def test_reload_and_remove_evict_cached_stats():
+    rp = load()
+    scorer = JobResumeMatchScorer(rp, weighting='tfidf')
+    before = scorer.calculate_match_score('resume', 'job')
+    assert 'job' in scorer._stats_cache and 'job' in scorer._weighted_cache
+
+    rp.load_text_from_string("cobol fortran mainframe", 'job')
+    assert 'job' not in scorer._stats_cache and 'job' not in scorer._weighted_cache
+    after = scorer.calculate_match_score('resume', 'job')
+    assert after['total_score'] < before['total_score']
+    assert after['jaccard_similarity'] == 0
+
+    rp.remove('job')
+    assert 'job' not in scorer._stats_cache and 'job' not in scorer._weighted_cache
+    with pytest.raises(ValueError):
+        scorer.calculate_match_score('resume', 'job')
@@ -0,0 +1,69 @@
+import pytest
+
+from resume_parser import ResumeParser
+from score_matrix import score_matrix
+from sentiment_analysis import JobResumeMatchScorer
+from test_inverted_index import load
+
+JOBS = {
+    'backend': "python django django postgresql postgresql postgresql rest",
+    'platform': "python django docker docker kubernetes",
+    'data': "python pandas sql statistics",
+    'mobile': "swift kotlin android",
+}
+
+
+def scorer_for(resume, **kwargs):
+    rp = ResumeParser()
+    rp.load_text_from_string(resume, 'resume')
+    for label, text in JOBS.items():
+        rp.load_text_from_string(text, label)
+    return JobResumeMatchScorer(rp, **kwargs)
+
+
+def test_report_aggregates_over_the_matched_jobs():
+    scorer = scorer_for("python developer with sql and pandas experience")
+    report = scorer.skill_gap_report('resume', top_n=3)
+
+    jobs = dict(report['jobs'])
+    # the mobile job shares nothing with the resume, so it is never a match
+    assert set(jobs) == {'backend', 'platform', 'data'}
+    assert [score for _, score in report['jobs']] == sorted(jobs.values(), reverse=True)
+
+    missing = {word: (score, num_jobs) for word, score, num_jobs in report['missing']}
+    shared = {word: (score, num_jobs) for word, score, num_jobs in report['shared']}
+    assert missing['django'] == (pytest.approx(jobs['backend'] + jobs['platform'], abs=1e-3), 2)
+    assert missing['statistics'] == (pytest.approx(jobs['data'], abs=1e-3), 1)
+    assert shared['python'] == (pytest.approx(sum(jobs.values()), abs=1e-3), 3)
+    assert report['shared'][0][0] == 'python'
+    assert not set(missing) & set(shared)
+    assert 'swift' not in missing
+
+
+def test_report_is_limited_to_top_n_and_num_keywords():
+    scorer = scorer_for("python developer with sql and pandas experience")
+    report = scorer.skill_gap_report('resume', top_n=1, num_keywords=2)
+    assert [label for label, _ in report['jobs']] == ['data']
+    assert len(report['missing']) == 1 and report['missing'][0][0] == 'statistics'
+    assert len(report['shared']) == 2
+
+
+@pytest.mark.parametrize('weighting', JobResumeMatchScorer.WEIGHTINGS)
+def test_report_from_a_cohort_score_matrix(weighting):
+    rp = load()
+    scorer = JobResumeMatchScorer(rp, weighting=weighting)
+    jobs = [label for label in rp.documents if label.startswith('job')]
+    resumes = [label for label in rp.documents if label.startswith('resume')]
+    matrix = score_matrix(scorer, resumes, jobs, k=10)
+
+    for resume in resumes:
+        from_matrix = scorer.skill_gap_report(resume, matches=matrix['resume_top'][resume])
+        assert from_matrix == scorer.skill_gap_report(resume, job_labels=jobs)
+
+        # every missing keyword is missing from each job it was counted for
+        counted = {}
+        for job, _ in from_matrix['jobs']:
+            for word, _ in scorer.get_missing_keywords(resume, job, top_n=100):
+                counted[word] = counted.get(word, 0) + 1
+        for word, _, num_jobs in from_matrix['missing']:
+            assert counted[word] == num_jobs
@@ -0,0 +1,136 @@
+import math
+import os
+
+import pytest
+
+import term_index
+from resume_parser import ResumeParser
+from term_index import MappedTermIndex, append_to_index, write_index
+
+JOBS = {
+    'backend': "python developer django postgresql rest api backend services",
+    'frontend': "javascript react typescript css html frontend developer",
+    'data': "python sql pandas machine learning data analysis statistics",
+    'ops': "linux docker kubernetes aws terraform monitoring python",
+    'mobile': "swift kotlin android ios mobile developer apps",
+}
+QUERY = {'python': 2, 'developer': 1, 'docker': 1, 'sql': 1}
+
+
+def load():
+    rp = ResumeParser()
+    for label, text in JOBS.items():
+        rp.load_text_from_string(text, label)
+    return rp
+
+
+def snapshot(path):
+    index = MappedTermIndex(path)
+    try:
+        terms = sorted(index.term_ids, key=index.term_ids.get)
+        return {
+            'labels': list(index.labels),
+            'doc_freq': dict(zip(terms, index.doc_freq.tolist())),
+            'top_k': index.top_k(QUERY, k=5, weighting='tfidf'),
+        }
+    finally:
+        index.close()
+
+
+def df_files(path):
+    return sorted(name for name in os.listdir(path) if name.startswith('df.'))
+
+
+def test_appends_match_a_fresh_index(tmp_path):
+    rp = load()
+    labels = list(JOBS)
+    fresh, appended = str(tmp_path / 'fresh'), str(tmp_path / 'appended')
+    write_index(fresh, rp, labels)
+
+    assert append_to_index(appended, rp, labels[:2]) == 2
+    assert append_to_index(appended, rp, labels[2:]) == 3
+    assert append_to_index(appended, rp, labels) == 0  # already indexed
+
+    expected = snapshot(fresh)
+    assert snapshot(appended)['doc_freq'] == expected['doc_freq']
+    assert snapshot(appended)['top_k'] == pytest.approx(expected['top_k'])
+    # only the committed generation is left on disk
+    assert df_files(appended) == ['df.2.bin']
+
+
+def test_append_that_dies_before_commit_leaves_index_intact(tmp_path, monkeypatch):
+    rp = load()
+    labels = list(JOBS)
+    path = str(tmp_path)
+    append_to_index(path, rp, labels[:3])
+    before = snapshot(path)
+
+    write_atomic = term_index._write_atomic
+
+    def crash_on_commit(filename, data, mode='wb'):
+        if filename.endswith('meta.json'):
+            raise OSError("simulated crash")
+        write_atomic(filename, data, mode)
+
+    monkeypatch.setattr(term_index, '_write_atomic', crash_on_commit)
+    with pytest.raises(OSError):
+        append_to_index(path, rp, labels[3:])
+    monkeypatch.undo()
+
+    # row files and the next df generation were written, but meta.json still
+    # names the old generation: nothing the readers see has changed
+    assert df_files(path) == ['df.1.bin', 'df.2.bin']
+    assert snapshot(path) == before
+
+    # the retried append lands the same as if the crash never happened
+    assert append_to_index(path, rp, labels[3:]) == 2
+    fresh = str(tmp_path / 'fresh')
+    write_index(fresh, rp, labels)
+    assert snapshot(path)['doc_freq'] == snapshot(fresh)['doc_freq']
+    assert snapshot(path)['top_k'] == pytest.approx(snapshot(fresh)['top_k'])
+    assert df_files(path) == ['df.2.bin']
+
+
+def reference_top_k(index, query_counts, weighting, k1=1.5, b=0.75):
+    # straight from the definitions, one row and one term at a time
+    term_ids = index.term_ids
+    avgdl = index.meta['total_length'] / index.num_docs
+
+    def weights(counts, length, unseen=False):
+        if weighting == 'raw':
+            return dict(counts)
+        if weighting == 'tfidf':
+            return {t: c * (math.log(1 + index.num_docs) + 1 if unseen and t not in term_ids else index.idf(term_ids[t]))
+                    for t, c in counts.items()}
+        length_norm = k1 * (1 - b + b * length / avgdl)
+        return {t: (math.log(1 + (index.num_docs + 0.5) / 0.5) if unseen and t not in term_ids
+                    else index.bm25_idf(term_ids[t])) * c * (k1 + 1) / (c + length_norm)
+                for t, c in counts.items()}
+
+    terms = sorted(term_ids, key=term_ids.get)
+    query = weights(query_counts, sum(query_counts.values()), unseen=True)
+    query_norm = math.sqrt(sum(v * v for v in query.values()))
+    scores = []
+    for i, label in enumerate(index.labels):
+        ids, counts = index.row(i)
+        row = weights({terms[t]: c for t, c in zip(ids, counts)}, index.lengths[i])
+        dot = sum(w * query.get(t, 0) for t, w in row.items())
+        if dot:
+            scores.append((label, dot / (query_norm * math.sqrt(sum(w * w for w in row.values())))))
+    return sorted(scores, key=lambda item: item[1], reverse=True)
+
+
+@pytest.mark.parametrize('weighting', ['raw', 'tfidf', 'bm25'])
+def test_top_k_matches_the_definitions(tmp_path, weighting):
+    write_index(str(tmp_path), load(), list(JOBS))
+    index = MappedTermIndex(str(tmp_path))
+    try:
+        query = dict(QUERY, golang=3)  # a word the index has never seen
+        expected = reference_top_k(index, query, weighting)
+        for _ in range(2):  # second query reuses the cached idf and norms
+            got = index.top_k(query, k=3, weighting=weighting)
+            assert [score for _, score in got] == pytest.approx([score for _, score in expected[:3]])
+            for label, score in got:  # ties may come back in either order
+                assert score == pytest.approx(dict(expected)[label])
+    finally:
+        index.close()
@@ -0,0 +1,52 @@
+import io
+import random
+import string
+
+from resume_parser import ResumeParser
+from tokenizer import Tokenizer
+
+TEXT = """Senior Python/Java developer -- C++ & cloud-native APIs (AWS, GCP).
+Co-op students: 3+ years? No problem!  Machine-learning, data   pipelines,
+e-mail us at jobs@example.com -
+bar developer abc² x86 Python3 résumé naïve café ...end"""
+
+
+def legacy_words(text, stopwords):
+    """ Filtering the parsers did before the shared tokenizer """
+    text = text.lower().translate(str.maketrans('', '', string.punctuation))
+    return [w for w in text.split()
+            if w not in stopwords and len(w) > 2 and not any(ch.isdigit() for ch in w)]
+
+
+def random_chunks(text, rng, pieces):
+    cuts = sorted(rng.sample(range(1, len(text)), pieces))
+    return [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_count_matches_legacy_filtering():
+    stopwords = ResumeParser.load_stop_words(None)
+    tokenizer = Tokenizer(stopwords)
+    assert tokenizer.tokenize(TEXT) == legacy_words(TEXT, stopwords)
+    assert 'abc²' not in tokenizer.tokenize(TEXT)
+
+
+def test_chunk_ending_in_punctuation_does_not_merge_words():
+    tokenizer = Tokenizer(ResumeParser.load_stop_words(None))
+    chunks = ["python foo -", "bar developer"]
+    assert tokenizer.count_stream(chunks) == tokenizer.count(''.join(chunks))
+    assert 'foobar' not in tokenizer.count_stream(chunks)['wordcount']
+
+
+def test_stream_matches_whole_string_at_random_split_points():
+    tokenizer = Tokenizer(ResumeParser.load_stop_words(None))
+    rng = random.Random(0)
+    expected = tokenizer.count(TEXT)
+    for _ in range(300):
+        chunks = random_chunks(TEXT, rng, rng.randint(1, 40))
+        assert tokenizer.count_stream(chunks) == expected, chunks
+
+
+def test_file_stream_with_tiny_reads():
+    tokenizer = Tokenizer(ResumeParser.load_stop_words(None))
+    for chunk_size in (1, 2, 3, 7, 64):
+        assert tokenizer.count_stream(io.StringIO(TEXT), chunk_size) == tokenizer.count(TEXT)
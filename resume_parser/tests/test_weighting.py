@@ -0,0 +1,49 @@
+import pytest
+
+from resume_parser import ResumeParser
+from sentiment_analysis import JobResumeMatchScorer
+from term_index import MappedTermIndex, write_index
+
+JOBS = {
+    'backend': "python developer django postgresql rest api python backend services docker",
+    'frontend': "javascript react typescript css html frontend developer web design",
+    'data': "python sql pandas machine learning data analysis statistics python reports",
+    'ops': "linux docker kubernetes aws terraform monitoring on call infrastructure",
+}
+RESUME = "python developer django postgresql rest api python backend services docker git"
+
+
+def load():
+    rp = ResumeParser()
+    for label, text in JOBS.items():
+        rp.load_text_from_string(text, label)
+    rp.load_text_from_string(RESUME, 'resume')
+    return rp
+
+
+@pytest.mark.parametrize('weighting', JobResumeMatchScorer.WEIGHTINGS)
+def test_near_identical_pair_is_an_excellent_match(weighting):
+    scorer = JobResumeMatchScorer(load(), weighting=weighting)
+    result = scorer.calculate_match_score('resume', 'backend')
+
+    assert result['match_level'] == 'Excellent Match'
+    assert scorer.compute_weighted_similarity('resume', 'resume') == pytest.approx(1.0)
+    assert scorer.compute_weighted_similarity('resume', 'frontend') < result['cosine_similarity']
+
+
+@pytest.mark.parametrize('weighting', JobResumeMatchScorer.WEIGHTINGS)
+def test_term_index_scores_match_scorer(tmp_path, weighting):
+    rp = load()
+    scorer = JobResumeMatchScorer(rp, weighting=weighting)
+    # index the resume too, so the index's document frequencies and average
+    # length are the parser's
+    write_index(str(tmp_path), rp, list(rp.documents))
+    index = MappedTermIndex(str(tmp_path))
+    try:
+        results = dict(index.top_k(rp.get_wordcount('resume'), k=len(rp.documents), weighting=weighting))
+    finally:
+        index.close()
+
+    for label in JOBS:
+        expected = scorer.compute_weighted_similarity('resume', label)
+        assert results.get(label, 0.0) == pytest.approx(expected)
@@ -0,0 +1,241 @@
+"""
+tokenizer.py
+
+One shared tokenizer for every resume_parser input path (text files, strings
+pulled from the database and extracted PDF text).
+
+Pipeline: lowercase -> strip punctuation -> split on whitespace -> drop
+stopwords, short words and words containing digits -> optional stages
+(stemming, skill phrases, n-grams) -> count.
+
+Text can be tokenized in one go or incrementally from a file/stream in
+fixed-size chunks, so large inputs never have to be held in memory at once.
+"""
+from collections import Counter, deque
+import re
+import string
+
+PUNCT_RE = re.compile(f"[{re.escape(string.punctuation)}]+")
+
+CHUNK_SIZE = 1 << 16  # characters read per step when streaming
+
+
+def normalize(text):
+    """
+    Lowercase and remove ASCII punctuation (same rules the parsers always used).
+    """
+    return PUNCT_RE.sub('', text.lower())
+
+
+class Tokenizer:
+    """
+    Configurable tokenizer pipeline.
+
+    Stages are callables that take an iterator of tokens and return an
+    iterator of tokens; they are applied in order after filtering.
+    """
+
+    def __init__(self, stopwords=None, min_length=3, stages=None):
+        """
+        Args:
+            stopwords: Optional set of words to filter out. When empty or None
+                no filtering is done at all (matches the old parsers).
+            min_length: Shortest word kept when filtering
+            stages: Optional list of token stages (see stem_stage,
+                PhraseStage, NGramStage)
+        """
+        self.stopwords = stopwords
+        self.min_length = min_length
+        self.stages = list(stages) if stages else []
+
+    def _filter(self, words):
+        """
+        Drop stopwords, short words and words with digits.
+        """
+        if not self.stopwords:
+            return words
+
+        sw = self.stopwords
+        min_length = self.min_length
+        # same digit test as the old parsers (str.isdigit, which also covers
+        # superscripts etc.); purely alphabetic words can't contain a digit
+        return [w for w in words
+                if len(w) >= min_length
+                and w not in sw
+                and (w.isalpha() or not any(ch.isdigit() for ch in w))]
+
+    def _apply_stages(self, tokens):
+        for stage in self.stages:
+            tokens = stage(tokens)
+        return tokens
+
+    def _chunk_words(self, chunks):
+        """
+        Yield filtered word lists from an iterable of raw text chunks. A word
+        split across a chunk boundary is carried over to the next chunk raw
+        (before normalization), so the result is the same as tokenizing the
+        joined text.
+        """
+        carry = ''
+        for chunk in chunks:
+            if not chunk:
+                continue
+            text = carry + chunk
+            carry = ''
+            if not text[-1].isspace():
+                # hold back the raw trailing non-whitespace run (scanned from the end)
+                head, *tail = text.rsplit(None, 1)
+                text, carry = (head, tail[0]) if tail else ('', head)
+            yield self._filter(normalize(text).split())
+
+        if carry:
+            yield self._filter(normalize(carry).split())
+
+    def tokenize(self, text):
+        """
+        Tokenize a whole string.
+
+        Returns:
+            List of tokens
+        """
+        words = self._filter(normalize(text).split())
+        if self.stages:
+            return list(self._apply_stages(iter(words)))
+        return words
+
+    def iter_tokens(self, stream, chunk_size=CHUNK_SIZE):
+        """
+        Lazily tokenize a file object (anything with .read) or an iterable of
+        strings such as lines or PDF pages.
+
+        Args:
+            stream: File-like object or iterable of str
+            chunk_size: Characters per read for file-like objects
+
+        Yields:
+            Tokens one at a time
+        """
+        if hasattr(stream, 'read'):
+            chunks = iter(lambda: stream.read(chunk_size), '')
+        else:
+            chunks = stream
+
+        tokens = (w for words in self._chunk_words(chunks) for w in words)
+        return self._apply_stages(tokens)
+
+    def count(self, text):
+        """
+        Tokenize a string and count words.
+
+        Returns:
+            dict: {'wordcount': Counter object, 'numwords': int}
+        """
+        return self._results(Counter(self.tokenize(text)))
+
+    def count_stream(self, stream, chunk_size=CHUNK_SIZE):
+        """
+        Incrementally tokenize and count a file object or iterable of strings.
+
+        Returns:
+            dict: {'wordcount': Counter object, 'numwords': int}
+        """
+        return self._results(Counter(self.iter_tokens(stream, chunk_size)))
+
+    def count_file(self, filename, chunk_size=CHUNK_SIZE):
+        """
+        Incrementally tokenize and count a text file.
+
+        Returns:
+            dict: {'wordcount': Counter object, 'numwords': int}
+        """
+        with open(filename, 'r') as f:
+            return self.count_stream(f, chunk_size)
+
+    @staticmethod
+    def _results(counter):
+        return {'wordcount': counter,
+                'numwords': sum(counter.values())}
+
+
+def count_words(text, stopwords=None):
+    """
+    Convenience wrapper: count a string with the default pipeline.
+    """
+    return Tokenizer(stopwords).count(text)
+
+
+# ---- pluggable stages --------------------------------------------------------
+
+def stem_stage(stem):
+    """
+    Build a stage that maps every token through a stemming function,
+    e.g. stem_stage(nltk.stem.PorterStemmer().stem).
+    """
+    def stage(tokens):
+        return map(stem, tokens)
+    return stage
+
+
+class PhraseStage:
+    """
+    Merge known multi-word skill phrases ("machine learning") into a single
+    token. Phrases are normalized with the same rules as the text and matched
+    greedily, longest first, over the filtered token stream.
+    """
+
+    def __init__(self, phrases, joiner=' '):
+        self.joiner = joiner
+        self.phrases = set()
+        self.max_len = 1
+        for phrase in phrases:
+            words = tuple(normalize(phrase).split())
+            if len(words) > 1:
+                self.phrases.add(words)
+                self.max_len = max(self.max_len, len(words))
+
+    def __call__(self, tokens):
+        window = deque()
+        tokens = iter(tokens)
+        exhausted = False
+
+        while True:
+            # keep enough lookahead to match the longest phrase
+            while not exhausted and len(window) < self.max_len:
+                try:
+                    window.append(next(tokens))
+                except StopIteration:
+                    exhausted = True
+            if not window:
+                return
+
+            for size in range(min(self.max_len, len(window)), 1, -1):
+                candidate = tuple(window[i] for i in range(size))
+                if candidate in self.phrases:
+                    for _ in range(size):
+                        window.popleft()
+                    yield self.joiner.join(candidate)
+                    break
+            else:
+                yield window.popleft()
+
+
+class NGramStage:
+    """
+    Emit n-grams (joined with a space) alongside, or instead of, the unigrams.
+    """
+
+    def __init__(self, n=2, keep_unigrams=True, joiner=' '):
+        if n < 2:
+            raise ValueError(f"n must be at least 2, got {n}")
+        self.n = n
+        self.keep_unigrams = keep_unigrams
+        self.joiner = joiner
+
+    def __call__(self, tokens):
+        window = deque(maxlen=self.n)
+        for token in tokens:
+            window.append(token)
+            if self.keep_unigrams:
+                yield token
+            if len(window) == self.n:
+                yield self.joiner.join(window)
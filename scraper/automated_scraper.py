@@ -1,13 +1,23 @@
 import sys
 import os
+import json
 import pickle
+import hashlib
+import time
 from datetime import datetime
 
 # Add parent directory to path
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
-
-from scraper import scrape_with_cookies, NUWorksScraper
+sys.path.insert(0, os.path.join(parent_dir, 'resume_parser'))
+
+from scraper import NUWorksScraper, NUWORKS_URL, RUN_BUDGET
+from profiler import Profiler
+from cookie_probe import cookies_expire_at, probe_session
+from session_pool import BrowserSessionPool, SessionExpiredError
+import retry
+from retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from minhash import MinHasher, LSHIndex, collapse_duplicates, job_text
 from supabase import create_client
 from dotenv import load_dotenv
 
@@ -21,10 +31,88 @@ supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 # ADMIN COOKIES - Used for all users
 ADMIN_COOKIES_FILE = 'cookies_admin.pkl'
 
+# Result of the last successful cookie check, keyed by a fingerprint of the
+# cookies, so cron runs within COOKIE_RECHECK_SEC skip validation entirely
+COOKIE_STATUS_FILE = 'cookie_status.json'
+COOKIE_RECHECK_SEC = 60 * 60
+
+# Estimated Jaccard similarity (title + company + description shingles)
+# above which two postings are treated as the same job
+DUPLICATE_THRESHOLD = 0.8
+
+# Database calls share the scraper's per-run retry budget; their own breaker
+# stops a run from hammering Supabase while it is down
+DB_BREAKER = CircuitBreaker('supabase', failure_threshold=5, reset_timeout=60)
+db_retry = RetryPolicy(max_attempts=4, base_delay=0.5, max_delay=10.0, budget=RUN_BUDGET, breaker=DB_BREAKER)
+
+# Per-call-site retry statistics from the last run
+RETRY_STATS_FILE = 'retry_stats.json'
+
+
+def cookie_fingerprint(cookies):
+    """Hash of the cookie names and values, to tell whether a cached status applies"""
+    pairs = sorted((c.get('name', ''), c.get('value', '')) for c in cookies)
+    return hashlib.sha256(json.dumps(pairs).encode('utf-8')).hexdigest()
+
+
+def load_cookie_status(cookies):
+    """Cached 'valid until' time for these exact cookies, if still in the future"""
+    try:
+        with open(COOKIE_STATUS_FILE, 'r') as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if status.get('fingerprint') != cookie_fingerprint(cookies) or status.get('valid_until', 0) <= time.time():
+        return None
+    return status['valid_until']
+
+
+def save_cookie_status(cookies, valid_until):
+    with open(COOKIE_STATUS_FILE, 'w') as f:
+        json.dump({
+            'fingerprint': cookie_fingerprint(cookies),
+            'valid_until': valid_until,
+            'checked_at': time.time(),
+        }, f, indent=2)
+
 
 def validate_cookies(cookies):
-    """Test if cookies are still valid by attempting to access the job page"""
+    """
+    Check the cookies without a browser: expiry metadata first, then a
+    cached result, then one HTTP probe. Chrome is only started if the probe
+    cannot reach a verdict.
+    """
     print("Validating cookies...")
+    now = time.time()
+
+    expires_at = cookies_expire_at(cookies, NUWORKS_URL)
+    if expires_at is not None and expires_at <= now:
+        print(f"Cookies EXPIRED at {datetime.fromtimestamp(expires_at)}")
+        return False
+
+    cached = load_cookie_status(cookies)
+    if cached is not None:
+        print(f"Cookies are valid (cached result, good until {datetime.fromtimestamp(cached):%H:%M})")
+        return True
+
+    valid = probe_session(cookies, NUWORKS_URL)
+    if valid is None:
+        print("Probe inconclusive, falling back to a browser check")
+        valid = validate_cookies_in_browser(cookies)
+    if not valid:
+        print("Cookies are INVALID or EXPIRED")
+        return False
+
+    valid_until = now + COOKIE_RECHECK_SEC
+    if expires_at is not None:
+        valid_until = min(valid_until, expires_at)
+    save_cookie_status(cookies, valid_until)
+    print("Cookies are valid!")
+    return True
+
+
+def validate_cookies_in_browser(cookies):
+    """Test if cookies are still valid by attempting to access the job page"""
     scraper = NUWorksScraper(headless=True)
 
     try:
@@ -33,12 +121,7 @@ def validate_cookies(cookies):
         scraper.login_with_cookies(cookies)
 
         # Check if we're actually logged in
-        if "signin" in scraper.driver.current_url.lower() or "sign-in" in scraper.driver.title.lower():
-            print("Cookies are INVALID or EXPIRED")
-            return False
-
-        print("Cookies are valid!")
-        return True
+        return not ("signin" in scraper.driver.current_url.lower() or "sign-in" in scraper.driver.title.lower())
 
     except Exception as e:
         print(f"Cookie validation failed: {e}")
@@ -126,6 +209,133 @@ def save_fresh_cookies():
         driver.quit()
 
 
+def content_hash(text):
+    """Stable hash of a scoring input, stored next to each score"""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def pending_match_jobs(user, resume_hash):
+    """
+    Jobs whose match score with this user's resume must be (re)computed.
+
+    A resume that was scored before and has not changed only needs the jobs
+    inserted since the last run, one indexed range read on jobs.id. Job text
+    is never rewritten once scraped, so those are the only new pairs.
+    Otherwise (new or edited resume) every job of the user is read, and pairs
+    whose stored resume/job hashes still match are left alone.
+
+    Returns:
+        (list of (job row, job hash), highest job id now covered)
+    """
+    user_id = user['id']
+    scored_through = user.get('scored_through_job_id')
+
+    if scored_through is not None and user.get('scored_resume_hash') == resume_hash:
+        jobs = db_retry.call(supabase.table('jobs')
+                             .select('id, title, company, description')
+                             .eq('user_id', user_id)
+                             .gt('id', scored_through)
+                             .execute, site='jobs.select').data or []
+        return ([(job, content_hash(job_text(job))) for job in jobs],
+                max([job['id'] for job in jobs], default=scored_through))
+
+    jobs = db_retry.call(supabase.table('jobs')
+                         .select('id, title, company, description')
+                         .eq('user_id', user_id)
+                         .execute, site='jobs.select').data or []
+    existing = db_retry.call(supabase.table('match_scores')
+                             .select('job_id, resume_hash, job_hash')
+                             .eq('user_id', user_id)
+                             .execute, site='match_scores.select').data or []
+    scored = {row['job_id']: (row['resume_hash'], row['job_hash']) for row in existing}
+
+    pending = []
+    for job in jobs:
+        job_hash = content_hash(job_text(job))
+        if scored.get(job['id']) != (resume_hash, job_hash):
+            pending.append((job, job_hash))
+    return pending, max([job['id'] for job in jobs], default=scored_through)
+
+
+def materialize_match_scores(users):
+    """
+    Scoring stage run after ingestion. Scores each user's resume against their
+    jobs and upserts the results into match_scores, together with content
+    hashes of both inputs. Only (user, job) pairs whose resume or job text
+    changed since they were last scored are recomputed (see
+    pending_match_jobs), so a run after a scrape only reads and scores the
+    new jobs, or every job of a user who updated their resume.
+
+    Each user row records the resume hash and the highest job id it has been
+    scored through, written only after that user's scores are stored.
+    """
+    # Heavy NLP imports only when this stage actually runs
+    from resume_parser import ResumeParser, set_profiler
+    from sentiment_analysis import JobResumeMatchScorer
+
+    # parser and scorer spans nest under the scraper's own in Profiler reports
+    set_profiler(Profiler.span)
+
+    print("\n" + "=" * 60)
+    print("MATCH SCORING")
+    print("=" * 60)
+
+    total_scored = 0
+    no_resume = 0
+
+    for user in users:
+        resume_text = user.get('resume_text')
+        if not resume_text:
+            print(f"WARNING: No resume_text for {user.get('email', user['id'])}, skipping match scoring")
+            no_resume += 1
+            continue
+
+        user_id = user['id']
+        resume_hash = content_hash(resume_text)
+        pending, scored_through = pending_match_jobs(user, resume_hash)
+
+        if pending:
+            # Fresh parser and scorer per user, so vocabulary and cached
+            # statistics don't pile up across the whole user list
+            parser = ResumeParser()
+            scorer = JobResumeMatchScorer(parser)
+            resume_label = f"resume:{user_id}"
+            parser.load_text_from_string(resume_text, resume_label)
+
+            rows = []
+            for job, job_hash in pending:
+                job_label = f"job:{job['id']}"
+                parser.load_text_from_string(job_text(job), job_label)
+                result = scorer.calculate_match_score(resume_label, job_label)
+                rows.append({
+                    'user_id': user_id,
+                    'job_id': job['id'],
+                    'total_score': result['total_score'],
+                    'cosine_similarity': result['cosine_similarity'],
+                    'jaccard_similarity': result['jaccard_similarity'],
+                    'keyword_coverage': result['keyword_coverage'],
+                    'match_level': result['match_level'],
+                    'resume_hash': resume_hash,
+                    'job_hash': job_hash,
+                    'scored_at': datetime.now().isoformat(),
+                })
+                parser.remove(job_label)
+
+            db_retry.call(supabase.table('match_scores').upsert(rows, on_conflict='user_id,job_id').execute,
+                          site='match_scores.upsert')
+            total_scored += len(rows)
+            print(f"Scored {len(rows)} jobs for {user.get('email', user_id)}")
+
+        if (scored_through, resume_hash) != (user.get('scored_through_job_id'), user.get('scored_resume_hash')):
+            db_retry.call(supabase.table('users')
+                          .update({'scored_resume_hash': resume_hash, 'scored_through_job_id': scored_through})
+                          .eq('id', user_id)
+                          .execute, site='users.update')
+
+    print(f"Scored: {total_scored} pairs, users without a resume: {no_resume}")
+    print("=" * 60 + "\n")
+
+
 def scrape_for_all_users():
     """
     Automated scraper: Uses admin cookies to scrape personalized jobs for each user
@@ -134,6 +344,9 @@ def scrape_for_all_users():
     print(f"AUTOMATED SCRAPER - {datetime.now()}")
     print("=" * 60 + "\n")
 
+    RUN_BUDGET.reset()
+    retry.reset_stats()
+
     # Check if admin cookies exist
     if not os.path.exists(ADMIN_COOKIES_FILE):
         print(f"ERROR: Admin cookies not found!")
@@ -162,7 +375,7 @@ def scrape_for_all_users():
             return
 
     # Get all users from database
-    response = supabase.table('users').select('*').execute()
+    response = db_retry.call(supabase.table('users').select('*').execute, site='users.select')
     users = response.data
 
     if not users:
@@ -171,82 +384,113 @@ def scrape_for_all_users():
 
     print(f"Found {len(users)} users in database\n")
 
+    # One hasher for the whole run; signatures are memoized by job text since
+    # the same postings come back for many users and search terms
+    hasher = MinHasher()
+    signatures = {}
+
+    def signature_of(job):
+        text = job_text(job)
+        if text not in signatures:
+            signatures[text] = hasher.signature(text)
+        return signatures[text]
+
     # Scrape for each user
     total_jobs_added = 0
     successful_users = 0
     failed_users = 0
 
-    for user in users:
-        user_id = user['id']
-        email = user['email']
-        major = user.get('major', 'Computer Science')
-
-        print(f"\n{'=' * 60}")
-        print(f"Processing: {email}")
-        print(f"Major: {major}")
-        print(f"{'=' * 60}")
-
-        try:
-            print("Starting scrape...")
-
-            # Use ADMIN cookies to scrape based on THIS user's major
-            jobs = scrape_with_cookies(
-                cookies=admin_cookies,
-                search_term=major,
-                location='Boston, MA, USA',
-                max_jobs=20
-            )
-
-            print(f"Scraper returned {len(jobs)} jobs")
-
-            # Save jobs to database with THIS user's ID
-            jobs_added = 0
-            for job in jobs:
-                try:
-                    job['user_id'] = user_id
-                    job['status'] = 'active'
-
-                    # Clean numeric fields - convert "Not listed" to None
-                    if job.get('minimum_gpa') == 'Not listed':
-                        job['minimum_gpa'] = None
-                    if job.get('compensation') == 'Not listed':
-                        job['compensation'] = None
-
-                    # Check if job already exists for this user
-                    existing = supabase.table('jobs') \
-                        .select('id') \
-                        .eq('user_id', user_id) \
-                        .eq('title', job['title']) \
-                        .eq('company', job['company']) \
-                        .execute()
-
-                    if existing.data:
-                        print(f"  SKIPPED: Duplicate - {job['title']} at {job['company']}")
+    # One warm, logged-in browser for the whole run instead of one per user
+    with BrowserSessionPool(admin_cookies, lean=True) as pool:
+        for user in users:
+            user_id = user['id']
+            email = user['email']
+            major = user.get('major', 'Computer Science')
+
+            print(f"\n{'=' * 60}")
+            print(f"Processing: {email}")
+            print(f"Major: {major}")
+            print(f"{'=' * 60}")
+
+            try:
+                print("Starting scrape...")
+
+                # Use ADMIN cookies to scrape based on THIS user's major
+                jobs = pool.scrape(
+                    search_term=major,
+                    location='Boston, MA, USA',
+                    max_jobs=20
+                )
+
+                print(f"Scraper returned {len(jobs)} jobs")
+
+                # Collapse near-duplicates within this scrape
+                jobs, collapsed = collapse_duplicates(jobs, hasher=hasher, threshold=DUPLICATE_THRESHOLD)
+                if collapsed:
+                    print(f"Collapsed {len(collapsed)} near-duplicate postings")
+
+                # Index this user's existing jobs once instead of querying per job
+                existing = db_retry.call(supabase.table('jobs')
+                                         .select('id, title, company, description')
+                                         .eq('user_id', user_id)
+                                         .execute, site='jobs.select')
+                seen = LSHIndex(hasher.num_perm, threshold=DUPLICATE_THRESHOLD)
+                seen_titles = set()
+                for row in existing.data or []:
+                    seen_titles.add((row.get('title'), row.get('company')))
+                    sig = signature_of(row)
+                    if sig is not None:
+                        seen.add(row['id'], sig)
+
+                # Save jobs to database with THIS user's ID
+                jobs_added = 0
+                for job in jobs:
+                    try:
+                        # the scrapers already turn "Not listed" fields into None
+                        job['user_id'] = user_id
+                        job['status'] = 'active'
+
+                        # Check if job (or a near-duplicate of it) already exists for this user
+                        sig = signature_of(job)
+                        if (job.title, job.company) in seen_titles or (sig is not None and seen.query(sig)):
+                            print(f"  SKIPPED: Duplicate - {job.title} at {job.company}")
+                            continue
+
+                        # Insert only if it doesn't exist
+                        db_retry.call(supabase.table('jobs').insert(job.to_dict()).execute, site='jobs.insert')
+                        jobs_added += 1
+                        seen_titles.add((job.title, job.company))
+                        if sig is not None:
+                            seen.add(('new', jobs_added), sig)
+
+                    except CircuitOpenError:
+                        raise
+                    except Exception as e:
+                        # Check if it's a duplicate error from database constraint
+                        if 'unique_user_job' in str(e) or '23505' in str(e):
+                            print(
+                                f"  SKIPPED: Duplicate - {job.get('title', 'Unknown')} at {job.get('company', 'Unknown')}")
+                        else:
+                            print(f"  WARNING: Could not insert job: {e}")
                         continue
 
-                    # Insert only if it doesn't exist
-                    supabase.table('jobs').insert(job).execute()
-                    jobs_added += 1
-
-                except Exception as e:
-                    # Check if it's a duplicate error from database constraint
-                    if 'unique_user_job' in str(e) or '23505' in str(e):
-                        print(
-                            f"  SKIPPED: Duplicate - {job.get('title', 'Unknown')} at {job.get('company', 'Unknown')}")
-                    else:
-                        print(f"  WARNING: Could not insert job: {e}")
-                    continue
-
-            print(f"SUCCESS: Added {jobs_added} jobs for {email}")
-            total_jobs_added += jobs_added
-            successful_users += 1
-
-        except Exception as e:
-            print(f"ERROR: Failed to scrape for {email}: {e}")
-            import traceback
-            print(traceback.format_exc())
-            failed_users += 1
-            continue
+                print(f"SUCCESS: Added {jobs_added} jobs for {email}")
+                total_jobs_added += jobs_added
+                successful_users += 1
+
+            except (CircuitOpenError, SessionExpiredError) as e:
+                # the portal or database is down, or the admin cookies were
+                # revoked mid-run; later users would fail the same way
+                print(f"ERROR: {e} - stopping this run")
+                failed_users += 1
+                break
+
+            except Exception as e:
+                print(f"ERROR: Failed to scrape for {email}: {e}")
+                import traceback
+                print(traceback.format_exc())
+                failed_users += 1
+                continue
 
     # Print summary
     print("\n" + "=" * 60)
@@ -255,8 +499,18 @@ def scrape_for_all_users():
     print(f"Successful: {successful_users} users")
     print(f"Failed: {failed_users} users")
     print(f"Total jobs added: {total_jobs_added}")
+    print(f"Retries used: {RUN_BUDGET.used}/{RUN_BUDGET.max_retries}")
     print("=" * 60 + "\n")
 
+    # Score new/changed (user, job) pairs so reads are a lookup
+    try:
+        materialize_match_scores(users)
+    except Exception as e:
+        print(f"ERROR: Match scoring failed: {e}")
+
+    retry.report()
+    retry.export_stats(RETRY_STATS_FILE)
+
 
 if __name__ == "__main__":
     scrape_for_all_users()
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+bench_scraper.py
+
+Throughput benchmark for NUWorksScraper against the local replay server, so
+scraping speed can be measured and compared between changes without the live
+portal. Reports jobs/sec, requests served, extraction mismatches and the
+per-phase latency table from the run trace.
+
+    python bench_scraper.py [--jobs coopsearch.json | --count 40] [--per-page 20]
+                            [--latency-ms 100] [--jitter-ms 50] [--max-jobs N]
+                            [--runs 1] [--full-flow] [--assets 8] [--profile default|lean|both]
+                            [--trace run.json] [--output bench.json]
+
+--full-flow also runs search, results, location and co-op filter steps
+before scraping. --assets makes every page reference images and an
+analytics script; --profile both runs the default and the lean browser
+profile against the same server and reports the time saved per page load. Traces written with --trace can be compared with
+`python run_trace.py compare BASELINE.json NEW.json`.
+"""
+import argparse
+import json
+import time
+
+from replay_server import ReplayServer, load_recorded_jobs, synthetic_jobs
+from run_trace import print_report
+from scraper import NUWorksScraper
+
+
+def count_mismatches(scraped, expected):
+    """
+    Number of scraped jobs whose title or company differs from the served job
+    at the same position (NOT QUALIFIED rows are still listed, so order holds).
+    """
+    mismatches = abs(len(expected) - len(scraped))
+    for got, want in zip(scraped, expected):
+        if got['title'] != want.get('title') or got['company'] != want.get('company'):
+            mismatches += 1
+    return mismatches
+
+
+def run_once(server, search_term, location, max_jobs, full_flow, trace_file=None, lean=False):
+    scraper = NUWorksScraper(headless=True, trace_file=trace_file, base_url=server.base_url, lean=lean,
+                             time_pages=True)
+    try:
+        scraper.initialize_driver()
+        scraper.driver.get(server.base_url + server.list_url(1))
+        if full_flow:
+            scraper.search(search_term)
+            scraper.get_job_results()
+            scraper.filter_by_location(location)
+            scraper.filter_by_coop()
+
+        requests_before = server.requests
+        start = time.perf_counter()
+        jobs = scraper.scrape_all_jobs(search_term, location, max_jobs)
+        seconds = time.perf_counter() - start
+
+        expected = server.jobs[:max_jobs] if max_jobs else server.jobs
+        return {
+            'profile': 'lean' if lean else 'default',
+            'jobs': len(jobs),
+            'seconds': round(seconds, 3),
+            'jobs_per_sec': round(len(jobs) / seconds, 3) if seconds else 0.0,
+            'requests': server.requests - requests_before,
+            'mismatches': count_mismatches(jobs, expected),
+            'page_loads': scraper.page_load_summary(),
+            'trace': scraper.trace.to_dict(),
+        }
+    finally:
+        scraper.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark NUWorksScraper against the replay server")
+    ap.add_argument('--jobs', help="Recorded jobs JSON to serve (default: synthetic)")
+    ap.add_argument('--count', type=int, default=40, help="Synthetic job count")
+    ap.add_argument('--per-page', type=int, default=20)
+    ap.add_argument('--latency-ms', type=float, default=0.0)
+    ap.add_argument('--jitter-ms', type=float, default=0.0)
+    ap.add_argument('--max-jobs', type=int, default=None)
+    ap.add_argument('--runs', type=int, default=1)
+    ap.add_argument('--full-flow', action='store_true', help="Include search and filter steps")
+    ap.add_argument('--assets', type=int, default=0, help="Images (+ analytics script) per page")
+    ap.add_argument('--profile', choices=('default', 'lean', 'both'), default='default',
+                    help="Browser profile to run")
+    ap.add_argument('--trace', help="Write the last run's phase trace here")
+    ap.add_argument('--output', help="Write all run results as JSON")
+    args = ap.parse_args(argv)
+
+    jobs = load_recorded_jobs(args.jobs) if args.jobs else synthetic_jobs(args.count)
+    profiles = ('default', 'lean') if args.profile == 'both' else (args.profile,)
+    results = []
+    with ReplayServer(jobs, per_page=args.per_page, latency=args.latency_ms / 1000,
+                      jitter=args.jitter_ms / 1000, assets=args.assets) as server:
+        for profile in profiles:
+            for run in range(args.runs):
+                last = profile == profiles[-1] and run == args.runs - 1
+                results.append(run_once(server, "software engineering", "Boston, MA, USA",
+                                        args.max_jobs, args.full_flow, args.trace if last else None,
+                                        lean=profile == 'lean'))
+
+    print(f"\n{len(jobs)} jobs on {server.num_pages} pages, latency {args.latency_ms:.0f} "
+          f"+ up to {args.jitter_ms:.0f} ms\n")
+    print(f"{'Run':>4} {'Profile':>8} {'Jobs':>6} {'Seconds':>9} {'Jobs/sec':>9} {'Requests':>9} "
+          f"{'Mismatch':>9} {'Wait ms':>8} {'KiB':>6}")
+    print("-" * 79)
+    for i, r in enumerate(results, 1):
+        loads = r['page_loads']
+        print(f"{i:4d} {r['profile']:>8} {r['jobs']:6d} {r['seconds']:9.2f} {r['jobs_per_sec']:9.3f} "
+              f"{r['requests']:9d} {r['mismatches']:9d} {loads.get('mean_waited_ms', 0):8.0f} "
+              f"{loads.get('mean_bytes', 0) / 1024:6.0f}")
+
+    if len(profiles) == 2:
+        waited = {p: [r['page_loads'].get('mean_waited_ms', 0) for r in results if r['profile'] == p]
+                  for p in profiles}
+        default_ms, lean_ms = (sum(waited[p]) / len(waited[p]) for p in profiles)
+        print(f"\nLean profile saves {default_ms - lean_ms:.0f} ms per page load "
+              f"({default_ms:.0f} -> {lean_ms:.0f} ms waited)")
+    print()
+    print_report(results[-1]['trace'])
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'runs': results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+cookie_probe.py
+
+Browser-free check of saved portal cookies: their expiry metadata and one
+plain HTTP request for the job list with the cookies attached. Kept apart
+from automated_scraper so it imports nothing but the standard library.
+"""
+from urllib.parse import urlparse
+import re
+import urllib.error
+import urllib.request
+
+PROBE_TIMEOUT = 15
+
+
+def portal_cookies(cookies, base_url):
+    """Cookies the browser would send to the portal host"""
+    host = urlparse(base_url).hostname
+    return [c for c in cookies
+            if not c.get('domain') or host == c['domain'].lstrip('.') or host.endswith('.' + c['domain'].lstrip('.'))]
+
+
+def cookies_expire_at(cookies, base_url):
+    """
+    Earliest 'expiry' (epoch seconds) among the portal cookies, or None if
+    they are all session cookies without one.
+    """
+    expiries = [c['expiry'] for c in portal_cookies(cookies, base_url) if c.get('expiry')]
+    return min(expiries) if expiries else None
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None  # surface the 3xx so a bounce to the sign-in page is visible
+
+
+def probe_session(cookies, base_url, timeout=PROBE_TIMEOUT):
+    """
+    One HTTP request for the job list with the cookies attached.
+
+    Returns:
+        True if the portal served the page, False if it sent us to sign in,
+        None if the probe itself failed (network error, unexpected status)
+    """
+    url = f"{base_url}/students/index.php?mode=list&s=jobs"
+    cookie_header = '; '.join(f"{c['name']}={c['value']}" for c in portal_cookies(cookies, base_url))
+    request = urllib.request.Request(url, headers={
+        'Cookie': cookie_header,
+        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) CoopScout cookie check',
+    })
+    opener = urllib.request.build_opener(_NoRedirect)
+
+    try:
+        with opener.open(request, timeout=timeout) as response:
+            body = response.read(256 * 1024).decode('utf-8', errors='replace')
+            final_url = response.geturl()
+    except urllib.error.HTTPError as e:
+        if 300 <= e.code < 400:
+            return 'signin' not in (e.headers.get('Location') or '').lower()
+        if e.code in (401, 403):
+            return False
+        print(f"Cookie probe got HTTP {e.code}")
+        return None
+    except (urllib.error.URLError, OSError) as e:
+        print(f"Cookie probe failed: {e}")
+        return None
+
+    title = re.search(r'<title[^>]*>(.*?)</title>', body, re.IGNORECASE | re.DOTALL)
+    title = title.group(1).lower() if title else ''
+    return 'signin' not in final_url.lower() and 'sign-in' not in title and 'sign in' not in title
@@ -0,0 +1,225 @@
+"""
+job_record.py
+
+Compact record for one scraped job posting, used instead of a plain dict by
+the scrapers, the database ingestion and coopsearch.json loading.
+
+A dict per job costs a hash table plus its own copy of every string. Large
+scrape batches repeat a few values over and over: the search keywords and
+location, company, location, deadline, status and long targeted major lists.
+JobRecord keeps the fields in __slots__ and sys.intern()s those
+low-cardinality fields, so a batch holds a single copy of each value.
+Per-posting values (title, description, link, timestamps, user ids) are
+stored as given: interned strings are never freed on CPython 3.12+, so
+interning unbounded values would leak across runs.
+
+    job = JobRecord(title=..., company=..., search_keywords=term, ...)
+    job['status'] = 'active'            # dict-style access still works
+    supabase.table('jobs').insert(job.to_dict())
+
+    jobs = load_jobs('coopsearch.json')  # validated once, here
+    save_jobs(jobs, 'coopsearch.json')
+
+The schema is checked only where data comes from outside (from_dict, and so
+load_jobs). The scrapers build records with the constructor directly and
+nothing re-checks them later.
+
+    python job_record.py coopsearch.json [--copies 500]
+
+prints the memory used by the file's jobs as dicts and as JobRecords.
+"""
+from operator import attrgetter
+import argparse
+import json
+import sys
+import tracemalloc
+
+# field --> accepted value type (None is always accepted)
+SCHEMA = {
+    'title': str,
+    'company': str,
+    'location': str,
+    'deadline': str,
+    'compensation': str,
+    'targeted_major': str,
+    'minimum_gpa': float,
+    'description': str,
+    'job_link': str,
+    'scraped_at': str,
+    'search_keywords': str,
+    'search_location': str,
+}
+
+# Set during ingestion (and present in older coopsearch.json files); left
+# out of to_dict() while unset
+EXTRA_FIELDS = ('status', 'user_id')
+
+FIELDS = tuple(SCHEMA) + EXTRA_FIELDS
+
+# Low-cardinality values shared by many jobs in a batch
+INTERNED_FIELDS = frozenset(('company', 'location', 'deadline', 'targeted_major',
+                             'search_keywords', 'search_location', 'status'))
+
+# What the portal shows for an empty field
+NOT_LISTED = "Not listed"
+
+
+class SchemaError(ValueError):
+    """ A job dict does not match the JobRecord schema """
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class JobRecord:
+    """ One job posting. Fields are those in SCHEMA plus EXTRA_FIELDS. """
+
+    __slots__ = FIELDS
+
+    def __init__(self, title=None, company=None, location=None, deadline=None, compensation=None,
+                 targeted_major=None, minimum_gpa=None, description=None, job_link=None, scraped_at=None,
+                 search_keywords=None, search_location=None, status=None, user_id=None):
+        self.title = title
+        self.company = _intern(company)
+        self.location = _intern(location)
+        self.deadline = _intern(deadline)
+        self.compensation = compensation
+        self.targeted_major = _intern(targeted_major)
+        self.minimum_gpa = minimum_gpa
+        self.description = description
+        self.job_link = job_link
+        self.scraped_at = scraped_at
+        self.search_keywords = _intern(search_keywords)
+        self.search_location = _intern(search_location)
+        self.status = _intern(status)
+        self.user_id = user_id
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from a job dict (scraper output, coopsearch.json, an API
+        row), checking it against SCHEMA. "Not listed" becomes None and a
+        numeric minimum_gpa string becomes a float.
+
+        Raises:
+            SchemaError: Unknown field or a value of the wrong type
+        """
+        unknown = data.keys() - _FIELD_SET
+        if unknown:
+            raise SchemaError(f"Unknown job field(s): {', '.join(sorted(unknown))}")
+
+        values = {}
+        for field, value in data.items():
+            if value == NOT_LISTED:
+                value = None
+            elif field == 'minimum_gpa' and value is not None and not isinstance(value, float):
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    raise SchemaError(f"minimum_gpa is not a number: {value!r}") from None
+            elif value is not None and not isinstance(value, SCHEMA.get(field, str)):
+                raise SchemaError(f"{field} should be {SCHEMA.get(field, str).__name__}, "
+                                  f"got {type(value).__name__}")
+            values[field] = value
+        return cls(**values)
+
+    def to_dict(self):
+        """ Plain dict (JSON- and database-ready); unset EXTRA_FIELDS are left out """
+        data = dict(zip(FIELDS, _values(self)))
+        for field in EXTRA_FIELDS:
+            if data[field] is None:
+                del data[field]
+        return data
+
+    def fill_missing(self, other):
+        """ Copy other's values into the fields that are None here """
+        for field in FIELDS:
+            if getattr(self, field) is None:
+                value = getattr(other, field)
+                if value is not None:
+                    setattr(self, field, value)
+
+    # dict-style access, so code written against job dicts keeps working
+
+    def __getitem__(self, field):
+        if field not in _FIELD_SET:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field not in _FIELD_SET:
+            raise KeyError(field)
+        setattr(self, field, _intern(value) if field in INTERNED_FIELDS else value)
+
+    def __contains__(self, field):
+        return field in _FIELD_SET and getattr(self, field) is not None
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None) if field in _FIELD_SET else None
+        return default if value is None else value
+
+    def __eq__(self, other):
+        if not isinstance(other, JobRecord):
+            return NotImplemented
+        return _values(self) == _values(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"JobRecord(title={self.title!r}, company={self.company!r})"
+
+
+_FIELD_SET = frozenset(FIELDS)
+_values = attrgetter(*FIELDS)
+
+
+def load_jobs(filename):
+    """
+    Load a coopsearch.json-style file (a job dict or a list of them) as JobRecords.
+    """
+    with open(filename, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    return [JobRecord.from_dict(job) for job in data]
+
+
+def save_jobs(jobs, filename):
+    with open(filename, 'w') as f:
+        json.dump([job.to_dict() for job in jobs], f, indent=2)
+
+
+def _traced_bytes(build):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return used, kept
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare job dict and JobRecord memory use")
+    ap.add_argument('jobs', help="Jobs JSON file (e.g. coopsearch.json)")
+    ap.add_argument('--copies', type=int, default=500, help="Times to repeat the file's jobs")
+    args = ap.parse_args(argv)
+
+    with open(args.jobs, 'r') as f:
+        text = f.read()
+    # each copy is parsed separately, like jobs arriving from separate scrapes
+    dict_bytes, dicts = _traced_bytes(lambda: [job for _ in range(args.copies) for job in json.loads(text)])
+    record_bytes, records = _traced_bytes(
+        lambda: [JobRecord.from_dict(job) for _ in range(args.copies) for job in json.loads(text)])
+
+    n = len(records)
+    print(f"{n} jobs ({args.copies} copies of {args.jobs})")
+    print(f"  dicts:      {dict_bytes / 1024:10.0f} KiB  {dict_bytes / n:8.0f} B/job")
+    print(f"  JobRecords: {record_bytes / 1024:10.0f} KiB  {record_bytes / n:8.0f} B/job")
+    print(f"  saved:      {(dict_bytes - record_bytes) / dict_bytes:10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+network_capture.py
+
+Read job postings from the JSON API responses behind the NUworks job views
+instead of scraping them back out of the rendered DOM.
+
+With performance logging enabled (NUWorksScraper(capture_network=True)),
+Chrome reports every network event to the driver. After the search and
+filters have been applied in the UI, the job list request they triggered is
+found in those events. Its response body is read with the DevTools command
+Network.getResponseBody, and further result pages are requested directly
+with fetch() from inside the page, which reuses the browser's login cookies.
+Postings whose list entry has no description get one detail request each.
+No clicks, DOM waits or element text reads are involved per job.
+
+Symplicity's payloads are not documented, so the endpoints and the field
+names tried for each job dict key are module-level settings (LIST_API_RE,
+DETAIL_API_PATH, FIELD_ALIASES) rather than hard-wired.
+"""
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+import base64
+import html
+import json
+import re
+
+from job_record import JobRecord
+
+# Job list / detail API calls made by the student job views
+LIST_API_RE = re.compile(r'/api/v\d+/jobs(\?|$)')
+DETAIL_API_PATH = '/api/v2/jobs/{id}'
+JOB_LINK_PATH = '/students/app/jobs/detail/{id}'
+
+# Keys that hold the list of postings in a list response
+LIST_KEYS = ('models', 'jobs', 'results', 'data', 'items')
+
+# job dict key --> payload keys tried in order ('a.b' looks inside nested objects)
+FIELD_ALIASES = {
+    'id': ('job_id', 'id'),
+    'title': ('job_title', 'title', 'name'),
+    'company': ('employer_name', 'employer.name', 'company', 'organization'),
+    'location': ('location', 'job_location', 'city_state', 'locations'),
+    'deadline': ('job_deadline', 'deadline', 'application_deadline', 'expiration_date'),
+    'compensation': ('compensation', 'salary', 'pay_rate', 'wage'),
+    'targeted_major': ('targeted_academic_majors', 'majors', 'major'),
+    'minimum_gpa': ('screen_gpa', 'minimum_gpa', 'gpa'),
+    'description': ('job_desc', 'description', 'job_description'),
+}
+
+_BLOCK_TAG_RE = re.compile(r'<\s*(br|/p|/div|/li|/h\d)\s*/?>', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def html_to_text(value):
+    """ Rich-text HTML (as in job descriptions) to plain text with line breaks """
+    text = _BLOCK_TAG_RE.sub('\n', value)
+    text = html.unescape(_TAG_RE.sub('', text))
+    return '\n'.join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def _lookup(item, path):
+    for key in path.split('.'):
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+def _field(item, key):
+    for path in FIELD_ALIASES[key]:
+        value = _lookup(item, path)
+        if value not in (None, '', []):
+            return value
+    return None
+
+
+def _as_text(value):
+    """ Flatten the value shapes the API uses (lists, {label/name/value} objects) to text """
+    if value is None:
+        return None
+    if isinstance(value, list):
+        parts = [_as_text(v) for v in value]
+        return '\n'.join(p for p in parts if p) or None
+    if isinstance(value, dict):
+        for key in ('label', 'name', '_label', 'value', 'text'):
+            if value.get(key):
+                return _as_text(value[key])
+        return None
+    return str(value).strip() or None
+
+
+def job_items(payload):
+    """ The list of postings in a list response """
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        for key in LIST_KEYS:
+            if isinstance(payload.get(key), list):
+                return payload[key]
+    return []
+
+
+def posting_id(item):
+    return _field(item, 'id')
+
+
+def posting_key(item):
+    """ Identity of a posting across pages: its id, or its whole content without one """
+    job_id = posting_id(item)
+    return job_id if job_id is not None else json.dumps(item, sort_keys=True, default=str)
+
+
+def detail_item(payload):
+    """ The posting in a detail response, which may be wrapped in one object """
+    if isinstance(payload, dict):
+        for key in ('model', 'job', 'data'):
+            if isinstance(payload.get(key), dict):
+                return payload[key]
+    return payload if isinstance(payload, dict) else None
+
+
+def job_from_payload(item, base_url, search_term=None, location=None, scraped_at=None):
+    """
+    Map one API posting onto the JobRecord NUWorksScraper.scrape_all_jobs returns.
+    """
+    job_id = posting_id(item)
+
+    compensation = _as_text(_field(item, 'compensation'))
+    if compensation == "Not listed":
+        compensation = None
+
+    gpa = _as_text(_field(item, 'minimum_gpa'))
+    try:
+        gpa = float(gpa) if gpa is not None else None
+    except ValueError:
+        gpa = None
+
+    description = _as_text(_field(item, 'description'))
+    if description and '<' in description:
+        description = html_to_text(description)
+
+    return JobRecord(
+        title=_as_text(_field(item, 'title')),
+        company=_as_text(_field(item, 'company')),
+        location=_as_text(_field(item, 'location')),
+        deadline=_as_text(_field(item, 'deadline')),
+        compensation=compensation,
+        targeted_major=_as_text(_field(item, 'targeted_major')),
+        minimum_gpa=gpa,
+        description=description,
+        job_link=base_url + JOB_LINK_PATH.format(id=job_id) if job_id is not None else None,
+        scraped_at=scraped_at,
+        search_keywords=search_term,
+        search_location=location,
+    )
+
+
+class NetworkCapture:
+    """
+    JSON responses seen by a Chrome driver started with performance logging.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.requests = {}  # request id --> url of API responses not yet finished
+
+    def enable(self):
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.drain()
+
+    def drain(self):
+        """
+        Read pending performance log entries; returns API calls that finished.
+        Each request is reported once and then forgotten, so self.requests
+        only holds responses still loading.
+        """
+        finished = []
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.responseReceived':
+                url = params['response']['url']
+                if '/api/' in url:
+                    self.requests[params['requestId']] = url
+            elif method == 'Network.loadingFinished':
+                url = self.requests.pop(params.get('requestId'), None)
+                if url is not None:
+                    finished.append((params['requestId'], url))
+            elif method == 'Network.loadingFailed':
+                self.requests.pop(params.get('requestId'), None)
+        return finished
+
+    def body_json(self, request_id):
+        """ Parsed JSON body of a captured response, or None if Chrome evicted it """
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            return None
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def fetch_json(self, url):
+        """ GET a same-origin URL from inside the page (carries the session cookies) """
+        return self.driver.execute_async_script("""
+            const done = arguments[arguments.length - 1];
+            fetch(arguments[0], {credentials: 'include', headers: {'Accept': 'application/json'}})
+                .then(r => r.ok ? r.json() : null)
+                .then(done)
+                .catch(() => done(null));
+        """, url)
+
+    def last_list_call(self):
+        """ (url, parsed body) of the most recent job list response, if any """
+        calls = [(rid, url) for rid, url in self.drain() if LIST_API_RE.search(url)]
+        if not calls:
+            return None, None
+        request_id, url = calls[-1]
+        return url, self.body_json(request_id)
+
+
+def page_url(url, page):
+    """ The same list request for another result page """
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    query['page'] = [str(page)]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
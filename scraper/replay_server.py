@@ -0,0 +1,323 @@
+"""
+replay_server.py
+
+A local stand-in for the NUworks (Symplicity) job pages, so NUWorksScraper can
+be run and timed without the live portal, a login or Duo.
+
+It serves the same markup the scraper's selectors look for:
+    - a list page per result page (div.list-item-title span rows, some carrying
+      a "NOT QUALIFIED" badge, and a Next button until the last page), which
+      also holds the search toggle, location input and co-op checkbox
+    - a detail page per job (company h3, sy_formfield_* fields and the
+      tinymce description), where optional fields may be missing
+    - optionally a logged-in check: with session_cookie set, job pages
+      requested without that cookie redirect to a sign-in page, as the
+      portal does once a session has expired
+
+Jobs come from a recorded scrape (a coopsearch.json-style list of job dicts,
+which is what the scraper itself writes) or are generated synthetically. Every
+response can be delayed by a fixed latency plus random jitter. With assets > 0
+each page also references that many images plus an analytics script, as the
+real portal does, so the lean browser profile has something to block.
+
+    python replay_server.py [--jobs coopsearch.json | --count 200] [--per-page 20]
+                            [--latency-ms 150] [--jitter-ms 50] [--assets 8] [--port 8800]
+                            [--session-cookie PHPSESSID=value]
+
+Point the scraper at it with NUWorksScraper(base_url=server.base_url).
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import html
+import random
+import threading
+import time
+
+from job_record import load_jobs
+
+LIST_PATH = "/students/index.php"
+SIGNIN_PATH = "/signin"
+
+_WORDS = ("software engineering python java data analysis cloud systems testing "
+          "automation machine learning backend frontend web mobile security "
+          "database distributed embedded research design product api linux").split()
+
+_COMPANIES = ("Medtronic", "Wayfair", "HubSpot", "Fidelity", "MathWorks",
+              "Raytheon", "Draper", "Klaviyo", "Toast", "iRobot")
+
+_MAJORS = ("Khoury College of Computer Sciences/Computer Science",
+           "College of Engineering/Computer Engineering",
+           "College of Engineering/Electrical Engineering",
+           "Khoury College of Computer Sciences/Data Science")
+
+
+def synthetic_jobs(count, seed=0, missing_rate=0.2):
+    """
+    Generate job dicts shaped like the scraper's output.
+
+    Args:
+        count: Number of jobs
+        seed: Random seed, so runs are repeatable
+        missing_rate: Chance that each optional field (deadline,
+            compensation, majors, GPA) is left out of a job
+
+    Returns:
+        List of job dicts
+    """
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return None if rng.random() < missing_rate else value
+
+    jobs = []
+    for i in range(count):
+        description = "\n".join(" ".join(rng.choice(_WORDS) for _ in range(rng.randint(12, 30)))
+                                for _ in range(rng.randint(3, 8)))
+        jobs.append({
+            'title': f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()} Co-op #{i + 1}",
+            'company': rng.choice(_COMPANIES),
+            'location': "Boston, MA, USA",
+            'deadline': maybe(f"December {rng.randint(1, 28)}, 2025"),
+            'compensation': maybe(f"${rng.randint(18, 30)} - ${rng.randint(31, 45)} per hour"),
+            'targeted_major': maybe("\n".join(rng.sample(_MAJORS, rng.randint(1, 3)))),
+            'minimum_gpa': maybe(rng.choice(("2.5", "3.0", "3.2"))),
+            'description': description,
+        })
+    return jobs
+
+
+def load_recorded_jobs(filename):
+    """
+    Load a recorded scrape (list of job dicts, e.g. coopsearch.json) as JobRecords.
+    """
+    return load_jobs(filename)
+
+
+def _esc(value):
+    return html.escape(str(value))
+
+
+class ReplayServer:
+    """
+    Serves job list and detail pages from a list of job dicts on a background thread.
+    """
+
+    def __init__(self, jobs, per_page=20, latency=0.0, jitter=0.0, not_qualified_every=4,
+                 assets=0, session_cookie=None, host="127.0.0.1", port=0):
+        """
+        Args:
+            jobs: List of job dicts or JobRecords (title, company, location, ...)
+            per_page: Jobs per list page
+            latency: Seconds added to every response
+            jitter: Up to this many extra random seconds per response
+            not_qualified_every: Every n-th row gets a "NOT QUALIFIED" badge (0 = none)
+            assets: Images referenced per page, plus one analytics script if > 0
+            session_cookie: "name=value" a request must carry to see job
+                pages; others are redirected to the sign-in page (None = open)
+            host, port: Address to bind (port 0 picks a free port)
+        """
+        self.jobs = list(jobs)
+        self.per_page = per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.not_qualified_every = not_qualified_every
+        self.assets = assets
+        self.session_cookie = session_cookie
+        self.requests = 0
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def num_pages(self):
+        return max(1, -(-len(self.jobs) // self.per_page))
+
+    def list_url(self, page=1):
+        return f"{LIST_PATH}?mode=list&s=jobs&page={page}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _handle(self, request):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+        url = urlparse(request.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.startswith(('/static/', '/analytics/')):
+            self._send(request, b'\x00' * 2048 if url.path.endswith('.png') else b'void 0;',
+                       "image/png" if url.path.endswith('.png') else "application/javascript")
+            return
+
+        if url.path == SIGNIN_PATH:
+            self._send(request, b'<!DOCTYPE html><html><head><title>Sign In</title></head><body></body></html>',
+                       "text/html; charset=utf-8")
+            return
+        if self.session_cookie and not self._logged_in(request):
+            request.send_response(302)
+            request.send_header("Location", f"{SIGNIN_PATH}?next={url.path}")
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+
+        try:
+            if url.path == LIST_PATH and query.get('mode') == 'form':
+                body = self.detail_page(int(query['id']))
+            elif url.path in (LIST_PATH, "/students/", "/students"):
+                body = self.list_page(int(query.get('page', 1)))
+            else:
+                raise LookupError(url.path)
+        except (LookupError, ValueError):
+            request.send_error(404)
+            return
+
+        self._send(request, body.encode('utf-8'), "text/html; charset=utf-8")
+
+    def _logged_in(self, request):
+        cookies = (request.headers.get('Cookie') or '').split(';')
+        return self.session_cookie in (cookie.strip() for cookie in cookies)
+
+    @staticmethod
+    def _send(request, data, content_type):
+        request.send_response(200)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _asset_tags(self, page_key):
+        """ Analytics script (blocking, in <head>) and image tags for one page """
+        if not self.assets:
+            return '', ''
+        script = f'<script src="/analytics/collect.js?p={page_key}"></script>'
+        images = ''.join(f'<img src="/static/{page_key}_{k}.png" width="1" height="1">'
+                         for k in range(self.assets))
+        return script, images
+
+    def list_page(self, page):
+        """ Result page `page` (1-based) """
+        if not 1 <= page <= self.num_pages:
+            raise LookupError(page)
+
+        start = (page - 1) * self.per_page
+        rows = []
+        for i in range(start, min(start + self.per_page, len(self.jobs))):
+            badge = ''
+            if self.not_qualified_every and i % self.not_qualified_every == self.not_qualified_every - 1:
+                badge = ' <span class="badge">NOT QUALIFIED</span>'
+            rows.append(
+                f'<div class="list-item"><div class="list-item-title">'
+                f'<span onclick="location.href=\'{LIST_PATH}?mode=form&id={i}\'">'
+                f'{_esc(self.jobs[i].get("title") or "Untitled")}</span>{badge}</div></div>')
+
+        script, images = self._asset_tags(f"list{page}")
+        next_button = ''
+        if page < self.num_pages:
+            next_button = (f'<button type="button" onclick="location.href=\'{self.list_url(page + 1)}\'">'
+                           f'<span>Next</span></button>')
+
+        return f"""<!DOCTYPE html>
+<html><head><title>Jobs - NUworks (replay)</title>{script}</head><body>{images}
+<button type="button" class="quicksearch-toggle">Search</button>
+<input type="search" name="quicksearch">
+<a href="{self.list_url(1)}">See all job results</a>
+<input id="jobs-location-input" type="text">
+<input id="job_type-checkbox-0" type="checkbox">
+<div class="list">{''.join(rows)}</div>
+{next_button}
+</body></html>"""
+
+    def detail_page(self, job_id):
+        """ Detail page for self.jobs[job_id]; fields that are None are left out """
+        job = self.jobs[job_id]
+
+        fields = []
+        if job.get('location'):
+            fields.append(f'<div id="sy_formfield_location_{job_id}">{_esc(job["location"])}</div>')
+        if job.get('deadline'):
+            fields.append(f'<div id="sy_formfield_job_deadline">{_esc(job["deadline"])}</div>')
+        fields.append(f'<div id="sy_formfield_compensation_{job_id}">'
+                      f'{_esc(job.get("compensation") or "Not listed")}</div>')
+        if job.get('targeted_major'):
+            majors = '<br>'.join(_esc(m) for m in str(job['targeted_major']).split('\n'))
+            fields.append(f'<div id="sy_formfield_targeted_academic_majors_{job_id}">{majors}</div>')
+        if job.get('minimum_gpa') is not None:
+            fields.append(f'<div id="sy_formfield_screen_gpa_{job_id}">{_esc(job["minimum_gpa"])}</div>')
+
+        script, images = self._asset_tags(f"job{job_id}")
+        description = ''.join(f'<p>{_esc(line)}</p>'
+                              for line in str(job.get('description') or '').split('\n'))
+
+        return f"""<!DOCTYPE html>
+<html><head><title>{_esc(job.get('title') or 'Job')} - NUworks (replay)</title>{script}</head><body>{images}
+<h1>{_esc(job.get('title') or 'Untitled')}</h1>
+<h3 class="space-right-sm text-overflow">{_esc(job.get('company') or '')}</h3>
+{''.join(fields)}
+<div class="field-widget-tinymce">{description}</div>
+</body></html>"""
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve replayed NUworks job pages locally")
+    ap.add_argument('--jobs', help="Recorded jobs JSON (e.g. coopsearch.json); default: synthetic")
+    ap.add_argument('--count', type=int, default=100, help="Synthetic job count")
+    ap.add_argument('--per-page', type=int, default=20)
+    ap.add_argument('--latency-ms', type=float, default=0.0)
+    ap.add_argument('--jitter-ms', type=float, default=0.0)
+    ap.add_argument('--assets', type=int, default=0, help="Images (+ analytics script) per page")
+    ap.add_argument('--port', type=int, default=8800)
+    ap.add_argument('--session-cookie', help="Require this name=value cookie, else redirect to sign-in")
+    args = ap.parse_args(argv)
+
+    jobs = load_recorded_jobs(args.jobs) if args.jobs else synthetic_jobs(args.count)
+    server = ReplayServer(jobs, per_page=args.per_page, latency=args.latency_ms / 1000,
+                          jitter=args.jitter_ms / 1000, assets=args.assets,
+                          session_cookie=args.session_cookie, port=args.port)
+    print(f"Serving {len(jobs)} jobs on {server.num_pages} pages at {server.base_url}{server.list_url(1)}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,286 @@
+"""
+retry.py
+
+Retry policy for the flaky parts of a scrape: Selenium steps against the
+NUworks portal and writes to the Supabase database.
+
+    portal = RetryPolicy(max_attempts=3, base_delay=1.0, breaker=CircuitBreaker('nuworks'))
+
+    @portal
+    def search(...): ...
+
+    portal.call(supabase.table('jobs').insert(job).execute, site='jobs.insert')
+
+- Exponential backoff with full jitter: before retry n the policy sleeps a
+  random time in [0, min(max_delay, base_delay * 2 ** n)], so many callers
+  failing together do not retry in lockstep.
+- Only transient errors are retried (timeouts, stale elements, dropped
+  connections, database serialization/connection errors; see is_transient).
+  Anything else, e.g. a missing element or a unique-constraint violation,
+  is raised on the first attempt.
+- A RetryBudget caps the retries spent in one run, so a bad night costs a
+  bounded amount of extra time instead of max_attempts x every call.
+- A CircuitBreaker opens after failure_threshold consecutive failed calls and
+  then rejects calls with CircuitOpenError without touching the portal or
+  database, until reset_timeout has passed and one probe call is let through.
+- Every call site (function name or site=...) keeps RetryStats; print them
+  with report() or save them with export_stats().
+"""
 from functools import wraps
+import json
+import random
+import threading
+import time
 
-def retry_on_failure(max_retries=3, delay=2):
-    """Retry a function if it fails"""
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            for attempt in range(max_retries):
+# Exception class names (anywhere in the MRO) that are worth retrying. Names
+# instead of classes so this module imports neither selenium nor httpx.
+TRANSIENT_ERRORS = {
+    # selenium
+    'TimeoutException', 'StaleElementReferenceException', 'ElementClickInterceptedException',
+    'ElementNotInteractableException', 'MoveTargetOutOfBoundsException',
+    # httpx (used by supabase/postgrest)
+    'ConnectError', 'ConnectTimeout', 'ReadTimeout', 'WriteTimeout', 'PoolTimeout',
+    'ReadError', 'WriteError', 'RemoteProtocolError',
+    # standard library
+    'ConnectionError', 'TimeoutError',
+}
+
+# Postgres / PostgREST error codes that are transient: serialization failure,
+# deadlock, statement timeout, too many connections, connection exceptions,
+# PostgREST unable to reach the database or load its schema cache
+TRANSIENT_DB_CODES = ('40001', '40P01', '57014', '53300', '08', 'PGRST000', 'PGRST001', 'PGRST002')
+
+
+def is_transient(exc):
+    """
+    Default retry classification: True if exc is likely to succeed on retry.
+    """
+    code = getattr(exc, 'code', None)
+    if isinstance(code, str) and code:
+        # database errors carry a code; only some of them are transient
+        return code.startswith(TRANSIENT_DB_CODES)
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(exc).__mro__)
+
+
+class CircuitOpenError(Exception):
+    """ Raised instead of calling through an open circuit breaker """
+
+
+class RetryBudget:
+    """
+    Number of retries (not first attempts) allowed per run, shared by every
+    policy it is given to.
+    """
+
+    def __init__(self, max_retries=100):
+        self.max_retries = max_retries
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def consume(self):
+        """ Take one retry from the budget; False if it is spent """
+        with self._lock:
+            if self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def remaining(self):
+        return max(0, self.max_retries - self.used)
+
+    def reset(self):
+        with self._lock:
+            self.used = 0
+
+
+class CircuitBreaker:
+    """
+    closed --(failure_threshold consecutive failures)--> open
+    open --(reset_timeout elapsed)--> half-open: one probe call goes through
+    half-open --(probe succeeds)--> closed, --(probe fails)--> open again
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=120.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """ Raise CircuitOpenError unless a call may go through now """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(
+                        f"{self.name} circuit open after {self.failures} consecutive failures")
+                self.state = self.HALF_OPEN
+            elif self.state == self.HALF_OPEN:
+                raise CircuitOpenError(f"{self.name} circuit half-open, probe call in progress")
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    print(f"      Circuit '{self.name}' OPEN - pausing calls for {self.reset_timeout:.0f}s")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class RetryStats:
+    """ Counters for one call site """
+
+    __slots__ = ('calls', 'attempts', 'retries', 'successes', 'failures',
+                 'rejected', 'budget_exhausted', 'sleep_sec', 'last_error')
+
+    def __init__(self):
+        self.calls = 0  # calls made
+        self.attempts = 0  # attempts, including first tries
+        self.retries = 0  # attempts after a failure
+        self.successes = 0  # calls that eventually returned
+        self.failures = 0  # calls that raised in the end
+        self.rejected = 0  # calls refused by an open circuit
+        self.budget_exhausted = 0  # calls that stopped retrying because the budget ran out
+        self.sleep_sec = 0.0  # time spent backing off
+        self.last_error = None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# call site --> RetryStats, shared by all policies
+STATS = {}
+_stats_lock = threading.Lock()
+
+
+def _stats_for(site):
+    with _stats_lock:
+        stats = STATS.get(site)
+        if stats is None:
+            stats = STATS[site] = RetryStats()
+        return stats
+
+
+class RetryPolicy:
+    """
+    Retry behaviour shared by a group of call sites. Use it as a decorator,
+    or wrap a single call with policy.call(func, *args, site=..., **kwargs).
+    """
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0, retry_if=is_transient,
+                 budget=None, breaker=None):
+        """
+        Args:
+            max_attempts: Attempts per call, including the first
+            base_delay: Backoff cap before the first retry, in seconds
+            max_delay: Upper bound on any single backoff
+            retry_if: Predicate deciding whether an exception is retryable
+            budget: Optional RetryBudget shared across policies for the run
+            breaker: Optional CircuitBreaker guarding the resource
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_if = retry_if
+        self.budget = budget
+        self.breaker = breaker
+
+    def backoff(self, retry_number):
+        """ Full-jitter delay before retry number retry_number (0-based) """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry_number))
+
+    def call(self, func, *args, site=None, **kwargs):
+        stats = _stats_for(site or getattr(func, '__qualname__', repr(func)))
+        stats.calls += 1
+
+        for attempt in range(self.max_attempts):
+            if self.breaker is not None:
                 try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    if attempt < max_retries - 1:
-                        print(f"      ⚠️  Attempt {attempt + 1} failed: {str(e)[:50]}... Retrying...")
-                        time.sleep(delay)
+                    self.breaker.before_call()
+                except CircuitOpenError:
+                    stats.rejected += 1
+                    raise
+
+            stats.attempts += 1
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                stats.last_error = f"{type(e).__name__}: {str(e)[:200]}"
+                retryable = self.retry_if(e)
+                if self.breaker is not None:
+                    # a permanent error (bad input, duplicate row) means the resource answered
+                    if retryable:
+                        self.breaker.record_failure()
                     else:
-                        print(f"      ❌ All {max_retries} attempts failed")
-                        raise
-            return None
+                        self.breaker.record_success()
+
+                if (not retryable or attempt == self.max_attempts - 1 or
+                        (self.breaker is not None and self.breaker.state == CircuitBreaker.OPEN)):
+                    stats.failures += 1
+                    raise
+                if self.budget is not None and not self.budget.consume():
+                    stats.budget_exhausted += 1
+                    stats.failures += 1
+                    print(f"      Retry budget exhausted - not retrying {type(e).__name__}")
+                    raise
+
+                delay = self.backoff(attempt)
+                print(f"      Attempt {attempt + 1} failed: {str(e)[:50]}... Retrying in {delay:.1f}s")
+                stats.retries += 1
+                stats.sleep_sec += delay
+                time.sleep(delay)
+            else:
+                if self.breaker is not None:
+                    self.breaker.record_success()
+                stats.successes += 1
+                return result
+
+    def __call__(self, func):
+        site = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.call(func, *args, site=site, **kwargs)
+
         return wrapper
-    return decorator
\ No newline at end of file
+
+
+def retry_on_failure(max_retries=3, delay=2):
+    """Retry a function if it fails (any exception, jittered exponential backoff)"""
+    return RetryPolicy(max_attempts=max_retries, base_delay=delay, retry_if=lambda e: True)
+
+
+def stats_dict():
+    with _stats_lock:
+        return {site: stats.to_dict() for site, stats in STATS.items()}
+
+
+def export_stats(filename):
+    with open(filename, 'w') as f:
+        json.dump(stats_dict(), f, indent=2)
+
+
+def reset_stats():
+    with _stats_lock:
+        STATS.clear()
+
+
+def report():
+    """ Per-call-site retry table """
+    print(f"{'Call site':40s} {'Calls':>6s} {'Retries':>8s} {'Failed':>7s} {'Rejected':>9s} {'Backoff s':>10s}")
+    for site, s in sorted(stats_dict().items()):
+        print(f"{site[:40]:40s} {s['calls']:6d} {s['retries']:8d} {s['failures']:7d} "
+              f"{s['rejected']:9d} {s['sleep_sec']:10.2f}")
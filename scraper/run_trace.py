@@ -0,0 +1,172 @@
+"""
+run_trace.py
+
+Structured per-job / per-page phase timing for NUWorksScraper runs, written
+as a machine-readable run file, plus a report command to summarize a run and
+compare two runs for phase regressions.
+
+Phases recorded by scrape_all_jobs:
+    page:   list_load (finding the job rows), paginate (next_page)
+    job:    requery (re-finding the rows), scroll_click, extract, back
+
+    python run_trace.py report RUN.json
+    python run_trace.py compare BASELINE.json NEW.json [--threshold 0.10]
+
+compare exits with status 1 if any phase's median or mean got slower by more
+than the threshold, so it can gate a change to the scraper.
+"""
+from datetime import datetime
+import argparse
+import json
+import sys
+import time
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _Phase:
+    """ Context manager timing one phase into a RunTrace """
+
+    __slots__ = ('trace', 'event', 'start')
+
+    def __init__(self, trace, event):
+        self.trace = trace
+        self.event = event
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.event
+
+    def __exit__(self, exc_type, exc, tb):
+        self.event['ms'] = round((time.perf_counter() - self.start) * 1000, 3)
+        if exc_type is not None:
+            self.event['error'] = exc_type.__name__
+        self.trace.events.append(self.event)
+        return False
+
+
+class RunTrace:
+    """ Timing events for one scraper run """
+
+    def __init__(self, **meta):
+        self.meta = dict(meta)
+        self.started_at = datetime.now().isoformat()
+        self.events = []
+
+    def phase(self, name, page=None, job=None):
+        """ Time a block: with trace.phase('extract', page=1, job=3): ... """
+        return _Phase(self, {'phase': name, 'page': page, 'job': job})
+
+    def summary(self):
+        """ Per-phase count, total, mean, p50, p95 and max in milliseconds """
+        by_phase = {}
+        for event in self.events:
+            by_phase.setdefault(event['phase'], []).append(event['ms'])
+        return summarize(by_phase)
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at,
+            'meta': self.meta,
+            'summary': self.summary(),
+            'events': self.events,
+        }
+
+    def write(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"Run trace written to {filename}")
+
+
+def summarize(by_phase):
+    summary = {}
+    for phase, values in by_phase.items():
+        values = sorted(values)
+        total = sum(values)
+        summary[phase] = {
+            'count': len(values),
+            'total_ms': round(total, 3),
+            'mean_ms': round(total / len(values), 3),
+            'p50_ms': _percentile(values, 0.5),
+            'p95_ms': _percentile(values, 0.95),
+            'max_ms': values[-1],
+        }
+    return summary
+
+
+def load_run(filename):
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def print_report(run):
+    meta = ', '.join(f"{k}={v}" for k, v in run.get('meta', {}).items())
+    print(f"Run {run.get('started_at')}  {meta}")
+    print(f"{'Phase':<14} {'Count':>6} {'Total s':>9} {'Mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'Max ms':>9}")
+    print("-" * 70)
+    for phase, s in run['summary'].items():
+        print(f"{phase:<14} {s['count']:6d} {s['total_ms'] / 1000:9.2f} {s['mean_ms']:9.1f} "
+              f"{s['p50_ms']:9.1f} {s['p95_ms']:9.1f} {s['max_ms']:9.1f}")
+
+
+def compare_runs(baseline, new, threshold=0.10):
+    """
+    Compare per-phase p50 and mean between two runs.
+
+    Returns:
+        List of (phase, metric, baseline ms, new ms, relative change) for
+        every phase/metric that regressed by more than threshold
+    """
+    regressions = []
+    print(f"{'Phase':<14} {'Base p50':>9} {'New p50':>9} {'Change':>8}   {'Base mean':>9} {'New mean':>9} {'Change':>8}")
+    print("-" * 76)
+    for phase in sorted(set(baseline['summary']) | set(new['summary'])):
+        base = baseline['summary'].get(phase)
+        cur = new['summary'].get(phase)
+        if base is None or cur is None:
+            print(f"{phase:<14} only in {'new' if base is None else 'baseline'} run")
+            continue
+
+        row = f"{phase:<14}"
+        flagged = False
+        for metric in ('p50_ms', 'mean_ms'):
+            change = (cur[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+            row += f" {base[metric]:9.1f} {cur[metric]:9.1f} {change:+8.1%}  "
+            if change > threshold:
+                regressions.append((phase, metric, base[metric], cur[metric], change))
+                flagged = True
+        print(row + ("  REGRESSION" if flagged else ""))
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Summarize or compare scraper run traces")
+    sub = ap.add_subparsers(dest='command', required=True)
+    report = sub.add_parser('report', help="Summarize one run")
+    report.add_argument('run')
+    compare = sub.add_parser('compare', help="Flag phase regressions between two runs")
+    compare.add_argument('baseline')
+    compare.add_argument('new')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help="Relative slowdown that counts as a regression (default 0.10)")
+    args = ap.parse_args(argv)
+
+    if args.command == 'report':
+        print_report(load_run(args.run))
+        return 0
+
+    regressions = compare_runs(load_run(args.baseline), load_run(args.new), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} phase regression(s) above {args.threshold:.0%}")
+        return 1
+    print("\nNo phase regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
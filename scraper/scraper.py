@@ -9,33 +9,130 @@ import json
 import pickle
 from datetime import datetime
 import pandas as pd
-from selenium.common.exceptions import TimeoutException
+from urllib.parse import parse_qs, urlparse
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from profiler import profile
+from run_trace import RunTrace
+from network_capture import (DETAIL_API_PATH, NetworkCapture, detail_item, job_from_payload,
+                             job_items, page_url, posting_id, posting_key)
+from retry import CircuitBreaker, RetryBudget, RetryPolicy
+from job_record import JobRecord
+
+NUWORKS_URL = "https://northeastern-csm.symplicity.com"
+
+# Retries for page-level Selenium steps. The budget and breaker are shared by
+# every scraper in the process (automated_scraper resets the budget per run),
+# so a portal outage stops all users' scrapes instead of retrying each one.
+RUN_BUDGET = RetryBudget(max_retries=50)
+PORTAL_BREAKER = CircuitBreaker('nuworks', failure_threshold=5, reset_timeout=120)
+portal_retry = RetryPolicy(max_attempts=3, base_delay=1.0, budget=RUN_BUDGET, breaker=PORTAL_BREAKER)
+
+# Lean browser profile (NUWorksScraper(lean=True)): the scraper only reads text,
+# so images, fonts, media and analytics/tracking requests are blocked and the
+# driver returns from navigations at DOMContentLoaded ('eager'). Stylesheets
+# are kept - Selenium's visibility checks and element .text depend on them.
+LEAN_CHROME_ARGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--mute-audio",
+    "--no-first-run",
+]
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+    "credentials_enable_service": False,
+    "profile.password_manager_enabled": False,
+}
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+    "*hotjar.com*", "*fullstory.com*", "*segment.io*", "*nr-data.net*", "*newrelic.com*",
+    "*/analytics/*",
+]
+# Load budget per navigation in the lean profile; a page that hangs raises
+# TimeoutException (transient, so portal_retry tries it again) instead of blocking
+LEAN_PAGE_LOAD_TIMEOUT = 20
+
+# Navigation Timing for the current document plus the bytes of its resources
+_PAGE_TIMING_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+const resources = performance.getEntriesByType('resource');
+return {
+    url: nav.name,
+    origin: performance.timeOrigin,
+    dcl: nav.domContentLoadedEventEnd,
+    load: nav.loadEventEnd,
+    now: performance.now(),
+    bytes: (nav.transferSize || 0) + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+    resources: resources.length
+};
+"""
 
 class NUWorksScraper:
     """Reusable NUworks scraper - can use login or saved cookies"""
     
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, trace_file=None, base_url=NUWORKS_URL, capture_network=False, lean=False,
+                 time_pages=False):
         self.chrome_options = Options()
         if headless:
             self.chrome_options.add_argument("--headless=new")
+        self.lean = lean
+        if lean:
+            for arg in LEAN_CHROME_ARGS:
+                self.chrome_options.add_argument(arg)
+            self.chrome_options.add_experimental_option("prefs", LEAN_PREFS)
+            self.chrome_options.page_load_strategy = 'eager'
+        self.capture_network = capture_network  # read jobs from API responses (scrape_all_jobs_network)
+        self.capture = None
+        if capture_network:
+            self.chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         self.errors = []
         self.failed_jobs = []
         self.previous_jobs = {}
         self.driver = None
+        self.base_url = base_url  # NUworks host, or a local replay_server for benchmarks
+        self.trace_file = trace_file  # where scrape_all_jobs writes its phase timing trace
+        self.trace = None
+        self.time_pages = time_pages  # record Navigation Timing per page load (see record_page_load)
+        self.page_loads = []  # timings of the last scrape_all_jobs run
+        self._last_navigation = None
         print("CoopScout NUworks Scraper initialized")
 
+    @profile
     def initialize_driver(self):
         print("Starting Chrome driver...")
         self.driver = webdriver.Chrome(options=self.chrome_options)
         self.wait = WebDriverWait(self.driver, 10)
         self.duo_wait = WebDriverWait(self.driver, 60)
+        if self.capture_network:
+            self.capture = NetworkCapture(self.driver)
+            self.capture.enable()
+        if self.lean:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+            self.driver.set_page_load_timeout(LEAN_PAGE_LOAD_TIMEOUT)
         print("Chrome driver ready")
 
-    def navigate_to_page(self, url="https://northeastern-csm.symplicity.com/students/?signin_tab=0"):
+    @profile
+    @portal_retry
+    def navigate_to_page(self, url=None):
+        url = url or f"{self.base_url}/students/?signin_tab=0"
         print(f"Navigating to NUworks...")
         self.driver.get(url)
         print("Page loaded")
 
+    @profile
     def login_with_credentials(self, username, password):
         """Traditional login with Duo push"""
         print("Logging in...")
@@ -61,6 +158,8 @@ class NUWorksScraper:
         self.duo_wait.until(EC.invisibility_of_element_located((By.ID, "duo_iframe")))
         print("Login successful")
 
+    @profile
+    @portal_retry
     def login_with_cookies(self, cookies):
         """Login using saved cookies - no Duo needed"""
         print("Loading saved cookies...")
@@ -75,7 +174,7 @@ class NUWorksScraper:
 
         # Navigate to the job search page
         print("Navigating to job search page...")
-        self.driver.get("https://northeastern-csm.symplicity.com/students/index.php?mode=list&s=jobs")
+        self.driver.get(f"{self.base_url}/students/index.php?mode=list&s=jobs")
         time.sleep(3)  # Give the page time to load
 
         print(f"Current URL: {self.driver.current_url}")
@@ -86,6 +185,8 @@ class NUWorksScraper:
         with open(filename, 'rb') as f:
             return pickle.load(f)
 
+    @profile
+    @portal_retry
     def search(self, search_term):
         try:
             print(f"Looking for search toggle button...")
@@ -123,6 +224,8 @@ class NUWorksScraper:
                 print("ERROR: Could not find search elements")
                 raise
 
+    @profile
+    @portal_retry
     def get_job_results(self):
         print("Looking for job results...")
         time.sleep(3)
@@ -153,24 +256,36 @@ class NUWorksScraper:
             except:
                 raise Exception("Could not find job results - page may have changed")
 
+    @profile
+    @portal_retry
     def filter_by_location(self, location):
         print(f"Filtering by location: {location}...")
         location_bar = self.wait.until(EC.element_to_be_clickable((By.ID, "jobs-location-input")))
+        # a retried attempt may find text typed by the failed one
+        location_bar.clear()
         location_bar.send_keys(location + Keys.ENTER)
         time.sleep(2)
         print("Location filter applied")
 
+    @profile
+    @portal_retry
     def filter_by_coop(self):
         print("Filtering for Co-op positions...")
         time.sleep(2)
 
         coop_checkbox = self.driver.find_element(By.ID, "job_type-checkbox-0")
+        # clicking toggles, so a retry after a click that went through would
+        # turn the filter back off
+        if coop_checkbox.is_selected():
+            print("Co-op filter already applied")
+            return
         self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", coop_checkbox)
         time.sleep(1)
         self.driver.execute_script("arguments[0].click();", coop_checkbox)
         time.sleep(2)
         print("Co-op filter applied")
 
+    @profile
     def scrape_company(self):
         try:
             company_element = self.wait.until(
@@ -179,6 +294,7 @@ class NUWorksScraper:
         except Exception as e:
             return None
 
+    @profile
     def scrape_location(self):
         try:
             location_element = self.driver.find_element(By.CSS_SELECTOR, '[id^="sy_formfield_location_"]')
@@ -186,6 +302,7 @@ class NUWorksScraper:
         except Exception as e:
             return None
 
+    @profile
     def scrape_deadline(self):
         try:
             deadline_element = self.driver.find_element(By.ID, "sy_formfield_job_deadline")
@@ -193,6 +310,7 @@ class NUWorksScraper:
         except Exception as e:
             return None
 
+    @profile
     def scrape_compensation(self):
         try:
             compensation_element = self.driver.find_element(By.CSS_SELECTOR, '[id^="sy_formfield_compensation_"]')
@@ -207,6 +325,7 @@ class NUWorksScraper:
         except Exception as e:
             return None
 
+    @profile
     def scrape_major(self):
         try:
             major_element = self.driver.find_element(By.CSS_SELECTOR, '[id^="sy_formfield_targeted_academic_majors_"]')
@@ -214,6 +333,7 @@ class NUWorksScraper:
         except Exception as e:
             return None
 
+    @profile
     def scrape_min_gpa(self):
         try:
             min_gpa = self.driver.find_element(By.CSS_SELECTOR, '[id^="sy_formfield_screen_gpa_"]')
@@ -232,6 +352,7 @@ class NUWorksScraper:
         except Exception as e:
             return None
 
+    @profile
     def scrape_description(self):
         try:
             description_div = self.driver.find_element(By.CSS_SELECTOR, "div.field-widget-tinymce")
@@ -239,6 +360,7 @@ class NUWorksScraper:
         except Exception as e:
             return None
 
+    @profile
     def scrape_link(self):
         """Scrape the current job posting URL"""
         try:
@@ -248,21 +370,69 @@ class NUWorksScraper:
             print(f"Error scraping link: {e}")
             return "Not available"
 
+    def record_page_load(self):
+        """Record load timing for the current document, once per navigation.
+
+        waited_ms is how long the driver blocked on it: DOMContentLoaded with
+        the eager strategy, the load event otherwise. saved_ms is the part of
+        the full load the driver did not wait for. Does nothing unless the
+        scraper was created with time_pages=True."""
+        if not self.time_pages:
+            return
+        try:
+            t = self.driver.execute_script(_PAGE_TIMING_JS)
+        except Exception:
+            return
+        if not t or t['origin'] == self._last_navigation:
+            return
+        self._last_navigation = t['origin']
+
+        load = t['load'] or t['now']  # load event still pending: it is at least this late
+        waited = t['dcl'] if self.lean else load
+        self.page_loads.append({
+            'url': t['url'],
+            'dom_content_loaded_ms': round(t['dcl'], 1),
+            'load_ms': round(load, 1),
+            'waited_ms': round(waited, 1),
+            'saved_ms': round(load - waited, 1),
+            'bytes': t['bytes'],
+            'resources': t['resources'],
+        })
+
+    def page_load_summary(self):
+        """Mean timing and transfer per recorded page load"""
+        n = len(self.page_loads)
+        if not n:
+            return {'page_loads': 0}
+        summary = {'page_loads': n, 'lean': self.lean}
+        for key in ('dom_content_loaded_ms', 'load_ms', 'waited_ms', 'saved_ms', 'bytes', 'resources'):
+            summary[f"mean_{key}"] = round(sum(p[key] for p in self.page_loads) / n, 1)
+        return summary
+
+    @portal_retry
+    def _click_next(self):
+        next_button = self.driver.find_element(By.XPATH, '//button[.//span[text()="Next"]]')
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
+        time.sleep(0.5)
+        next_button.click()
+        time.sleep(2)
+
+    @profile
     def next_page(self):
         try:
-            next_button = self.driver.find_element(By.XPATH, '//button[.//span[text()="Next"]]')
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-            time.sleep(0.5)
-            next_button.click()
-            time.sleep(2)
+            self._click_next()
             print("Moving to next page...")
             return True
-        except:
+        except NoSuchElementException:
             print("No more pages to scrape")
             return False
+        except Exception as e:
+            print(f"Could not move to next page: {str(e)[:100]}")
+            return False
 
+    @profile
     def scrape_all_jobs(self, search_term, location, max_jobs=None):
-        """Main scraping method - returns list of job dicts"""
+        """Main scraping method - returns list of JobRecords"""
         print("\n" + "=" * 50)
         print("Starting job scraping process...")
         if max_jobs:
@@ -272,19 +442,27 @@ class NUWorksScraper:
         all_jobs = []
         page_num = 1
         total_jobs_scraped = 0
+        trace = self.trace = RunTrace(search_term=search_term, location=location, max_jobs=max_jobs)
+        self.page_loads = []
+        self._last_navigation = None
 
         while True:
             print(f"\nPAGE {page_num}")
             print("-" * 50)
 
+            # one timestamp per result page, the same string object for all its jobs
+            scraped_at = datetime.now().isoformat()
+
             try:
-                all_spans = self.driver.find_elements(By.CSS_SELECTOR, "div.list-item-title span")
-                
-                job_data = []
-                for span in all_spans:
-                    text = span.text.strip()
-                    if text and text != "NOT QUALIFIED":
-                        job_data.append((span, text))
+                with trace.phase('list_load', page=page_num):
+                    self.record_page_load()
+                    all_spans = self.driver.find_elements(By.CSS_SELECTOR, "div.list-item-title span")
+
+                    job_data = []
+                    for span in all_spans:
+                        text = span.text.strip()
+                        if text and text != "NOT QUALIFIED":
+                            job_data.append((span, text))
 
                 num_jobs = len(job_data)
                 print(f"Found {num_jobs} jobs on this page\n")
@@ -295,12 +473,13 @@ class NUWorksScraper:
                         break
 
                     try:
-                        all_spans = self.driver.find_elements(By.CSS_SELECTOR, "div.list-item-title span")
-                        job_elements = []
-                        for span in all_spans:
-                            text = span.text.strip()
-                            if text and text != "NOT QUALIFIED":
-                                job_elements.append(span)
+                        with trace.phase('requery', page=page_num, job=i):
+                            all_spans = self.driver.find_elements(By.CSS_SELECTOR, "div.list-item-title span")
+                            job_elements = []
+                            for span in all_spans:
+                                text = span.text.strip()
+                                if text and text != "NOT QUALIFIED":
+                                    job_elements.append(span)
 
                         if i >= len(job_elements):
                             continue
@@ -308,37 +487,40 @@ class NUWorksScraper:
                         element = job_elements[i]
                         job_title = element.text
 
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                        time.sleep(0.5)
-                        self.driver.execute_script("arguments[0].click();", element)
-                        time.sleep(1)
+                        with trace.phase('scroll_click', page=page_num, job=i):
+                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+                            time.sleep(0.5)
+                            self.driver.execute_script("arguments[0].click();", element)
+                            time.sleep(1)
 
-                        company_name = self.scrape_company()
-                        location_data = self.scrape_location()
-                        deadline = self.scrape_deadline()
-                        compensation = self.scrape_compensation()
-                        major = self.scrape_major()
-                        min_GPA = self.scrape_min_gpa()
-                        description = self.scrape_description()
-                        job_link = self.scrape_link()
+                        with trace.phase('extract', page=page_num, job=i):
+                            self.record_page_load()
+                            company_name = self.scrape_company()
+                            location_data = self.scrape_location()
+                            deadline = self.scrape_deadline()
+                            compensation = self.scrape_compensation()
+                            major = self.scrape_major()
+                            min_GPA = self.scrape_min_gpa()
+                            description = self.scrape_description()
+                            job_link = self.scrape_link()
 
                         print(f"  [{i + 1}/{num_jobs}] Scraped: {job_title}")
                         print(f"      Company: {company_name}")
 
-                        job_entry = {
-                            'title': job_title,
-                            'company': company_name,
-                            'location': location_data,
-                            'deadline': deadline,
-                            'compensation': compensation,
-                            'targeted_major': major,
-                            'minimum_gpa': min_GPA,
-                            'description': description,
-                            'job_link': job_link,
-                            'scraped_at': datetime.now().isoformat(),
-                            'search_keywords': search_term,
-                            'search_location': location,
-                        }
+                        job_entry = JobRecord(
+                            title=job_title,
+                            company=company_name,
+                            location=location_data,
+                            deadline=deadline,
+                            compensation=compensation,
+                            targeted_major=major,
+                            minimum_gpa=min_GPA,
+                            description=description,
+                            job_link=job_link,
+                            scraped_at=scraped_at,
+                            search_keywords=search_term,
+                            search_location=location,
+                        )
 
                         all_jobs.append(job_entry)
                         total_jobs_scraped += 1
@@ -348,8 +530,9 @@ class NUWorksScraper:
 
                     finally:
                         try:
-                            self.driver.back()
-                            time.sleep(1)
+                            with trace.phase('back', page=page_num, job=i):
+                                self.driver.back()
+                                time.sleep(1)
                         except:
                             pass
 
@@ -359,11 +542,22 @@ class NUWorksScraper:
             except Exception as e:
                 print(f"\nError on page {page_num}: {str(e)}")
 
-            if not self.next_page():
+            with trace.phase('paginate', page=page_num):
+                has_next = self.next_page()
+            if not has_next:
                 break
 
             page_num += 1
 
+        loads = trace.meta['page_loads'] = self.page_load_summary()
+        if loads['page_loads']:
+            print(f"\nPage loads: {loads['page_loads']}, waited {loads['mean_waited_ms']:.0f} ms each "
+                  f"(full load {loads['mean_load_ms']:.0f} ms, {loads['mean_saved_ms']:.0f} ms not waited for), "
+                  f"{loads['mean_bytes'] / 1024:.0f} KiB / {loads['mean_resources']:.0f} resources each")
+
+        if self.trace_file:
+            trace.write(self.trace_file)
+
         print("\n" + "=" * 50)
         print(f"SCRAPING COMPLETE")
         print(f"Successfully scraped: {total_jobs_scraped} jobs")
@@ -371,6 +565,71 @@ class NUWorksScraper:
 
         return all_jobs
 
+    @profile
+    def scrape_all_jobs_network(self, search_term, location, max_jobs=None):
+        """Capture-mode scraping - reads the job list/detail API responses
+        (see network_capture.py) instead of clicking through every job.
+        Falls back to scrape_all_jobs if no job list API call was captured."""
+        print("\n" + "=" * 50)
+        print("Starting job scraping process (network capture)...")
+        trace = self.trace = RunTrace(search_term=search_term, location=location, max_jobs=max_jobs,
+                                      mode='network')
+        self.page_loads = []
+        self._last_navigation = None
+
+        with trace.phase('list_load', page=1):
+            list_url, payload = self.capture.last_list_call() if self.capture else (None, None)
+            if list_url is not None and payload is None:
+                payload = self.capture.fetch_json(list_url)
+        if list_url is None or not job_items(payload):
+            print("No job list API response captured - falling back to page scraping")
+            return self.scrape_all_jobs(search_term, location, max_jobs)
+
+        scraped_at = datetime.now().isoformat()
+        page_num = int(parse_qs(urlparse(list_url).query).get('page', ['1'])[0])
+        all_jobs = []
+        seen_ids = set()
+
+        while payload:
+            new_items = [item for item in job_items(payload) if posting_key(item) not in seen_ids]
+            if not new_items:
+                break  # past the last page, or the API ignores the page parameter
+
+            for item in new_items:
+                if max_jobs and len(all_jobs) >= max_jobs:
+                    break
+                job_id = posting_id(item)
+                seen_ids.add(posting_key(item))
+                job = job_from_payload(item, self.base_url, search_term, location, scraped_at)
+
+                if job.description is None and job_id is not None:
+                    # list entries can be summaries; the detail call has the full posting
+                    with trace.phase('extract', page=page_num, job=len(all_jobs)):
+                        detail = detail_item(self.capture.fetch_json(self.base_url + DETAIL_API_PATH.format(id=job_id)))
+                    if detail:
+                        full = job_from_payload(detail, self.base_url, search_term, location, scraped_at)
+                        job.fill_missing(full)
+
+                print(f"  [{len(all_jobs) + 1}] Captured: {job.title} - {job.company}")
+                all_jobs.append(job)
+
+            if max_jobs and len(all_jobs) >= max_jobs:
+                print(f"\nReached job limit of {max_jobs}. Stopping...")
+                break
+
+            page_num += 1
+            with trace.phase('paginate', page=page_num):
+                payload = self.capture.fetch_json(page_url(list_url, page_num))
+
+        if self.trace_file:
+            trace.write(self.trace_file)
+
+        print("\n" + "=" * 50)
+        print(f"SCRAPING COMPLETE")
+        print(f"Successfully captured: {len(all_jobs)} jobs")
+        print("=" * 50 + "\n")
+        return all_jobs
+
     def close(self):
         if self.driver:
             self.driver.quit()
@@ -379,9 +638,9 @@ class NUWorksScraper:
 
 # Helper functions for easy use
 def scrape_with_login(username, password, search_term="software engineering", 
-                     location="Boston, MA, USA", max_jobs=None):
+                     location="Boston, MA, USA", max_jobs=None, trace_file=None):
     """Scrape using username/password login"""
-    scraper = NUWorksScraper(headless=True)
+    scraper = NUWorksScraper(headless=True, trace_file=trace_file)
     
     try:
         scraper.initialize_driver()
@@ -398,9 +657,9 @@ def scrape_with_login(username, password, search_term="software engineering",
 
 
 def scrape_with_cookies(cookies, search_term="software engineering",
-                       location="Boston, MA, USA", max_jobs=None):
+                       location="Boston, MA, USA", max_jobs=None, trace_file=None):
     """Scrape using saved cookies - no Duo needed"""
-    scraper = NUWorksScraper(headless=True)
+    scraper = NUWorksScraper(headless=True, trace_file=trace_file)
     
     try:
         scraper.initialize_driver()
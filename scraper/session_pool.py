@@ -0,0 +1,227 @@
+"""
+session_pool.py
+
+Keeps logged-in NUWorksScraper browsers warm across users and search terms,
+so a run launches Chrome and loads the cookies once instead of once per user.
+
+    with BrowserSessionPool(admin_cookies) as pool:
+        for user in users:
+            jobs = pool.scrape(user['major'], 'Boston, MA, USA', max_jobs=20)
+
+Between searches a session is reset by loading the job list URL again, which
+drops the previous search term and filters but keeps the login. A session is
+recycled (Chrome quit and relaunched) after max_jobs_per_session jobs, when a
+scrape through it fails, when the browser no longer answers, or when the
+portal has sent it back to the sign-in page.
+
+Browsers come from scraper_factory, NUWorksScraper by default. scraper.py
+(and with it selenium) is only imported when that default first launches
+one, so the pool logic runs against any object with the same methods.
+"""
+from queue import Empty, LifoQueue
+import threading
+
+
+class SessionExpiredError(Exception):
+    """ The cookies no longer log a fresh browser in """
+
+
+class _Session:
+    __slots__ = ('scraper', 'jobs', 'searches')
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self.jobs = 0  # jobs scraped through this browser
+        self.searches = 0
+
+
+class BrowserSessionPool:
+    """
+    Pool of authenticated browsers. Sessions are created lazily, so a pool of
+    size 3 used by one thread only ever starts one browser.
+    """
+
+    def __init__(self, cookies, size=1, max_jobs_per_session=200, headless=True, base_url=None,
+                 capture_network=False, lean=False, scraper_factory=None):
+        """
+        Args:
+            cookies: Selenium cookie dicts used to log every browser in
+            size: Most browsers alive at once (one per concurrent scrape)
+            max_jobs_per_session: Recycle a browser after this many jobs, which
+                bounds Chrome's memory growth over a long run
+            headless: Run Chrome headless
+            base_url: Portal base URL (None = NUWorksScraper's default, the live portal)
+            capture_network: Read jobs from the portal's API responses
+                (NUWorksScraper.scrape_all_jobs_network) instead of the pages
+            lean: Use the lean browser profile (no images, fonts or analytics, eager loads)
+            scraper_factory: Called with the options above to make each
+                browser's scraper (default: NUWorksScraper)
+        """
+        self.cookies = cookies
+        self.size = size
+        self.max_jobs_per_session = max_jobs_per_session
+        self.headless = headless
+        self.base_url = base_url
+        self.capture_network = capture_network
+        self.lean = lean
+        self.scraper_factory = scraper_factory
+
+        self._idle = LifoQueue()  # most recently used session first
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._open = []
+        self.stats = {'launched': 0, 'reused': 0, 'recycled': 0, 'searches': 0, 'jobs': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _new_scraper(self):
+        factory = self.scraper_factory
+        if factory is None:
+            from scraper import NUWorksScraper
+            factory = NUWorksScraper
+        options = {'headless': self.headless, 'capture_network': self.capture_network, 'lean': self.lean}
+        if self.base_url is not None:
+            options['base_url'] = self.base_url
+        return factory(**options)
+
+    def _launch(self):
+        scraper = self._new_scraper()
+        try:
+            scraper.initialize_driver()
+            scraper.navigate_to_page()
+            scraper.login_with_cookies(self.cookies)
+            if "signin" in scraper.driver.current_url.lower():
+                raise SessionExpiredError("Cookies did not log the browser in")
+        except Exception:
+            scraper.close()
+            raise
+
+        session = _Session(scraper)
+        with self._lock:
+            self._open.append(session)
+            self.stats['launched'] += 1
+        return session
+
+    def _discard(self, session):
+        with self._lock:
+            if session in self._open:
+                self._open.remove(session)
+        session.scraper.close()
+
+    def _recycle(self, session, reason):
+        print(f"Recycling browser session ({reason})")
+        self._count('recycled')
+        self._discard(session)
+
+    def _reset(self, session):
+        """
+        Put a reused browser back on the job list, logged in, with no search
+        or filters applied. Returns False if the session can't be reused.
+        """
+        driver = session.scraper.driver
+        try:
+            # close stray tabs a job posting may have opened
+            handles = driver.window_handles
+            if len(handles) > 1:
+                for handle in handles[1:]:
+                    driver.switch_to.window(handle)
+                    driver.close()
+                driver.switch_to.window(handles[0])
+            driver.get(f"{session.scraper.base_url}/students/index.php?mode=list&s=jobs")
+        except Exception as e:
+            self._recycle(session, f"browser not responding: {str(e)[:60]}")
+            return False
+
+        if "signin" in driver.current_url.lower():
+            self._recycle(session, "sent back to sign-in")
+            return False
+        return True
+
+    def acquire(self):
+        """
+        Take a logged-in session (its NUWorksScraper is session.scraper),
+        launching a browser if no warm session is idle.
+        Give it back with release().
+        """
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    session = self._idle.get_nowait()
+                except Empty:
+                    return self._launch()
+                if session.jobs >= self.max_jobs_per_session:
+                    self._recycle(session, f"{session.jobs} jobs scraped")
+                elif self._reset(session):
+                    self._count('reused')
+                    return session
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, session, jobs=0, failed=False):
+        """
+        Return a session taken with acquire().
+
+        Args:
+            session: The session
+            jobs: Jobs scraped with it since acquire()
+            failed: The scrape raised; the browser is recycled instead of reused
+        """
+        session.jobs += jobs
+        session.searches += 1
+        self._count('searches')
+        self._count('jobs', jobs)
+        try:
+            if failed:
+                self._recycle(session, "scrape failed")
+            else:
+                self._idle.put(session)
+        finally:
+            self._slots.release()
+
+    def scrape(self, search_term, location, max_jobs=None):
+        """
+        Search, filter and scrape with a pooled browser. Replaces
+        scraper.scrape_with_cookies, minus the Chrome launch and login.
+        """
+        session = self.acquire()
+        jobs = []
+        try:
+            scraper = session.scraper
+            scraper.search(search_term)
+            scraper.get_job_results()
+            scraper.filter_by_location(location)
+            scraper.filter_by_coop()
+            if self.capture_network:
+                jobs = scraper.scrape_all_jobs_network(search_term, location, max_jobs)
+            else:
+                jobs = scraper.scrape_all_jobs(search_term, location, max_jobs)
+        except Exception:
+            self.release(session, failed=True)
+            raise
+        self.release(session, jobs=len(jobs))
+        return jobs
+
+    def close(self):
+        """ Quit every browser the pool started """
+        with self._lock:
+            sessions, self._open = self._open, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except Empty:
+                break
+        for session in sessions:
+            session.scraper.close()
+        print(f"Browser sessions: {self.stats['launched']} launched, {self.stats['reused']} reused, "
+              f"{self.stats['recycled']} recycled for {self.stats['searches']} searches")
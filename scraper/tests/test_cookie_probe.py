@@ -0,0 +1,48 @@
+import socket
+import time
+
+import pytest
+
+from cookie_probe import cookies_expire_at, portal_cookies, probe_session
+from replay_server import ReplayServer, synthetic_jobs
+
+
+@pytest.fixture
+def server():
+    with ReplayServer(synthetic_jobs(5), session_cookie='PHPSESSID=live') as server:
+        yield server
+
+
+def cookie(value, domain='127.0.0.1', **extra):
+    return dict(name='PHPSESSID', value=value, domain=domain, **extra)
+
+
+def test_valid_cookie_is_served_the_job_list(server):
+    assert probe_session([cookie('live')], server.base_url) is True
+    assert server.requests == 1
+
+
+def test_expired_cookie_is_sent_to_sign_in(server):
+    assert probe_session([cookie('stale')], server.base_url) is False
+    assert probe_session([], server.base_url) is False
+
+
+def test_cookies_for_other_hosts_are_not_sent(server):
+    assert probe_session([cookie('live', domain='.example.com')], server.base_url) is False
+
+
+def test_unreachable_portal_is_inconclusive():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    assert probe_session([cookie('live')], f"http://127.0.0.1:{port}", timeout=2) is None
+
+
+def test_expiry_comes_from_the_portal_cookies_only():
+    now = time.time()
+    cookies = [cookie('a', expiry=now + 60), cookie('b', expiry=now + 30),
+               cookie('c', domain='.example.com', expiry=now - 10), cookie('d')]
+    base_url = 'http://127.0.0.1:8800'
+    assert len(portal_cookies(cookies, base_url)) == 3
+    assert cookies_expire_at(cookies, base_url) == now + 30
+    assert cookies_expire_at([cookie('d')], base_url) is None
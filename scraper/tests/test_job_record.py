@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+from job_record import FIELDS, INTERNED_FIELDS, JobRecord, SchemaError, load_jobs, save_jobs
+
+COOPSEARCH = os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'coopsearch.json')
+
+JOB = {
+    'title': 'Software Engineering Co-op',
+    'company': 'Medtronic',
+    'location': 'Boston, MA, USA',
+    'deadline': 'December 19, 2025',
+    'compensation': '$20 - $35 per hour',
+    'targeted_major': 'Khoury College of Computer Sciences/Computer Science',
+    'minimum_gpa': 2.75,
+    'description': 'Embedded C++ and Python',
+    'job_link': 'https://example.com/jobs/1',
+    'scraped_at': '2025-12-15T14:26:50.760555',
+    'search_keywords': 'software engineering',
+    'search_location': 'Boston, MA, USA',
+}
+
+
+def test_dict_round_trip():
+    job = JobRecord.from_dict(JOB)
+    assert job.to_dict() == JOB
+    assert JobRecord.from_dict(job.to_dict()) == job
+
+
+def test_extra_fields_only_in_dict_once_set():
+    job = JobRecord.from_dict(JOB)
+    assert 'status' not in job.to_dict()
+    job['status'] = 'active'
+    job['user_id'] = 'user-1'
+    assert job.to_dict() == dict(JOB, status='active', user_id='user-1')
+
+
+def test_portal_values_are_normalized():
+    job = JobRecord.from_dict(dict(JOB, compensation='Not listed', minimum_gpa='3.0'))
+    assert job.compensation is None
+    assert job.minimum_gpa == 3.0
+    assert 'compensation' not in job
+    assert job.get('compensation', 'n/a') == 'n/a'
+
+
+@pytest.mark.parametrize('data, message', [
+    (dict(JOB, salary='$30'), 'Unknown job field'),
+    (dict(JOB, title=42), 'title should be str'),
+    (dict(JOB, minimum_gpa='three'), 'minimum_gpa is not a number'),
+])
+def test_schema_errors(data, message):
+    with pytest.raises(SchemaError, match=message):
+        JobRecord.from_dict(data)
+
+
+def test_dict_access_rejects_unknown_fields():
+    job = JobRecord.from_dict(JOB)
+    with pytest.raises(KeyError):
+        job['salary']
+    with pytest.raises(KeyError):
+        job['salary'] = '$30'
+
+
+def test_only_low_cardinality_fields_are_interned():
+    # build values at runtime so they are not shared compile-time constants
+    def values():
+        return {field: ''.join([field, '-value']) for field in FIELDS if field != 'minimum_gpa'}
+
+    first, second = JobRecord(**values()), JobRecord(**values())
+    for field in values():
+        assert (first[field] is second[field]) == (field in INTERNED_FIELDS), field
+    assert 'description' not in INTERNED_FIELDS and 'scraped_at' not in INTERNED_FIELDS
+
+
+def test_load_and_save_jobs(tmp_path):
+    jobs = load_jobs(COOPSEARCH)
+    with open(COOPSEARCH) as f:
+        assert len(jobs) == len(json.load(f))
+
+    filename = str(tmp_path / 'jobs.json')
+    save_jobs(jobs, filename)
+    assert load_jobs(filename) == jobs
@@ -0,0 +1,110 @@
+import base64
+import json
+
+from network_capture import NetworkCapture, job_from_payload, page_url
+
+BASE_URL = 'https://portal.test'
+LIST_URL = BASE_URL + '/api/v2/jobs?keywords=software&page=1'
+
+PAYLOAD = {'models': [
+    {'job_id': 'j1', 'job_title': 'Software Co-op', 'employer': {'name': 'Medtronic'},
+     'compensation': 'Not listed', 'screen_gpa': '3.0', 'job_desc': '<p>Embedded <b>C++</b></p><p>Python</p>'},
+]}
+
+
+def event(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+def response(request_id, url):
+    return event('Network.responseReceived', requestId=request_id, response={'url': url})
+
+
+class FakeDriver:
+    """ Serves queued performance-log entries and response bodies like a Chrome driver """
+
+    def __init__(self):
+        self.log = []
+        self.bodies = {}
+
+    def get_log(self, kind):
+        assert kind == 'performance'
+        entries, self.log = self.log, []
+        return entries
+
+    def execute_cdp_cmd(self, command, params):
+        if command == 'Network.getResponseBody':
+            if params['requestId'] not in self.bodies:
+                raise RuntimeError("No resource with given identifier found")
+            return self.bodies[params['requestId']]
+        return {}
+
+
+def test_drain_reports_each_finished_api_call_once():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    driver.log = [response('1', LIST_URL), response('2', BASE_URL + '/static/app.js'),
+                  response('3', BASE_URL + '/api/v2/jobs/j1'),
+                  event('Network.loadingFinished', requestId='1'),
+                  event('Network.loadingFinished', requestId='2')]
+
+    assert capture.drain() == [('1', LIST_URL)]
+    assert capture.requests == {'3': BASE_URL + '/api/v2/jobs/j1'}  # still loading
+
+    driver.log = [event('Network.loadingFinished', requestId='3'),
+                  event('Network.loadingFinished', requestId='1')]  # duplicate event
+    assert capture.drain() == [('3', BASE_URL + '/api/v2/jobs/j1')]
+    assert capture.requests == {}
+
+
+def test_failed_requests_are_forgotten():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    driver.log = [response('1', LIST_URL), event('Network.loadingFailed', requestId='1')]
+    assert capture.drain() == []
+    assert capture.requests == {}
+
+
+def test_requests_do_not_pile_up_over_a_long_session():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    for i in range(1000):
+        driver.log = [response(str(i), LIST_URL), event('Network.loadingFinished', requestId=str(i))]
+        assert capture.drain() == [(str(i), LIST_URL)]
+    assert capture.requests == {}
+
+
+def test_body_json():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    driver.bodies = {
+        'plain': {'body': json.dumps(PAYLOAD), 'base64Encoded': False},
+        'encoded': {'body': base64.b64encode(json.dumps(PAYLOAD).encode()).decode(), 'base64Encoded': True},
+        'html': {'body': '<html>', 'base64Encoded': False},
+    }
+    assert capture.body_json('plain') == PAYLOAD
+    assert capture.body_json('encoded') == PAYLOAD
+    assert capture.body_json('html') is None
+    assert capture.body_json('evicted') is None
+
+
+def test_last_list_call_reads_the_newest_list_response():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    older = BASE_URL + '/api/v2/jobs?page=1'
+    driver.log = [response('1', older), event('Network.loadingFinished', requestId='1'),
+                  response('2', LIST_URL), event('Network.loadingFinished', requestId='2'),
+                  response('3', BASE_URL + '/api/v2/jobs/j1'), event('Network.loadingFinished', requestId='3')]
+    driver.bodies = {'2': {'body': json.dumps(PAYLOAD)}}
+
+    assert capture.last_list_call() == (LIST_URL, PAYLOAD)
+    assert capture.last_list_call() == (None, None)  # already drained
+
+
+def test_job_from_payload():
+    job = job_from_payload(PAYLOAD['models'][0], BASE_URL, 'software', 'Boston', '2025-12-15T14:26:50')
+    assert job.title == 'Software Co-op' and job.company == 'Medtronic'
+    assert job.compensation is None and job.minimum_gpa == 3.0
+    assert job.description == 'Embedded C++\nPython'
+    assert job.job_link == BASE_URL + '/students/app/jobs/detail/j1'
+    assert page_url(LIST_URL, 3) == BASE_URL + '/api/v2/jobs?keywords=software&page=3'
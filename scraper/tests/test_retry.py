@@ -0,0 +1,139 @@
+import pytest
+
+import retry
+from retry import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy
+
+
+class Flaky:
+    """ Fails with `error` the first `failures` calls, then returns 'ok' """
+
+    def __init__(self, failures, error=TimeoutError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("flaky")
+        return 'ok'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(retry.time, 'sleep', lambda seconds: None)
+    retry.reset_stats()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry.time, 'monotonic', clock)
+    return clock
+
+
+def test_transient_error_is_retried_until_success():
+    func = Flaky(2)
+    assert RetryPolicy(max_attempts=3).call(func, site='flaky') == 'ok'
+    assert func.calls == 3
+    stats = retry.stats_dict()['flaky']
+    assert (stats['attempts'], stats['retries'], stats['successes']) == (3, 2, 1)
+
+
+def test_permanent_error_is_not_retried():
+    func = Flaky(1, error=ValueError)
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=3).call(func)
+    assert func.calls == 1
+
+
+def test_database_error_codes():
+    class APIError(Exception):
+        def __init__(self, code):
+            self.code = code
+
+    assert retry.is_transient(APIError('40001'))
+    assert retry.is_transient(APIError('08006'))
+    assert not retry.is_transient(APIError('23505'))  # unique violation
+
+
+def test_budget_caps_retries_across_calls():
+    budget = RetryBudget(max_retries=3)
+    policy = RetryPolicy(max_attempts=5, budget=budget)
+
+    assert policy.call(Flaky(2), site='a') == 'ok'
+    func = Flaky(10)
+    with pytest.raises(TimeoutError):
+        policy.call(func, site='b')
+
+    assert func.calls == 2  # first attempt plus the one retry left
+    assert budget.remaining == 0
+    assert retry.stats_dict()['b']['budget_exhausted'] == 1
+
+    budget.reset()
+    assert budget.remaining == 3
+
+
+def test_breaker_opens_rejects_and_recovers(clock):
+    breaker = CircuitBreaker('portal', failure_threshold=2, reset_timeout=60)
+    policy = RetryPolicy(max_attempts=1, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            policy.call(Flaky(1))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    func = Flaky(0)
+    with pytest.raises(CircuitOpenError):
+        policy.call(func, site='rejected')
+    assert func.calls == 0
+    assert retry.stats_dict()['rejected']['rejected'] == 1
+
+    # after the timeout one probe goes through; a success closes the circuit
+    clock.now += 61
+    assert policy.call(func) == 'ok'
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+def test_failed_probe_reopens_breaker(clock):
+    breaker = CircuitBreaker('portal', failure_threshold=2, reset_timeout=60)
+    policy = RetryPolicy(max_attempts=3, breaker=breaker)
+
+    func = Flaky(10)
+    with pytest.raises(TimeoutError):
+        policy.call(func)
+    assert func.calls == 2  # stopped retrying once the breaker opened
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 61
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+
+    with pytest.raises(CircuitOpenError):
+        policy.call(Flaky(0))
+
+
+def test_permanent_error_counts_as_breaker_success():
+    breaker = CircuitBreaker('db', failure_threshold=2)
+    policy = RetryPolicy(max_attempts=1, breaker=breaker)
+    with pytest.raises(TimeoutError):
+        policy.call(Flaky(1))
+    with pytest.raises(ValueError):
+        policy.call(Flaky(1, error=ValueError))
+    with pytest.raises(TimeoutError):
+        policy.call(Flaky(1))
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,171 @@
+import threading
+
+import pytest
+
+from session_pool import BrowserSessionPool, SessionExpiredError
+
+BASE_URL = 'http://portal.test'
+
+
+class FakeDriver:
+    def __init__(self, portal):
+        self.portal = portal
+        self.current_url = BASE_URL
+        self.window_handles = ['main']
+        self.switch_to = self
+
+    def window(self, handle):
+        pass
+
+    def get(self, url):
+        if self.portal.unresponsive:
+            raise ConnectionError("chrome not reachable")
+        self.current_url = url if self.portal.logged_in else f"{BASE_URL}/signin"
+
+    def close(self):
+        self.window_handles.pop()
+
+
+class FakeScraper:
+    """ Stands in for NUWorksScraper: same calls, no Chrome """
+
+    def __init__(self, portal, **options):
+        self.portal = portal
+        self.options = options
+        self.base_url = options.get('base_url', BASE_URL)
+        self.driver = None
+        self.closed = False
+        self.searches = []
+
+    def initialize_driver(self):
+        self.driver = FakeDriver(self.portal)
+
+    def navigate_to_page(self):
+        pass
+
+    def login_with_cookies(self, cookies):
+        self.driver.get(f"{self.base_url}/students/index.php?mode=list&s=jobs")
+
+    def search(self, term):
+        if self.portal.fail_searches:
+            raise TimeoutError("search box never appeared")
+        self.searches.append(term)
+
+    def get_job_results(self):
+        pass
+
+    def filter_by_location(self, location):
+        pass
+
+    def filter_by_coop(self):
+        pass
+
+    def scrape_all_jobs(self, search_term, location, max_jobs):
+        return [{'title': f"{search_term} {i}"} for i in range(max_jobs)]
+
+    def close(self):
+        self.closed = True
+
+
+class FakePortal:
+    def __init__(self):
+        self.logged_in = True
+        self.unresponsive = False
+        self.fail_searches = False
+        self.scrapers = []
+
+    def factory(self, **options):
+        scraper = FakeScraper(self, **options)
+        self.scrapers.append(scraper)
+        return scraper
+
+
+@pytest.fixture
+def portal():
+    return FakePortal()
+
+
+def test_one_browser_is_reused_across_searches(portal):
+    with BrowserSessionPool([], scraper_factory=portal.factory, lean=True) as pool:
+        for term in ('computer science', 'data science', 'robotics'):
+            assert len(pool.scrape(term, 'Boston, MA, USA', max_jobs=5)) == 5
+
+    assert len(portal.scrapers) == 1
+    scraper = portal.scrapers[0]
+    assert scraper.searches == ['computer science', 'data science', 'robotics']
+    assert scraper.options == {'headless': True, 'capture_network': False, 'lean': True}
+    assert pool.stats == {'launched': 1, 'reused': 2, 'recycled': 0, 'searches': 3, 'jobs': 15}
+    assert scraper.closed
+
+
+def test_browser_is_recycled_after_max_jobs(portal):
+    with BrowserSessionPool([], max_jobs_per_session=10, scraper_factory=portal.factory) as pool:
+        for _ in range(5):
+            pool.scrape('cs', 'Boston', max_jobs=4)
+
+    # 4 + 4 + 4 jobs crosses the limit, so every third search starts a new browser
+    assert len(portal.scrapers) == 2
+    assert portal.scrapers[0].closed
+    assert pool.stats['launched'] == 2 and pool.stats['recycled'] == 1 and pool.stats['reused'] == 3
+
+
+def test_failed_scrape_evicts_the_browser(portal):
+    with BrowserSessionPool([], scraper_factory=portal.factory) as pool:
+        pool.scrape('cs', 'Boston', max_jobs=1)
+        portal.fail_searches = True
+        with pytest.raises(TimeoutError):
+            pool.scrape('cs', 'Boston', max_jobs=1)
+        assert portal.scrapers[0].closed
+
+        portal.fail_searches = False
+        pool.scrape('cs', 'Boston', max_jobs=1)
+
+    assert len(portal.scrapers) == 2
+    assert pool.stats['recycled'] == 1
+
+
+def test_unresponsive_or_logged_out_browser_is_replaced_on_acquire(portal):
+    pool = BrowserSessionPool([], scraper_factory=portal.factory)
+    pool.release(pool.acquire())
+    portal.unresponsive = True
+    with pytest.raises(ConnectionError):
+        # the old browser is dropped, and the replacement cannot load either
+        pool.acquire()
+    assert portal.scrapers[0].closed and portal.scrapers[1].closed
+
+    portal.unresponsive = False
+    pool.release(pool.acquire())
+    portal.logged_in = False
+    with pytest.raises(SessionExpiredError):
+        pool.acquire()
+    assert all(scraper.closed for scraper in portal.scrapers)
+    pool.close()
+
+
+def test_slot_is_returned_when_launch_fails(portal):
+    portal.logged_in = False
+    pool = BrowserSessionPool([], size=1, scraper_factory=portal.factory)
+    for _ in range(2):
+        with pytest.raises(SessionExpiredError):
+            pool.acquire()
+    portal.logged_in = True
+    pool.release(pool.acquire())
+    pool.close()
+
+
+def test_pool_size_bounds_concurrent_browsers(portal):
+    pool = BrowserSessionPool([], size=2, scraper_factory=portal.factory)
+    first, second = pool.acquire(), pool.acquire()
+    third = []
+    waiter = threading.Thread(target=lambda: third.append(pool.acquire()))
+    waiter.start()
+    waiter.join(0.2)
+    assert not third  # blocked until a session comes back
+
+    pool.release(first)
+    waiter.join(5)
+    assert third == [first]
+    assert len(portal.scrapers) == 2
+    pool.release(second)
+    pool.release(third[0])
+    pool.close()